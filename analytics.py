@@ -0,0 +1,337 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+# NumPy is optional - the admin analytics endpoint reports itself unavailable without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# fcntl (POSIX only) lets one process at a time extend the shared snapshot
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+EPOCH = date(1970, 1, 1)
+
+
+def day_number(value):
+    """Convert a 'YYYY-MM-DD' string or date into days since 1970-01-01"""
+    if isinstance(value, str):
+        value = datetime.strptime(value[:10], '%Y-%m-%d').date()
+    return (value - EPOCH).days
+
+
+def day_label(number):
+    return (EPOCH + timedelta(days=int(number))).isoformat()
+
+
+class SalesAnalytics:
+    """Columnar (NumPy) snapshot of order line items for vectorized sales reports.
+
+    Each line item is one slot in parallel column files under directory (order id,
+    order day and month, product, category, quantity, revenue). Every worker maps
+    them read-only with np.memmap, so a machine holds one copy in its page cache
+    however many workers serve analytics. refresh() appends the items of orders
+    newer than the last one seen, then publishes the new row count in meta.json;
+    only the process holding directory/.lock does so, the others return at once.
+    Orders moved to the archive database (archive_path) are read from there.
+    """
+    COLUMNS = (
+        ('order_id', 'int64'),
+        ('day', 'int32'),
+        ('month', 'int32'),
+        ('product_id', 'int64'),
+        ('category_id', 'int64'),
+        ('quantity', 'int64'),
+        ('revenue', 'float64'),
+    )
+    BUCKETS = ('day', 'week', 'month')
+
+    def __init__(self, db_path, directory, refresh_interval=5.0, chunk_size=100000, archive_path=None):
+        self.db_path = db_path
+        self.directory = directory
+        self.archive_path = archive_path
+        self.refresh_interval = refresh_interval
+        self.chunk_size = chunk_size
+        self.size = 0
+        self.published = None  # (inode, mtime) of the meta.json the columns were mapped from
+        self.cancelled = None
+        self.columns = {}
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        if self.available():
+            self.columns = {name: np.empty(0, dtype=dtype) for name, dtype in self.COLUMNS}
+            self.cancelled = np.empty(0, dtype='int64')
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _column_path(self, name, generation):
+        return self._path(f"{name}.{generation}.bin")
+
+    def _read_meta(self):
+        try:
+            with open(self._path('meta.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def ready(self):
+        """True once a snapshot has been published"""
+        return os.path.exists(self._path('meta.json'))
+
+    def refresh(self):
+        """Append line items of orders placed since the last refresh and publish them.
+
+        Returns the rows added (0 if another process is refreshing).
+        """
+        if not self.available():
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        with self.refresh_lock, open(self._path('.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return 0
+            try:
+                return self._extend()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _extend(self):
+        meta = self._read_meta()
+        if meta is not None and not all(
+            os.path.exists(self._column_path(name, meta['generation'])) for name, _ in self.COLUMNS
+        ):
+            meta = None
+        if meta is None:
+            # Start over in a new generation; readers keep the files they have mapped
+            previous = self._read_meta()
+            generation = (previous['generation'] + 1) if previous else 1
+            meta = {'generation': generation, 'size': 0, 'last_order_id': 0, 'cancelled': []}
+            for name, _ in self.COLUMNS:
+                open(self._column_path(name, generation), 'wb').close()
+
+        files = {}
+        try:
+            for name, dtype in self.COLUMNS:
+                f = files[name] = open(self._column_path(name, meta['generation']), 'r+b')
+                # Drop anything an interrupted refresh appended past the published size
+                f.truncate(meta['size'] * np.dtype(dtype).itemsize)
+                f.seek(0, os.SEEK_END)
+
+            conn = sqlite3.connect(self.db_path)
+            added = 0
+            newest = meta['last_order_id']
+            schemas = ['main']
+            try:
+                if self.archive_path and os.path.exists(self.archive_path):
+                    conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path,))
+                    schemas.append('archive')
+                # One read transaction, so an order being archived is seen in exactly one of them
+                conn.execute("BEGIN")
+                for schema in schemas:
+                    rows, last = self._load(conn, schema, meta['last_order_id'], files)
+                    added += rows
+                    newest = max(newest, last)
+
+                # Status changes can hit any order, but the cancelled set is small (and never archived)
+                cancelled = sorted(row[0] for row in conn.execute("SELECT id FROM orders WHERE status = 'cancelled'"))
+            finally:
+                conn.close()
+        finally:
+            for f in files.values():
+                f.close()
+
+        meta.update(size=meta['size'] + added, last_order_id=newest, cancelled=cancelled)
+        partial = self._path('meta.json.partial')
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(partial, self._path('meta.json'))
+
+        # Files of earlier generations stay readable for as long as a worker has them mapped
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.bin') and filename.split('.')[1] != str(meta['generation']):
+                os.remove(self._path(filename))
+        return added
+
+    def _load(self, conn, schema, after_order_id, files):
+        # Each pass is sorted by order id, so every order's items stay contiguous
+        cursor = conn.execute(f'''
+            SELECT oi.order_id,
+                   CAST(julianday(o.created_at) - 2440587.5 AS INTEGER),
+                   (CAST(strftime('%Y', o.created_at) AS INTEGER) - 1970) * 12
+                       + CAST(strftime('%m', o.created_at) AS INTEGER) - 1,
+                   oi.product_id,
+                   COALESCE(p.category_id, 0),
+                   oi.quantity,
+                   oi.price * oi.quantity
+            FROM {schema}.order_items oi
+            JOIN {schema}.orders o ON o.id = oi.order_id
+            LEFT JOIN main.products p ON p.id = oi.product_id
+            WHERE oi.order_id > ?
+            ORDER BY oi.order_id
+        ''', (after_order_id,))
+        added = 0
+        last = after_order_id
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            block = np.array(rows, dtype='float64')
+            for index, (name, dtype) in enumerate(self.COLUMNS):
+                files[name].write(block[:, index].astype(dtype).tobytes())
+            added += len(rows)
+            last = int(rows[-1][0])
+        return added, last
+
+    def _snapshot(self):
+        """Map the newest published snapshot if meta.json changed since the last call"""
+        try:
+            info = os.stat(self._path('meta.json'))
+        except OSError:
+            return
+        published = (info.st_ino, info.st_mtime_ns)
+        if published == self.published:
+            return
+        meta = self._read_meta()
+        if meta is None:
+            return
+        try:
+            columns = {
+                name: np.memmap(self._column_path(name, meta['generation']), dtype=dtype, mode='r',
+                                shape=(meta['size'],)) if meta['size'] else np.empty(0, dtype=dtype)
+                for name, dtype in self.COLUMNS
+            }
+        except OSError:
+            return  # replaced by a new generation meanwhile; keep the current mapping
+        self.columns = columns
+        self.size = meta['size']
+        self.cancelled = np.array(meta['cancelled'], dtype='int64')
+        self.published = published
+
+    def _view(self, start=None, end=None, include_cancelled=False):
+        """Return the column slices matching the date range (in ingestion order)"""
+        with self.lock:
+            self._snapshot()
+            size = self.size
+            view = {name: column[:size] for name, column in self.columns.items()}
+            cancelled = self.cancelled
+
+        mask = None
+        if start is not None:
+            mask = view['day'] >= day_number(start)
+        if end is not None:
+            upper = view['day'] <= day_number(end)
+            mask = upper if mask is None else mask & upper
+        if not include_cancelled and len(cancelled):
+            kept = ~np.isin(view['order_id'], cancelled)
+            mask = kept if mask is None else mask & kept
+
+        if mask is not None:
+            view = {name: column[mask] for name, column in view.items()}
+        return view
+
+    @staticmethod
+    def _order_starts(order_ids):
+        # Rows arrive sorted by order id, so each order's items are contiguous
+        starts = np.ones(len(order_ids), dtype=bool)
+        starts[1:] = order_ids[1:] != order_ids[:-1]
+        return starts
+
+    def revenue_by(self, bucket='day', start=None, end=None):
+        if bucket not in self.BUCKETS:
+            raise ValueError(f"Unknown bucket '{bucket}', expected one of {', '.join(self.BUCKETS)}")
+        view = self._view(start, end)
+        if not len(view['day']):
+            return []
+
+        if bucket == 'day':
+            keys = view['day'].astype('int64')
+        elif bucket == 'week':
+            # 1970-01-01 was a Thursday; shift so weeks start on Monday
+            keys = (view['day'].astype('int64') + 3) // 7
+        else:
+            keys = view['month'].astype('int64')
+
+        offset = keys.min()
+        slots = keys - offset
+        revenue = np.bincount(slots, weights=view['revenue'])
+        quantity = np.bincount(slots, weights=view['quantity'])
+        starts = self._order_starts(view['order_id'])
+        orders = np.bincount(slots[starts], minlength=len(revenue))
+
+        periods = []
+        for slot in np.flatnonzero(orders):
+            key = int(slot + offset)
+            if bucket == 'day':
+                label = day_label(key)
+            elif bucket == 'week':
+                label = day_label(key * 7 - 3)
+            else:
+                label = f"{1970 + key // 12:04d}-{key % 12 + 1:02d}"
+            periods.append({
+                'period': label,
+                'revenue': float(revenue[slot]),
+                'orders': int(orders[slot]),
+                'items': int(quantity[slot])
+            })
+        return periods
+
+    def _top(self, keys, weights, quantities, limit):
+        if not len(keys):
+            return []
+        revenue = np.bincount(keys, weights=weights)
+        quantity = np.bincount(keys, weights=quantities)
+        nonzero = np.flatnonzero(quantity)
+        if limit and len(nonzero) > limit:
+            candidates = nonzero[np.argpartition(revenue[nonzero], -limit)[-limit:]]
+        else:
+            candidates = nonzero
+        ranked = candidates[np.argsort(revenue[candidates])[::-1]]
+        return [(int(key), float(revenue[key]), int(quantity[key])) for key in ranked]
+
+    def top_products(self, limit=10, start=None, end=None):
+        view = self._view(start, end)
+        return [
+            {'product_id': key, 'revenue': revenue, 'quantity': quantity}
+            for key, revenue, quantity in self._top(view['product_id'], view['revenue'], view['quantity'], limit)
+        ]
+
+    def category_mix(self, start=None, end=None):
+        view = self._view(start, end)
+        total = float(view['revenue'].sum()) if len(view['revenue']) else 0.0
+        return [
+            {
+                'category_id': key,
+                'revenue': revenue,
+                'quantity': quantity,
+                'share': revenue / total if total else 0.0
+            }
+            for key, revenue, quantity in self._top(view['category_id'], view['revenue'], view['quantity'], None)
+        ]
+
+    def average_order_value(self, start=None, end=None):
+        view = self._view(start, end)
+        order_count = int(self._order_starts(view['order_id']).sum()) if len(view['order_id']) else 0
+        revenue = float(view['revenue'].sum()) if order_count else 0.0
+        return {
+            'orders': order_count,
+            'revenue': revenue,
+            'average_order_value': revenue / order_count if order_count else 0.0
+        }
+
+    def memory_bytes(self):
+        """Bytes of the mapped columns (shared with every other worker through the page cache)"""
+        return sum(column.nbytes for column in self.columns.values())
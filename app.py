@@ -1,4 +1,11 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_from_directory
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for, send_from_directory, g
+from flask.json.provider import DefaultJSONProvider
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+from werkzeug.local import LocalProxy
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+import click
 import sqlite3
 import hashlib
 import smtplib
@@ -6,30 +13,162 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 import threading
+import atexit
 import time
 import os
 import uuid
+import secrets
+import csv
+import io
+import json
+from urllib.parse import urlsplit
+from contextlib import contextmanager, ExitStack
+from collections import OrderedDict, deque
+import heapq
+import functools
+import math
+import gzip
+import logging
+from logging.handlers import RotatingFileHandler
+import cProfile
+import pstats
+import bisect
+import re
 from werkzeug.utils import secure_filename
+from passwords import PasswordHasher
+
+# Brotli is optional - gzip is used when it is not installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# orjson is optional - the stdlib encoder is used when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# fcntl (POSIX only) guards metrics snapshot compaction; without it dead workers' files are kept
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider using orjson when available, with unsorted keys either way"""
+    sort_keys = False
+    
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is not None:
+            body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            body = json.dumps(obj, default=self.default, ensure_ascii=self.ensure_ascii,
+                              sort_keys=self.sort_keys, separators=(',', ':'))
+        return self._app.response_class(body, mimetype=self.mimetype)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 # Generate a secure random secret key - CHANGE THIS TO YOUR OWN SECURE KEY
 app.secret_key = 'your-super-secure-secret-key-change-this-to-something-random-and-long-2024'
 
-# Create instance directory for database
+# Instance directory for the database (created by create_app / on first use)
 INSTANCE_PATH = os.path.join(os.path.dirname(__file__), 'instance')
-os.makedirs(INSTANCE_PATH, exist_ok=True)
 
 # Configure paths
-app.config['DATABASE_PATH'] = os.path.join(INSTANCE_PATH, 'ecommerce.db')
+app.config['DATABASE_PATH'] = os.environ.get('DATABASE_PATH', os.path.join(INSTANCE_PATH, 'ecommerce.db'))
+app.config['ARCHIVE_DATABASE_PATH'] = os.environ.get('ARCHIVE_DATABASE_PATH')  # None = <database>-archive.db next to it
+app.config['ANALYTICS_DIR'] = os.environ.get('ANALYTICS_DIR')  # None = <database>-analytics/ next to it
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(__file__), 'static', 'images')
+app.config['BROWSING_HISTORY_SIZE'] = int(os.environ.get('BROWSING_HISTORY_SIZE', 5))
+
+# Per-route budgets: (tokens per second, burst, max concurrent requests or None)
+app.config['RATELIMIT_ENABLED'] = os.environ.get('RATELIMIT_ENABLED', '1') != '0'
+app.config['RATE_LIMITS'] = {
+    'search': (2, 20, 8),
+    'checkout': (0.2, 5, 4),
+    'upload': (0.5, 10, 2)
+}
 
-# Create upload directory if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Response compression (bodies smaller than COMPRESS_MIN_SIZE bytes go out as-is)
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+app.config['COMPRESS_LEVEL'] = int(os.environ.get('COMPRESS_LEVEL', 6))
 
-# Helper function to format prices in pesos
+# Build read-mostly services in create_app() so preforked workers share them
+app.config['PRELOAD_SERVICES'] = os.environ.get('PRELOAD_SERVICES', '1') != '0'
+
+# Slow-request log (JSONL, rotated) and admin-only per-request profiling
+app.config['SLOW_REQUEST_MS'] = float(os.environ.get('SLOW_REQUEST_MS', 500))
+app.config['SLOW_REQUEST_LOG'] = os.environ.get('SLOW_REQUEST_LOG', os.path.join(INSTANCE_PATH, 'slow_requests.jsonl'))
+app.config['SLOW_REQUEST_LOG_BYTES'] = int(os.environ.get('SLOW_REQUEST_LOG_BYTES', 10 * 1024 * 1024))
+app.config['SLOW_REQUEST_LOG_BACKUPS'] = int(os.environ.get('SLOW_REQUEST_LOG_BACKUPS', 5))
+app.config['PROFILING_ENABLED'] = os.environ.get('PROFILING_ENABLED', '1') != '0'
+app.config['PROFILE_FOLDER'] = os.environ.get('PROFILE_FOLDER', os.path.join(INSTANCE_PATH, 'profiles'))
+
+# Prometheus metrics: each worker writes a snapshot to METRICS_DIR, /metrics merges them
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') != '0'
+app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR', os.path.join(INSTANCE_PATH, 'metrics'))
+app.config['METRICS_FLUSH_SECONDS'] = float(os.environ.get('METRICS_FLUSH_SECONDS', 5))
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')  # if set, scrapes need "Authorization: Bearer <token>"
+
+# Helper function to format prices in pesos (memoized, listings repeat the same prices)
+@functools.lru_cache(maxsize=65536)
 def format_peso(amount):
     return f"₱{amount:,.2f}"
 
+class RowMapper:
+    """Declarative conversion of query rows to dicts.
+
+    Fields are named in SELECT order; money fields also get a '<name>_formatted'
+    peso string and converters post-process single fields (e.g. bool).
+    """
+    __slots__ = ('fields', 'money', 'converters')
+    
+    def __init__(self, *fields, money=(), converters=None):
+        self.fields = fields
+        self.money = tuple((name, f'{name}_formatted') for name in money)
+        self.converters = tuple((converters or {}).items())
+    
+    def one(self, row):
+        item = dict(zip(self.fields, row))
+        for name, convert in self.converters:
+            item[name] = convert(item[name])
+        for name, formatted in self.money:
+            item[formatted] = format_peso(item[name])
+        return item
+    
+    def many(self, rows):
+        fields = self.fields
+        if not self.money and not self.converters:
+            return [dict(zip(fields, row)) for row in rows]
+        one = self.one
+        return [one(row) for row in rows]
+
+PRODUCT_ROW = RowMapper('id', 'name', 'description', 'price', 'stock', 'image_path', 'category', money=('price',))
+PRODUCT_CARD_ROW = RowMapper('id', 'name', 'price', 'image_path', money=('price',))
+ADMIN_PRODUCT_ROW = RowMapper(
+    'id', 'name', 'description', 'price', 'stock', 'category_id', 'category', 'is_active', 'image_path',
+    money=('price',),
+    converters={'category': lambda value: value or 'Uncategorized', 'is_active': bool, 'image_path': lambda value: value or ''}
+)
+ADMIN_PRODUCT_DETAIL_ROW = RowMapper(
+    'id', 'name', 'description', 'price', 'stock', 'category_id', 'image_path', 'is_active',
+    money=('price',), converters={'is_active': bool}
+)
+ADMIN_ORDER_ROW = RowMapper('id', 'customer', 'email', 'total', 'status', 'address', 'contact', 'date', money=('total',))
+ADMIN_USER_ROW = RowMapper('id', 'username', 'email', 'role', 'created_at', 'order_count', 'total_spent', money=('total_spent',))
+TRANSACTION_ROW = RowMapper('order_id', 'date', 'total', 'status', 'item_count', money=('total',))
+USER_ORDER_ROW = RowMapper('id', 'total', 'status', 'date', money=('total',))
+
 # Add template filter for peso formatting
 @app.template_filter('peso')
 def peso_filter(amount):
@@ -38,78 +177,66 @@ def peso_filter(amount):
 # Data Structures Implementation
 
 class Node:
-    """Node for Linked List - used for browsing history"""
-    def __init__(self, product_id, product_name, image_path=None, price=None, timestamp=None):
+    """Browsing history entry (slots keep it small, we hold many histories in RAM)"""
+    __slots__ = ('product_id', 'product_name', 'image_path', 'price', 'viewed_at')
+    
+    def __init__(self, product_id, product_name, image_path=None, price=None, viewed_at=None):
         self.product_id = product_id
         self.product_name = product_name
         self.image_path = image_path or ''
         self.price = price or 0
-        self.timestamp = timestamp or datetime.now().isoformat()
-        self.next = None
+        self.viewed_at = viewed_at or time.time()
 
 class BrowsingHistory:
-    """Linked List implementation for browsing history"""
-    def __init__(self, max_size=5):
-        self.head = None
-        self.max_size = max_size
-        self.size = 0
+    """Recently viewed products with O(1) add, remove and eviction.
+
+    Backed by an insertion-ordered dict (hash map over ordered entries): re-viewing
+    a product moves it to the end and the oldest entry is the first key.
+    """
+    __slots__ = ('items', 'max_size')
     
-    def add_product(self, product_id, product_name, image_path=None, price=None):
-        # Remove if already exists
-        self.remove_product(product_id)
-        
-        new_node = Node(product_id, product_name, image_path, price)
-        new_node.next = self.head
-        self.head = new_node
-        self.size += 1
+    def __init__(self, max_size=None):
+        self.items = {}  # product_id -> Node, oldest first
+        self.max_size = max_size or app.config['BROWSING_HISTORY_SIZE']
+    
+    @property
+    def size(self):
+        return len(self.items)
+    
+    def add_product(self, product_id, product_name, image_path=None, price=None, viewed_at=None):
+        # Remove if already exists so it moves to the most recent position
+        self.items.pop(product_id, None)
+        self.items[product_id] = Node(product_id, product_name, image_path, price, viewed_at)
         
         # Keep only max_size items
-        if self.size > self.max_size:
-            self._remove_last()
+        if len(self.items) > self.max_size:
+            del self.items[next(iter(self.items))]
     
     def remove_product(self, product_id):
-        if not self.head:
-            return
-        
-        if self.head.product_id == product_id:
-            self.head = self.head.next
-            self.size -= 1
-            return
-        
-        current = self.head
-        while current.next:
-            if current.next.product_id == product_id:
-                current.next = current.next.next
-                self.size -= 1
-                break
-            current = current.next
+        self.items.pop(product_id, None)
     
-    def _remove_last(self):
-        if not self.head:
-            return
-        if not self.head.next:
-            self.head = None
-            self.size = 0
-            return
-        
-        current = self.head
-        while current.next.next:
-            current = current.next
-        current.next = None
-        self.size -= 1
+    def to_items(self):
+        """Newest-first entries with numeric timestamps, used for persistence"""
+        return [
+            {
+                'product_id': node.product_id,
+                'product_name': node.product_name,
+                'image_path': node.image_path,
+                'price': node.price,
+                'viewed_at': node.viewed_at
+            } for node in reversed(self.items.values())
+        ]
     
     def get_history(self):
         history = []
-        current = self.head
-        while current:
+        for node in reversed(self.items.values()):
             history.append({
-                'product_id': current.product_id,
-                'product_name': current.product_name,
-                'image_path': current.image_path,
-                'price': current.price,
-                'timestamp': current.timestamp
+                'product_id': node.product_id,
+                'product_name': node.product_name,
+                'image_path': node.image_path,
+                'price': node.price,
+                'timestamp': datetime.fromtimestamp(node.viewed_at).isoformat()
             })
-            current = current.next
         return history
     
     def to_dict(self):
@@ -178,42 +305,168 @@ class CategoryTree:
         return node_to_dict(self.root)
 
 class OrderQueue:
-    """Queue implementation for order processing"""
-    def __init__(self):
-        self.orders = []
+    """Queue implementation for order processing, kept in the orders table.
+
+    A 'pending' order nobody has claimed is queued, oldest first, so every worker
+    process sees the same queue. dequeue() claims the head inside BEGIN IMMEDIATE,
+    so two workers never hand out the same order.
+    """
+    QUEUED = "status = 'pending' AND claimed_at IS NULL"
+    COLUMNS = "id, user_id, total_amount, status, CAST(strftime('%s', created_at) AS REAL)"
     
-    def enqueue(self, order):
-        self.orders.append(order)
+    def __init__(self, db):
+        self.db = db
+    
+    @staticmethod
+    def _order(row):
+        order_id, user_id, total, status, created_at = row
+        return {'id': order_id, 'user_id': user_id, 'total': total, 'status': status, 'enqueued_at': created_at}
     
     def dequeue(self):
-        if self.orders:
-            return self.orders.pop(0)
-        return None
+        with self.db.transaction() as cursor:
+            row = cursor.execute(f"SELECT {self.COLUMNS} FROM orders WHERE {self.QUEUED} ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            cursor.execute("UPDATE orders SET claimed_at = ? WHERE id = ?", (time.time(), row[0]))
+        return self._order(row)
     
     def peek(self):
-        if self.orders:
-            return self.orders[0]
-        return None
+        rows = self.db.execute_query(f"SELECT {self.COLUMNS} FROM orders WHERE {self.QUEUED} ORDER BY id LIMIT 1")
+        return self._order(rows[0]) if rows else None
     
     def is_empty(self):
-        return len(self.orders) == 0
+        return self.peek() is None
     
     def size(self):
-        return len(self.orders)
+        return self.db.execute_query(f"SELECT COUNT(*) FROM orders WHERE {self.QUEUED}")[0][0]
     
     def get_all_orders(self):
-        return self.orders.copy()
+        rows = self.db.execute_query(f"SELECT {self.COLUMNS} FROM orders WHERE {self.QUEUED} ORDER BY id")
+        return [self._order(row) for row in rows]
+
+# Password hashing (salted KDF in a small process pool, see passwords.py)
+password_hasher = PasswordHasher()
+
+# SQL counters for the slow-request log: per thread, reset at the start of each request
+class QueryStats(threading.local):
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+    
+    def reset(self):
+        self.count = 0
+        self.seconds = 0.0
+
+query_stats = QueryStats()
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that adds its statements and their time to query_stats"""
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            query_stats.count += 1
+            query_stats.seconds += time.perf_counter() - start
+    
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            query_stats.count += 1
+            query_stats.seconds += time.perf_counter() - start
+    
+    # Most of a SELECT's work happens while fetching
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            query_stats.seconds += time.perf_counter() - start
+    
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            query_stats.seconds += time.perf_counter() - start
+    
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            query_stats.seconds += time.perf_counter() - start
+
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+    
+    # The C implementations would bypass TimedCursor.execute
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+# Tables whose old rows move to the archive database, with the columns copied
+ARCHIVED_TABLES = {
+    'orders': 'id, user_id, total_amount, status, shipping_address, contact_number, notes, created_at, item_count',
+    'order_items': 'id, order_id, product_id, quantity, price'
+}
 
 # Database Manager
 class DatabaseManager:
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, archive_path=None):
         self.db_path = db_path or app.config['DATABASE_PATH']
+        self.archive_path = (archive_path or app.config['ARCHIVE_DATABASE_PATH']
+                             or os.path.splitext(self.db_path)[0] + '-archive.db')
+        self.local = threading.local()
         self.init_database()
     
+    def open_connection(self):
+        return sqlite3.connect(self.db_path, factory=TimedConnection)
+    
+    @contextmanager
+    def connect(self):
+        """Yield this thread's shared connection if one is open, else a new short-lived one"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self.open_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    @contextmanager
+    def shared_connection(self):
+        """Route every query of this thread through one connection until the block exits"""
+        if getattr(self.local, 'conn', None) is not None:
+            yield self.local.conn
+            return
+        conn = self.open_connection()
+        self.local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.local.conn = None
+            conn.close()
+    
     def init_database(self):
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        # Readers (request threads, online backups) see a snapshot and never block
+        # the writer; the setting is stored in the file
+        cursor.execute("PRAGMA journal_mode = WAL")
+        
         # Users table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -291,12 +544,89 @@ class DatabaseManager:
             )
         ''')
         
-        # Create default admin user
-        admin_password = self.hash_password("admin123")
+        # Data versions bumped on writes, so conditional GETs can skip the real query
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS data_versions (
+                name VARCHAR(50) PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        
+        # Server-side sessions (the cookie only carries the sid)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                sid VARCHAR(64) PRIMARY KEY,
+                user_id INTEGER,
+                data TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id)")
+        
+        # Recently viewed products per user (JSON list, newest first)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS browsing_history (
+                user_id INTEGER PRIMARY KEY,
+                items TEXT NOT NULL,
+                updated_at REAL,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        ''')
+        
+        # Append-only product view events (feeds trending/popular sorting)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS product_views (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                product_id INTEGER NOT NULL,
+                user_id INTEGER,
+                viewed_at REAL NOT NULL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_product_views_time ON product_views(viewed_at)")
+        
+        # Order events for the SSE streams of every worker (newest SSE_REPLAY_SIZE kept)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS order_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channels TEXT NOT NULL,
+                event TEXT NOT NULL
+            )
+        ''')
+        
+        # Per-customer spending aggregates, maintained by checkout
         cursor.execute('''
-            INSERT OR IGNORE INTO users (username, email, password_hash, role)
-            VALUES (?, ?, ?, ?)
-        ''', ("admin", "admin@ecommerce.com", admin_password, "admin"))
+            CREATE TABLE IF NOT EXISTS customer_stats (
+                user_id INTEGER PRIMARY KEY,
+                order_count INTEGER NOT NULL DEFAULT 0,
+                total_spent DECIMAL(10,2) NOT NULL DEFAULT 0,
+                item_count INTEGER NOT NULL DEFAULT 0,
+                last_order_at TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        ''')
+        
+        # Line item count stored on the order so transaction lists need no join
+        order_columns = [row[1] for row in cursor.execute("PRAGMA table_info(orders)")]
+        if 'item_count' not in order_columns:
+            cursor.execute("ALTER TABLE orders ADD COLUMN item_count INTEGER")
+        
+        # Set when an admin takes a pending order off the processing queue
+        if 'claimed_at' not in order_columns:
+            cursor.execute("ALTER TABLE orders ADD COLUMN claimed_at REAL")
+        
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_user ON orders(user_id, created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_created ON orders(created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)")
+        
+        # Create default admin user (only hash when missing, the KDF is deliberately slow)
+        if not cursor.execute("SELECT 1 FROM users WHERE username = 'admin'").fetchone():
+            admin_password = self.hash_password("admin123")
+            cursor.execute('''
+                INSERT OR IGNORE INTO users (username, email, password_hash, role)
+                VALUES (?, ?, ?, ?)
+            ''', ("admin", "admin@ecommerce.com", admin_password, "admin"))
         
         # Create default categories
         default_categories = [
@@ -315,32 +645,199 @@ class DatabaseManager:
             ''', (cat_id, name, parent_id))
         
         conn.commit()
+        
+        # Backfill aggregates for databases created before customer_stats existed
+        has_stats = cursor.execute("SELECT 1 FROM customer_stats LIMIT 1").fetchone()
+        has_orders = cursor.execute("SELECT 1 FROM orders LIMIT 1").fetchone()
         conn.close()
+        if has_orders and not has_stats:
+            self.rebuild_customer_stats()
+    
+    def has_archive(self):
+        return os.path.exists(self.archive_path)
+    
+    def attach_archive(self, conn):
+        """Attach the archive database as `archive` (creating its tables) unless conn already has it.
+
+        ATTACH is not allowed inside a transaction, so call this before BEGIN.
+        """
+        if any(row[1] == 'archive' for row in conn.execute("PRAGMA database_list")):
+            return
+        conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path,))
+        # Same columns as the hot tables; ids are kept, so no AUTOINCREMENT
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS archive.orders (
+                id INTEGER PRIMARY KEY,
+                user_id INTEGER,
+                total_amount DECIMAL(10,2),
+                status VARCHAR(20),
+                shipping_address TEXT,
+                contact_number VARCHAR(20),
+                notes TEXT,
+                created_at TIMESTAMP,
+                item_count INTEGER
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS archive.order_items (
+                id INTEGER PRIMARY KEY,
+                order_id INTEGER,
+                product_id INTEGER,
+                quantity INTEGER,
+                price DECIMAL(10,2)
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_orders_user ON orders(user_id, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_orders_created ON orders(created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_order_items_order ON order_items(order_id)")
+    
+    def order_tables(self, include_archive=False):
+        """Table expressions for the {orders} and {order_items} placeholders of a history query.
+
+        The hot tables alone, or each unioned with its archive table when asked and an
+        archive exists. SQLite pushes WHERE terms into both halves of the UNION ALL, so
+        the per-user and date indexes are still used on each side.
+        """
+        if not include_archive or not self.has_archive():
+            return {name: name for name in ARCHIVED_TABLES}
+        return {
+            name: f"(SELECT {columns} FROM main.{name} UNION ALL SELECT {columns} FROM archive.{name})"
+            for name, columns in ARCHIVED_TABLES.items()
+        }
+    
+    def execute_history(self, query, params=None, include_archive=False):
+        """execute_query for a query over {orders} / {order_items}, see order_tables()"""
+        tables = self.order_tables(include_archive)
+        with self.connect() as conn:
+            if tables['orders'] != 'orders':
+                self.attach_archive(conn)
+            return conn.execute(query.format(**tables), params or ()).fetchall()
     
     def hash_password(self, password):
-        return hashlib.sha256(password.encode()).hexdigest()
+        return password_hasher.hash(password)
+    
+    def verify_user_password(self, user_id, password):
+        """Check password for user_id, upgrading legacy or outdated hashes on success"""
+        stored = self.execute_query("SELECT password_hash FROM users WHERE id = ?", (user_id,))
+        stored_hash = stored[0][0] if stored else None
+        if not password_hasher.verify(password, stored_hash):
+            return False
+        if password_hasher.needs_rehash(stored_hash):
+            self.execute_query(
+                "UPDATE users SET password_hash = ? WHERE id = ?",
+                (self.hash_password(password), user_id)
+            )
+        return True
+    
+    @contextmanager
+    def transaction(self):
+        """Yield a cursor whose statements commit together or roll back on error"""
+        with self.connect() as conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def record_order_stats(self, cursor, user_id, total, item_count):
+        """Fold a new order into customer_stats inside the caller's transaction"""
+        cursor.execute('''
+            INSERT INTO customer_stats (user_id, order_count, total_spent, item_count, last_order_at)
+            VALUES (?, 1, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(user_id) DO UPDATE SET
+                order_count = order_count + 1,
+                total_spent = total_spent + excluded.total_spent,
+                item_count = item_count + excluded.item_count,
+                last_order_at = excluded.last_order_at
+        ''', (user_id, total, item_count))
+    
+    def rebuild_customer_stats(self):
+        """Recompute orders.item_count and customer_stats from the order history, archive included"""
+        tables = self.order_tables(include_archive=True)
+        with self.shared_connection() as conn:
+            if tables['orders'] != 'orders':
+                self.attach_archive(conn)
+            with self.transaction() as cursor:
+                cursor.execute('''
+                    UPDATE orders SET item_count = (
+                        SELECT COUNT(*) FROM order_items oi WHERE oi.order_id = orders.id
+                    )
+                ''')
+                cursor.execute("DELETE FROM customer_stats")
+                cursor.execute(f'''
+                    INSERT INTO customer_stats (user_id, order_count, total_spent, item_count, last_order_at)
+                    SELECT user_id, COUNT(*), COALESCE(SUM(total_amount), 0),
+                           COALESCE(SUM(item_count), 0), MAX(created_at)
+                    FROM {tables['orders']}
+                    WHERE user_id IS NOT NULL
+                    GROUP BY user_id
+                ''')
+                return cursor.rowcount
     
     def execute_query(self, query, params=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        
-        result = cursor.fetchall()
-        conn.commit()
-        conn.close()
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            
+            result = cursor.fetchall()
+            conn.commit()
         return result
     
+    def bump_versions(self, *names, cursor=None):
+        """Increment data versions (used for ETags) after a write, optionally inside a transaction"""
+        query = '''
+            INSERT INTO data_versions (name, version) VALUES (?, 1)
+            ON CONFLICT(name) DO UPDATE SET version = version + 1
+        '''
+        rows = [(name,) for name in names]
+        if cursor is not None:
+            cursor.executemany(query, rows)
+        else:
+            self.execute_many(query, rows)
+    
+    def get_versions(self, names):
+        placeholders = ','.join('?' for _ in names)
+        versions = dict(self.execute_query(
+            f"SELECT name, version FROM data_versions WHERE name IN ({placeholders})", list(names)
+        ))
+        return [versions.get(name, 0) for name in names]
+    
+    def execute_many(self, query, rows):
+        with self.connect() as conn:
+            conn.executemany(query, rows)
+            conn.commit()
+    
+    def iter_query(self, query, params=None, chunk_size=1000, attach_archive=False):
+        """Yield result rows in chunks of chunk_size, keeping memory constant.
+
+        Always uses its own connection, since a streamed response outlives the request.
+        """
+        conn = self.open_connection()
+        try:
+            if attach_archive:
+                self.attach_archive(conn)
+            cursor = conn.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+    
     def execute_insert(self, query, params):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        last_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            last_id = cursor.lastrowid
+            conn.commit()
         return last_id
 
 # Email Service
@@ -352,55 +849,1790 @@ class EmailService:
         self.admin_email = os.environ.get('ADMIN_EMAIL', 'your_email@gmail.com')
         self.admin_password = os.environ.get('ADMIN_EMAIL_PASSWORD', 'your_app_password')
     
-    def send_order_status_email(self, customer_email, order_id, status, expected_delivery=None):
+    def send_order_status_email(self, customer_email, order_id, status, expected_delivery=None):
+        try:
+            # For development, just log the email instead of sending
+            print(f"📧 EMAIL NOTIFICATION:")
+            print(f"To: {customer_email}")
+            print(f"Subject: Order #{order_id} Status Update")
+            print(f"Status: {status.upper()}")
+            if expected_delivery:
+                print(f"Expected Delivery: {expected_delivery}")
+            print("=" * 50)
+            return True
+        except Exception as e:
+            print(f"Email sending failed: {e}")
+            return False
+
+    def send_order_digest_email(self, customer_email, updates):
+        """Send one email covering several orders, updates is a list of (order_id, status, expected_delivery)"""
+        try:
+            print(f"📧 EMAIL NOTIFICATION:")
+            print(f"To: {customer_email}")
+            print(f"Subject: Status Update for {len(updates)} Orders")
+            for order_id, status, expected_delivery in updates:
+                line = f"Order #{order_id}: {status.upper()}"
+                if expected_delivery:
+                    line += f" (Expected Delivery: {expected_delivery})"
+                print(line)
+            print("=" * 50)
+            return True
+        except Exception as e:
+            print(f"Email sending failed: {e}")
+            return False
+
+class NotificationCoalescer:
+    """Hash table of pending order notifications keyed by customer email.
+
+    Status changes arriving within the window overwrite each other, so only the
+    latest status per order is sent (as a digest for several orders) when it closes.
+    """
+    def __init__(self, email_service, window=None):
+        self.email_service = email_service
+        self.window = window if window is not None else float(os.environ.get('EMAIL_COALESCE_SECONDS', 20))
+        self.pending = {}  # customer_email -> {order_id: (status, expected_delivery)}
+        self.timers = {}
+        self.lock = threading.Lock()
+
+    def notify(self, customer_email, order_id, status, expected_delivery=None):
+        if self.window <= 0:
+            return self.email_service.send_order_status_email(customer_email, order_id, status, expected_delivery)
+
+        with self.lock:
+            orders = self.pending.setdefault(customer_email, {})
+            previous = orders.pop(order_id, None)
+            # Keep a delivery date given earlier unless the new update replaces it
+            if not expected_delivery and previous:
+                expected_delivery = previous[1]
+            orders[order_id] = (status, expected_delivery)
+
+            if customer_email not in self.timers:
+                timer = threading.Timer(self.window, self.flush, args=(customer_email,))
+                timer.daemon = True
+                self.timers[customer_email] = timer
+                timer.start()
+        return True
+
+    def flush(self, customer_email):
+        with self.lock:
+            orders = self.pending.pop(customer_email, {})
+            timer = self.timers.pop(customer_email, None)
+        if timer:
+            timer.cancel()
+
+        if not orders:
+            return False
+        if len(orders) == 1:
+            order_id, (status, expected_delivery) = next(iter(orders.items()))
+            return self.email_service.send_order_status_email(customer_email, order_id, status, expected_delivery)
+
+        updates = [(order_id, status, expected_delivery) for order_id, (status, expected_delivery) in orders.items()]
+        return self.email_service.send_order_digest_email(customer_email, updates)
+
+    def flush_all(self):
+        with self.lock:
+            emails = list(self.pending)
+        for customer_email in emails:
+            self.flush(customer_email)
+
+    def pending_count(self):
+        with self.lock:
+            return sum(len(orders) for orders in self.pending.values())
+
+class BackgroundFlusher:
+    """Daemon thread calling flush() every interval.
+
+    Started on first use and restarted after a fork, so importing the app
+    starts no threads and each worker process gets its own. With immediate=True
+    the first flush() runs as soon as the thread starts.
+    """
+    def __init__(self, name, interval, flush, immediate=False):
+        self.name = name
+        self.interval = interval
+        self.flush = flush
+        self.immediate = immediate
+        self.thread = None
+        self.pid = None
+        self.lock = threading.Lock()
+    
+    def is_running(self):
+        return self.thread is not None and self.pid == os.getpid() and self.thread.is_alive()
+    
+    def ensure_started(self):
+        if self.is_running():
+            return
+        with self.lock:
+            if self.is_running():
+                return
+            self.pid = os.getpid()
+            self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self.thread.start()
+    
+    def _run(self):
+        delay = 0 if self.immediate else self.interval
+        while True:
+            time.sleep(delay)
+            delay = self.interval
+            query_stats.reset()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"{self.name} flush failed: {e}")
+            record_sql(f"background:{self.name}")
+
+# Server-side sessions
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session data kept on the server, the cookie only carries its id"""
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+        
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+        self.rotate = False
+    
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+    
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+    
+    def regenerate(self):
+        """Issue a fresh session id on save (call on login to prevent session fixation)"""
+        self.rotate = True
+        self.modified = True
+
+class SQLiteSessionInterface(SessionInterface):
+    """Session store: in-memory LRU of hot sessions in front of the shared sessions table.
+
+    Changed sessions are written through so every worker sees logins and logouts
+    at once. Plain reads only push the expiry forward, which is written behind in
+    batches together with the sweep of expired rows. Cached entries are re-read
+    after `revalidate` seconds so revocations from other workers take effect.
+    """
+    def __init__(self, db, cache_size=10000, revalidate=5, flush_interval=10, touch_interval=60, sweep_batch=500):
+        self.db = db
+        self.cache_size = cache_size
+        self.revalidate = revalidate
+        self.touch_interval = touch_interval
+        self.sweep_batch = sweep_batch
+        self.cache = OrderedDict()  # sid -> [data, expires_at, loaded_at]
+        self.touched = {}  # sid -> expires_at waiting for write-behind
+        self.lock = threading.Lock()
+        self.flusher = BackgroundFlusher('session-flusher', flush_interval, self.flush)
+    
+    def _cache_put(self, sid, data, expires_at):
+        self.cache[sid] = [data, expires_at, time.time()]
+        self.cache.move_to_end(sid)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+    
+    def _load(self, sid):
+        now = time.time()
+        with self.lock:
+            entry = self.cache.get(sid)
+            if entry and now - entry[2] < self.revalidate:
+                self.cache.move_to_end(sid)
+                return entry[0], entry[1]
+        
+        rows = self.db.execute_query("SELECT data, expires_at FROM sessions WHERE sid = ?", (sid,))
+        with self.lock:
+            if not rows:
+                self.cache.pop(sid, None)
+                self.touched.pop(sid, None)
+                return None, None
+            data, expires_at = json.loads(rows[0][0]), rows[0][1]
+            # A pending write-behind touch may be newer than the stored expiry
+            expires_at = max(expires_at, self.touched.get(sid, 0))
+            self._cache_put(sid, data, expires_at)
+            return data, expires_at
+    
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data, expires_at = self._load(sid)
+            if data is not None and expires_at > time.time():
+                return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+    
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        
+        if session.accessed:
+            response.vary.add('Cookie')
+        
+        if not session:
+            if session.modified and not session.new:
+                self.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        
+        if session.rotate and not session.new:
+            self.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+        
+        now = time.time()
+        expires_at = now + app.permanent_session_lifetime.total_seconds()
+        
+        if session.modified or session.new:
+            data = dict(session)
+            self.db.execute_query('''
+                INSERT OR REPLACE INTO sessions (sid, user_id, data, expires_at)
+                VALUES (?, ?, ?, ?)
+            ''', (session.sid, data.get('user_id'), json.dumps(data), expires_at))
+            with self.lock:
+                self._cache_put(session.sid, data, expires_at)
+                self.touched.pop(session.sid, None)
+        else:
+            self._touch(session.sid, expires_at)
+        
+        if session.modified or session.new or self.should_set_cookie(app, session):
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app)
+            )
+    
+    def _touch(self, sid, expires_at):
+        with self.lock:
+            entry = self.cache.get(sid)
+            if entry is None or expires_at - entry[1] < self.touch_interval:
+                return
+            entry[1] = expires_at
+            self.touched[sid] = expires_at
+        self.flusher.ensure_started()
+    
+    def delete(self, sid):
+        with self.lock:
+            self.cache.pop(sid, None)
+            self.touched.pop(sid, None)
+        self.db.execute_query("DELETE FROM sessions WHERE sid = ?", (sid,))
+    
+    def revoke_user(self, user_id, keep_sid=None):
+        """Log a user out everywhere (other workers notice within `revalidate` seconds)"""
+        self.db.execute_query(
+            "DELETE FROM sessions WHERE user_id = ? AND sid != ?", (user_id, keep_sid or '')
+        )
+        with self.lock:
+            for sid in [sid for sid, entry in self.cache.items() if entry[0].get('user_id') == user_id]:
+                if sid != keep_sid:
+                    self.cache.pop(sid, None)
+                    self.touched.pop(sid, None)
+    
+    def flush(self):
+        """Write pending expiry extensions and sweep expired sessions in batches"""
+        with self.lock:
+            touched, self.touched = self.touched, {}
+        
+        if touched:
+            with self.db.transaction() as cursor:
+                cursor.executemany(
+                    "UPDATE sessions SET expires_at = MAX(expires_at, ?) WHERE sid = ?",
+                    [(expires_at, sid) for sid, expires_at in touched.items()]
+                )
+        
+        # One transaction per batch, so requests get the write lock in between
+        now = time.time()
+        while True:
+            with self.db.transaction() as cursor:
+                cursor.execute('''
+                    DELETE FROM sessions WHERE sid IN (
+                        SELECT sid FROM sessions WHERE expires_at < ? LIMIT ?
+                    )
+                ''', (now, self.sweep_batch))
+                deleted = cursor.rowcount
+            if deleted < self.sweep_batch:
+                break
+
+# Browsing history store
+def merge_history_items(*item_lists, max_size=5):
+    """Merge persisted history item lists, keeping the latest view of each product"""
+    latest = {}
+    for items in item_lists:
+        for item in items:
+            if 'viewed_at' not in item:
+                # Rows written before timestamps became numeric
+                item = dict(item)
+                item['viewed_at'] = datetime.fromisoformat(item.pop('timestamp')).timestamp()
+            current = latest.get(item['product_id'])
+            if current is None or item['viewed_at'] > current['viewed_at']:
+                latest[item['product_id']] = item
+    merged = sorted(latest.values(), key=lambda item: item['viewed_at'], reverse=True)
+    return merged[:max_size]
+
+class BrowsingHistoryStore:
+    """Hash table of per-user BrowsingHistory with LRU eviction and write-behind persistence.
+
+    Histories load lazily from the browsing_history table on a miss. Views only
+    mark the user dirty; a background flusher merges dirty histories with the
+    stored rows (so views recorded by other workers survive) and writes them in
+    one batch.
+    """
+    def __init__(self, db, max_users=None, max_size=None, flush_interval=5):
+        self.db = db
+        self.max_users = max_users or int(os.environ.get('BROWSING_HISTORY_CACHE_USERS', 10000))
+        self.max_size = max_size or app.config['BROWSING_HISTORY_SIZE']
+        self.histories = OrderedDict()  # user_id -> BrowsingHistory, least recently used first
+        self.dirty = {}  # user_id -> BrowsingHistory waiting for write-behind (kept even if evicted)
+        self.lock = threading.Lock()
+        self.flusher = BackgroundFlusher('history-flusher', flush_interval, self.flush)
+    
+    def _from_items(self, items):
+        history = BrowsingHistory(self.max_size)
+        for item in reversed(merge_history_items(items, max_size=self.max_size)):
+            history.add_product(item['product_id'], item['product_name'], item['image_path'],
+                                item['price'], item['viewed_at'])
+        return history
+    
+    def _cache(self, user_id, history):
+        self.histories[user_id] = history
+        self.histories.move_to_end(user_id)
+        while len(self.histories) > self.max_users:
+            self.histories.popitem(last=False)
+    
+    def get(self, user_id):
+        with self.lock:
+            history = self.histories.get(user_id) or self.dirty.get(user_id)
+            if history is not None:
+                self._cache(user_id, history)
+                return history
+        
+        rows = self.db.execute_query("SELECT items FROM browsing_history WHERE user_id = ?", (user_id,))
+        loaded = self._from_items(json.loads(rows[0][0]) if rows else [])
+        with self.lock:
+            # Another thread may have loaded or updated it while we were reading
+            history = self.histories.get(user_id) or self.dirty.get(user_id) or loaded
+            self._cache(user_id, history)
+            return history
+    
+    def record_view(self, user_id, product_id, product_name, image_path=None, price=None):
+        history = self.get(user_id)
+        with self.lock:
+            history.add_product(product_id, product_name, image_path, price)
+            self.dirty[user_id] = history
+        self.flusher.ensure_started()
+    
+    def flush(self):
+        with self.lock:
+            if not self.dirty:
+                return 0
+            dirty, self.dirty = self.dirty, {}
+            snapshots = {user_id: history.to_items() for user_id, history in dirty.items()}
+        
+        user_ids = list(snapshots)
+        placeholders = ','.join('?' for _ in user_ids)
+        now = time.time()
+        try:
+            with self.db.transaction() as cursor:
+                stored = dict(cursor.execute(
+                    f"SELECT user_id, items FROM browsing_history WHERE user_id IN ({placeholders})", user_ids
+                ).fetchall())
+                merged = {
+                    user_id: merge_history_items(items, json.loads(stored.get(user_id, '[]')), max_size=self.max_size)
+                    for user_id, items in snapshots.items()
+                }
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO browsing_history (user_id, items, updated_at) VALUES (?, ?, ?)",
+                    [(user_id, json.dumps(items), now) for user_id, items in merged.items()]
+                )
+        except Exception:
+            # Put the histories back so the next flush retries them
+            with self.lock:
+                for user_id, history in dirty.items():
+                    self.dirty.setdefault(user_id, history)
+            raise
+        
+        # Pick up views other workers recorded, unless this worker changed the history meanwhile
+        with self.lock:
+            for user_id, items in merged.items():
+                history = self.histories.get(user_id)
+                if history is not None and user_id not in self.dirty and history.to_items() == snapshots[user_id]:
+                    self.histories[user_id] = self._from_items(items)
+        return len(merged)
+    
+    def __len__(self):
+        return len(self.histories)
+
+# Product view events and popularity
+class ProductViewLog:
+    """Ring buffer of product view events with time-decayed popularity scores.
+
+    Views are appended to a bounded deque on the request path; a background
+    flusher writes them to the append-only product_views table in one batch and
+    folds them into per-product scores that halve every `half_life` seconds.
+    Scores are periodically rebuilt from the table so views handled by other
+    workers count too; the flusher does the first rebuild as soon as it starts,
+    and each rebuild deletes views older than `horizon`, which no longer move
+    any score.
+    """
+    def __init__(self, db, capacity=10000, flush_interval=5, half_life=None, resync_interval=300, prune_batch=5000):
+        self.db = db
+        self.buffer = deque(maxlen=capacity)  # oldest events are dropped if the flusher falls behind
+        self.half_life = half_life or float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 24)) * 3600
+        self.horizon = 8 * self.half_life  # older views weigh under 0.4% of a new one
+        self.resync_interval = resync_interval
+        self.prune_batch = prune_batch
+        self.scores = {}  # product_id -> (score, as_of)
+        self.synced_at = 0
+        self.lock = threading.Lock()
+        self.flusher = BackgroundFlusher('view-log-flusher', flush_interval, self.flush, immediate=True)
+    
+    def record(self, product_id, user_id=None):
+        self.buffer.append((product_id, user_id, time.time()))
+        self.flusher.ensure_started()
+    
+    def _decayed(self, score, as_of, now):
+        return score * 0.5 ** ((now - as_of) / self.half_life)
+    
+    def _bump(self, product_id, amount, at):
+        score, as_of = self.scores.get(product_id, (0.0, at))
+        if at >= as_of:
+            self.scores[product_id] = (self._decayed(score, as_of, at) + amount, at)
+        else:
+            self.scores[product_id] = (score + self._decayed(amount, at, as_of), as_of)
+    
+    def resync(self):
+        """Rebuild scores from the last few half-lives of stored views, grouped per hour"""
+        now = time.time()
+        rows = self.db.execute_query('''
+            SELECT product_id, CAST(viewed_at / 3600 AS INTEGER) AS hour, COUNT(*)
+            FROM product_views
+            WHERE viewed_at >= ?
+            GROUP BY product_id, hour
+        ''', (now - self.horizon,))
+        scores = {}
+        for product_id, hour, count in rows:
+            score = scores.get(product_id, 0.0)
+            scores[product_id] = score + self._decayed(count, min(hour * 3600 + 1800, now), now)
+        with self.lock:
+            self.scores = {product_id: (score, now) for product_id, score in scores.items()}
+            self.synced_at = now
+    
+    def prune(self):
+        """Delete stored views older than the horizon, one transaction per batch"""
+        cutoff = time.time() - self.horizon
+        deleted = 0
+        while True:
+            with self.db.transaction() as cursor:
+                cursor.execute('''
+                    DELETE FROM product_views WHERE id IN (
+                        SELECT id FROM product_views WHERE viewed_at < ? LIMIT ?
+                    )
+                ''', (cutoff, self.prune_batch))
+                batch = cursor.rowcount
+            deleted += batch
+            if batch < self.prune_batch:
+                return deleted
+    
+    def flush(self):
+        events = []
+        while True:
+            try:
+                events.append(self.buffer.popleft())
+            except IndexError:
+                break
+        
+        if events:
+            self.db.execute_many(
+                "INSERT INTO product_views (product_id, user_id, viewed_at) VALUES (?, ?, ?)", events
+            )
+        
+        if time.time() - self.synced_at > self.resync_interval:
+            self.prune()
+            self.resync()
+        elif events:
+            with self.lock:
+                for product_id, _, viewed_at in events:
+                    self._bump(product_id, 1.0, viewed_at)
+        return len(events)
+    
+    def score(self, product_id, now=None):
+        entry = self.scores.get(product_id)
+        if not entry:
+            return 0.0
+        return self._decayed(entry[0], entry[1], now or time.time())
+    
+    def trending(self, limit=10):
+        """Return [(product_id, score)] for the most popular products right now"""
+        self.flusher.ensure_started()  # empty until its first resync, moments after worker start
+        now = time.time()
+        with self.lock:
+            scores = list(self.scores.items())
+        # Scores were last updated at different times, so decay them all to now before ranking
+        ranked = heapq.nlargest(limit, ((self._decayed(score, as_of, now), product_id)
+                                        for product_id, (score, as_of) in scores))
+        return [(product_id, score) for score, product_id in ranked if score > 0]
+
+# Admission control
+class RateLimiter:
+    """Token buckets keyed by (budget, client) in a bounded, expiring map.
+
+    A bucket idle long enough to refill completely is equivalent to a new one,
+    so it is dropped; past max_keys the least recently used bucket goes first.
+    """
+    def __init__(self, max_keys=50000):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()  # key -> [tokens, updated_at, full_after]
+        self.lock = threading.Lock()
+    
+    def consume(self, key, rate, burst):
+        """Take one token; return 0 if allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = [float(burst), now, 0.0]
+                self.buckets[key] = bucket
+            else:
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+                self.buckets.move_to_end(key)
+            
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                retry_after = 0
+            else:
+                retry_after = (1 - bucket[0]) / rate
+            bucket[2] = now + (burst - bucket[0]) / rate
+            
+            self._expire(now)
+        return retry_after
+    
+    def _expire(self, now):
+        # Oldest entries sit at the front; stop at the first one still refilling
+        while self.buckets:
+            key, bucket = next(iter(self.buckets.items()))
+            if len(self.buckets) <= self.max_keys and bucket[2] > now:
+                break
+            self.buckets.popitem(last=False)
+    
+    def __len__(self):
+        return len(self.buckets)
+
+# Live order updates
+class Subscription:
+    """One stream's bounded event buffer (the oldest event is dropped when full)"""
+    __slots__ = ('channel', 'events', 'dropped', 'ready')
+
+    def __init__(self, channel, buffer_size):
+        self.channel = channel
+        self.events = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.ready = threading.Event()
+
+    def push(self, event):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(event)
+        self.ready.set()
+
+    def drain(self, timeout):
+        """Wait up to timeout for events; return (events, dropped count) and reset both"""
+        self.ready.wait(timeout)
+        self.ready.clear()
+        events = []
+        while self.events:
+            events.append(self.events.popleft())
+        dropped, self.dropped = self.dropped, 0
+        return events, dropped
+
+class OrderEventBroker:
+    """Pub/sub for order events across worker processes, fanned out per channel.
+
+    Channels are 'admin' (every event) and 'user:<id>' (that customer's orders).
+    publish() appends to the order_events table, inside the caller's transaction
+    when given its cursor, so event ids are global and a stream can resume from
+    Last-Event-ID on any worker. While this process holds streams, a poller
+    thread reads new events every poll_interval and pushes them to its
+    subscribers. The newest replay_size events are kept for reconnects.
+    """
+    def __init__(self, database, buffer_size=None, max_subscribers=None, replay_size=None, poll_interval=None):
+        self.db = database
+        self.buffer_size = buffer_size or int(os.environ.get('SSE_BUFFER_SIZE', 100))
+        # Each stream holds a server thread; keep well below the threads per worker (gunicorn.conf.py)
+        self.max_subscribers = max_subscribers or int(os.environ.get('SSE_MAX_SUBSCRIBERS', 4))
+        self.replay_size = replay_size or int(os.environ.get('SSE_REPLAY_SIZE', 1000))
+        self.poll_interval = poll_interval or float(os.environ.get('SSE_POLL_SECONDS', 0.5))
+        self.subscribers = {}  # channel -> set of Subscription
+        self.count = 0
+        self.last_id = None  # newest event pushed to subscribers; None while there are none
+        self.lock = threading.Lock()
+        self.poller = BackgroundFlusher('order-event-poller', self.poll_interval, self.poll)
+
+    def subscribe(self, channel, last_event_id=None):
+        """Register a stream; returns None when max_subscribers are already connected"""
+        with self.lock:
+            if self.count >= self.max_subscribers:
+                return None
+            if self.last_id is None:
+                self.last_id = self.db.execute_query("SELECT COALESCE(MAX(id), 0) FROM order_events")[0][0]
+            subscription = Subscription(channel, self.buffer_size)
+            self.subscribers.setdefault(channel, set()).add(subscription)
+            self.count += 1
+
+            if last_event_id is not None and last_event_id < self.last_id:
+                oldest = self.db.execute_query("SELECT MIN(id) FROM order_events")[0][0]
+                if oldest is None or oldest > last_event_id + 1:
+                    subscription.dropped += 1  # gap older than the replay window
+                for event_id, channels, event in self.db.execute_query(
+                    "SELECT id, channels, event FROM order_events WHERE id > ? AND id <= ? ORDER BY id",
+                    (last_event_id, self.last_id)
+                ):
+                    if channel in channels.split():
+                        subscription.push((event_id, json.loads(event)))
+        self.poller.ensure_started()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscribers.get(subscription.channel)
+            if subscribers and subscription in subscribers:
+                subscribers.discard(subscription)
+                self.count -= 1
+                if not subscribers:
+                    del self.subscribers[subscription.channel]
+
+    def poll(self):
+        """Push events published since the last poll, by any process, to this process's streams"""
+        with self.lock:
+            if not self.count:
+                self.last_id = None
+                return
+            rows = self.db.execute_query(
+                "SELECT id, channels, event FROM order_events WHERE id > ? ORDER BY id", (self.last_id,)
+            )
+            for event_id, channels, event in rows:
+                event = json.loads(event)
+                for channel in channels.split():
+                    for subscription in self.subscribers.get(channel, ()):
+                        subscription.push((event_id, event))
+                self.last_id = event_id
+
+    def publish(self, event, channels, cursor=None):
+        """Record event for channels and return its id.
+
+        With cursor the event commits (or rolls back) with the caller's transaction
+        and reaches streams on the next poll; without, it is pushed to this
+        process's streams right away.
+        """
+        if cursor is None:
+            with self.db.transaction() as cursor:
+                event_id = self.publish(event, channels, cursor)
+            self.poll()
+            return event_id
+        cursor.execute("INSERT INTO order_events (channels, event) VALUES (?, ?)",
+                       (' '.join(channels), json.dumps(event)))
+        event_id = cursor.lastrowid
+        if event_id % 100 == 0:
+            cursor.execute("DELETE FROM order_events WHERE id <= ?", (event_id - self.replay_size,))
+        return event_id
+
+    def publish_order(self, kind, order_id, user_id, status, previous_status=None, cursor=None, **extra):
+        event = {
+            'type': kind,
+            'order_id': order_id,
+            'status': status,
+            'previous_status': previous_status,
+            'at': datetime.now().isoformat(timespec='seconds')
+        }
+        event.update(extra)
+        channels = ('admin', f'user:{user_id}') if user_id is not None else ('admin',)
+        return self.publish(event, channels, cursor)
+
+    def __len__(self):
+        return self.count
+
+# Process-wide services
+class ServiceRegistry:
+    """Named services, each built by its factory on first use.
+
+    Importing the app therefore opens no database and starts no threads.
+    reset() drops services so a forked worker builds its own instead of
+    inheriting the parent's buffers, timers and subscribers.
+    """
+    def __init__(self):
+        self.factories = {}
+        self.instances = {}
+        self.lock = threading.RLock()
+    
+    def register(self, name, factory):
+        self.factories[name] = factory
+    
+    def get(self, name):
+        instance = self.instances.get(name)
+        if instance is not None:
+            return instance
+        with self.lock:
+            if name not in self.instances:
+                self.instances[name] = self.factories[name]()
+            return self.instances[name]
+    
+    def built(self, name):
+        """Return the service if this process already created it, else None"""
+        return self.instances.get(name)
+    
+    def reset(self, keep=()):
+        with self.lock:
+            for name in list(self.instances):
+                if name not in keep:
+                    del self.instances[name]
+
+services = ServiceRegistry()
+
+def service(name):
+    """Register the decorated factory and return a lazy proxy to its service"""
+    def decorator(factory):
+        services.register(name, factory)
+        return LocalProxy(functools.partial(services.get, name))
+    return decorator
+
+@service('db')
+def db():
+    os.makedirs(os.path.dirname(app.config['DATABASE_PATH']), exist_ok=True)
+    return DatabaseManager(app.config['DATABASE_PATH'])
+
+@service('history_store')
+def history_store():
+    return BrowsingHistoryStore(db)
+
+@service('product_views')
+def product_views():
+    return ProductViewLog(db)
+
+@service('email_service')
+def email_service():
+    return EmailService()
+
+@service('notification_coalescer')
+def notification_coalescer():
+    return NotificationCoalescer(email_service)
+
+@service('category_tree')
+def category_tree():
+    return CategoryTreeCache()
+
+@service('order_queue')
+def order_queue():
+    return OrderQueue(db)
+
+@service('order_events')
+def order_events():
+    return OrderEventBroker(db)
+
+app.session_interface = SQLiteSessionInterface(db)
+
+class AdminSummaryCache:
+    """Short-TTL cache of admin dashboard KPIs, adjusted in place on order writes
+
+    Order counts include archived orders (see OrderArchiver), so archival does not
+    change them; the archive is only recounted when its file has changed.
+    """
+    def __init__(self, ttl=None, low_stock_threshold=None):
+        self.ttl = ttl if ttl is not None else float(os.environ.get('ADMIN_SUMMARY_TTL', 30))
+        self.low_stock_threshold = low_stock_threshold if low_stock_threshold is not None else int(os.environ.get('LOW_STOCK_THRESHOLD', 5))
+        self.data = None
+        self.loaded_at = 0
+        self.archived = None  # (archive file mtime, {status: count})
+        self.lock = threading.Lock()
+    
+    def _archived_counts(self):
+        if not db.has_archive():
+            return {}
+        mtime = os.stat(db.archive_path).st_mtime_ns
+        if self.archived is None or self.archived[0] != mtime:
+            with db.connect() as conn:
+                db.attach_archive(conn)
+                counts = dict(conn.execute("SELECT status, COUNT(*) FROM archive.orders GROUP BY status"))
+            self.archived = (mtime, counts)
+        return self.archived[1]
+    
+    def _compute(self):
+        product_count, active_count, low_stock_count = db.execute_query('''
+            SELECT COUNT(*), COALESCE(SUM(is_active = 1), 0), COALESCE(SUM(is_active = 1 AND stock <= ?), 0)
+            FROM products
+        ''', (self.low_stock_threshold,))[0]
+        
+        orders_by_status = dict(db.execute_query("SELECT status, COUNT(*) FROM orders GROUP BY status"))
+        archived = self._archived_counts()
+        for status, count in archived.items():
+            orders_by_status[status] = orders_by_status.get(status, 0) + count
+        
+        day, month, revenue_today, revenue_month = db.execute_query('''
+            SELECT date('now'), strftime('%Y-%m', 'now'),
+                   COALESCE(SUM(CASE WHEN created_at >= date('now') THEN total_amount END), 0),
+                   COALESCE(SUM(total_amount), 0)
+            FROM orders
+            WHERE created_at >= date('now', 'start of month') AND status != 'cancelled'
+        ''')[0]
+        
+        customer_count = db.execute_query("SELECT COUNT(*) FROM users WHERE role = 'customer'")[0][0]
+        
+        return {
+            'product_count': product_count,
+            'active_product_count': active_count,
+            'low_stock_count': low_stock_count,
+            'low_stock_threshold': self.low_stock_threshold,
+            'orders_by_status': orders_by_status,
+            'archived_order_count': sum(archived.values()),
+            'revenue_today': revenue_today,
+            'revenue_month': revenue_month,
+            'customer_count': customer_count,
+            'day': day,
+            'month': month
+        }
+    
+    def _is_fresh(self):
+        return (self.data is not None
+                and time.time() - self.loaded_at < self.ttl
+                and self.data['day'] == datetime.utcnow().strftime('%Y-%m-%d'))
+    
+    def get(self):
+        with self.lock:
+            if not self._is_fresh():
+                self.data = self._compute()
+                self.loaded_at = time.time()
+            summary = dict(self.data, orders_by_status=dict(self.data['orders_by_status']))
+        
+        summary['order_count'] = sum(summary['orders_by_status'].values())
+        summary['revenue_today_formatted'] = format_peso(summary['revenue_today'])
+        summary['revenue_month_formatted'] = format_peso(summary['revenue_month'])
+        return summary
+    
+    def record_order(self, total):
+        """A new pending order was placed just now"""
+        with self.lock:
+            if self._is_fresh():
+                statuses = self.data['orders_by_status']
+                statuses['pending'] = statuses.get('pending', 0) + 1
+                self.data['revenue_today'] += total
+                self.data['revenue_month'] += total
+    
+    def record_status_change(self, old_status, new_status):
+        # Revenue only moves when an order enters or leaves 'cancelled', so recompute then
+        with self.lock:
+            if not self._is_fresh() or old_status == new_status:
+                return
+            if 'cancelled' in (old_status, new_status):
+                self.data = None
+                return
+            statuses = self.data['orders_by_status']
+            if statuses.get(old_status, 0) > 1:
+                statuses[old_status] -= 1
+            else:
+                statuses.pop(old_status, None)
+            statuses[new_status] = statuses.get(new_status, 0) + 1
+    
+    def invalidate(self):
+        with self.lock:
+            self.data = None
+
+@service('admin_summary')
+def admin_summary():
+    return AdminSummaryCache()
+
+@service('sales_analytics')
+def sales_analytics():
+    # Imported here so NumPy is only loaded by processes that serve analytics
+    from analytics import SalesAnalytics
+    directory = app.config['ANALYTICS_DIR'] or os.path.splitext(app.config['DATABASE_PATH'])[0] + '-analytics'
+    return SalesAnalytics(app.config['DATABASE_PATH'], directory, archive_path=db.archive_path)
+
+@service('analytics_refresher')
+def analytics_refresher():
+    # Runs in every worker that serves analytics; only one at a time gets to extend the snapshot
+    return BackgroundFlusher('analytics-refresher', sales_analytics.refresh_interval, sales_analytics.refresh,
+                             immediate=True)
+
+# Data export (streamed in chunks for reporting)
+EXPORT_DATASETS = {
+    'orders': {
+        'columns': ['id', 'user_id', 'username', 'email', 'total_amount', 'status',
+                    'shipping_address', 'contact_number', 'notes', 'item_count', 'created_at'],
+        'query': '''
+            SELECT o.id, o.user_id, u.username, u.email, o.total_amount, o.status,
+                   o.shipping_address, o.contact_number, o.notes, o.item_count, o.created_at
+            FROM {orders} o
+            LEFT JOIN users u ON u.id = o.user_id
+        ''',
+        'date_column': 'o.created_at',
+        'order_by': 'o.id'
+    },
+    'order_items': {
+        'columns': ['id', 'order_id', 'product_id', 'product_name', 'quantity', 'price', 'order_created_at'],
+        'query': '''
+            SELECT oi.id, oi.order_id, oi.product_id, p.name, oi.quantity, oi.price, o.created_at
+            FROM {order_items} oi
+            JOIN {orders} o ON o.id = oi.order_id
+            LEFT JOIN products p ON p.id = oi.product_id
+        ''',
+        'date_column': 'o.created_at',
+        'order_by': 'oi.id'
+    },
+    'customers': {
+        'columns': ['id', 'username', 'email', 'created_at', 'order_count', 'total_spent',
+                    'item_count', 'last_order_at'],
+        'query': '''
+            SELECT u.id, u.username, u.email, u.created_at,
+                   COALESCE(cs.order_count, 0), COALESCE(cs.total_spent, 0),
+                   COALESCE(cs.item_count, 0), cs.last_order_at
+            FROM users u
+            LEFT JOIN customer_stats cs ON cs.user_id = u.id
+            WHERE u.role = 'customer'
+        ''',
+        'date_column': 'u.created_at',
+        'order_by': 'u.id'
+    }
+}
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+def iter_export(dataset, fmt='csv', start=None, end=None, chunk_size=1000, include_archive=False):
+    """Return a generator of export text chunks; start/end are inclusive 'YYYY-MM-DD' dates"""
+    if dataset not in EXPORT_DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}', expected one of {', '.join(EXPORT_DATASETS)}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+    
+    spec = EXPORT_DATASETS[dataset]
+    conditions = []
+    params = []
+    if start:
+        conditions.append(f"{spec['date_column']} >= date(?)")
+        params.append(start)
+    if end:
+        conditions.append(f"{spec['date_column']} < date(?, '+1 day')")
+        params.append(end)
+    
+    tables = db.order_tables(include_archive)
+    query = spec['query'].format(**tables)
+    if conditions:
+        query += (' AND ' if 'WHERE' in query else ' WHERE ') + ' AND '.join(conditions)
+    query += f" ORDER BY {spec['order_by']}"
+    
+    # Validation above runs eagerly; the rows are only read as the caller iterates
+    return _stream_export(query, params, spec['columns'], fmt, chunk_size, tables['orders'] != 'orders')
+
+def _stream_export(query, params, columns, fmt, chunk_size, attach_archive=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        writer.writerow(columns)
+        yield buffer.getvalue()
+    
+    for rows in db.iter_query(query, params, chunk_size, attach_archive):
+        buffer.seek(0)
+        buffer.truncate()
+        if fmt == 'csv':
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                buffer.write(json.dumps(dict(zip(columns, row)), default=str))
+                buffer.write('\n')
+        yield buffer.getvalue()
+
+# Load categories into tree and add ALL products to each category
+def load_categories(tree):
+    categories = db.execute_query("SELECT id, name, parent_id FROM categories ORDER BY parent_id, id")
+    for cat_id, name, parent_id in categories:
+        tree.add_category(cat_id, name, parent_id)
+    
+    # Load products into categories
+    products = db.execute_query("SELECT id, category_id FROM products WHERE is_active = 1")
+    for product_id, category_id in products:
+        category_node = tree.get_category(category_id)
+        if category_node:
+            category_node.add_product(product_id)
+        
+        # IMPORTANT: Add ALL products to the root "All Categories" node
+        root_category = tree.get_category(0)
+        if root_category:
+            root_category.add_product(product_id)
+
+class CategoryTreeCache:
+    """The category tree, rebuilt when the 'categories' data version moves.
+
+    Admin product edits bump that version instead of patching the tree, so every
+    worker (each holds its own copy after the fork) picks them up on next use.
+    """
+    def __init__(self):
+        self.tree = None
+        self.version = None
+        self.lock = threading.Lock()
+        self.current()
+    
+    def current(self):
+        version = db.get_versions(['categories'])[0]
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    tree = CategoryTree()
+                    load_categories(tree)
+                    self.tree, self.version = tree, version
+        return self.tree
+
+# File upload configuration
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def too_many_requests(retry_after, message='Too many requests, please try again shortly', status=429):
+    response = jsonify({'success': False, 'message': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+def rate_limited(budget, when=None):
+    """Apply the RATE_LIMITS budget to a route, keyed on the session user or client IP.
+
+    `when` can restrict the limit to expensive variants of a route (e.g. searches).
+    """
+    concurrency = {}
+    
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(*args, **kwargs):
+            if not app.config['RATELIMIT_ENABLED'] or (when and not when()):
+                return view(*args, **kwargs)
+            
+            rate, burst, max_concurrent = app.config['RATE_LIMITS'][budget]
+            client = f"user:{session['user_id']}" if 'user_id' in session else f"ip:{request.remote_addr}"
+            retry_after = rate_limiter.consume((budget, client), rate, burst)
+            if retry_after:
+                return too_many_requests(retry_after)
+            
+            if not max_concurrent:
+                return view(*args, **kwargs)
+            
+            # Shed load before requests pile up waiting on the database
+            semaphore = concurrency.get(max_concurrent)
+            if semaphore is None:
+                semaphore = concurrency.setdefault(max_concurrent, threading.BoundedSemaphore(max_concurrent))
+            if not semaphore.acquire(blocking=False):
+                return too_many_requests(1, 'Server busy, please try again shortly', 503)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                semaphore.release()
+        return wrapped
+    return decorator
+
+@service('rate_limiter')
+def rate_limiter():
+    return RateLimiter()
+
+# Metrics (Prometheus text format)
+def format_metric_value(value):
+    if value == math.inf:
+        return '+Inf'
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+def format_metric_labels(names, values, extra=None):
+    pairs = [(name, value) for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+class Metric:
+    """One metric family: values keyed by a tuple of label values.
+
+    Updates take a per-metric lock for a dict lookup and an add, nothing more.
+    Metrics built with collect=func have no stored values; func() is called
+    when a snapshot is taken and returns a number or {label tuple: number}.
+    """
+    kind = 'untyped'
+    
+    def __init__(self, name, documentation, labels=(), collect=None):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.collect = collect
+        self.values = {}
+        self.lock = threading.Lock()
+    
+    def snapshot(self):
+        if self.collect is not None:
+            collected = self.collect()
+            items = collected.items() if isinstance(collected, dict) else [((), collected)]
+        else:
+            with self.lock:
+                items = [(labels, self.copy(value)) for labels, value in self.values.items()]
+        return [[list(labels), value] for labels, value in items]
+    
+    def copy(self, value):
+        return value
+    
+    def combine(self, total, value):
+        return total + value
+    
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+    
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{format_metric_labels(self.labels, labels)} {format_metric_value(value)}")
+        return lines
+
+class Counter(Metric):
+    kind = 'counter'
+    
+    def inc(self, labels=(), amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+class Gauge(Metric):
+    """aggregate='sum' adds up the workers' values, 'max' keeps the largest"""
+    kind = 'gauge'
+    
+    def __init__(self, name, documentation, labels=(), collect=None, aggregate='sum'):
+        super().__init__(name, documentation, labels, collect)
+        self.aggregate = aggregate
+    
+    def inc(self, labels=(), amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+    
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+    
+    def combine(self, total, value):
+        return max(total, value) if self.aggregate == 'max' else total + value
+
+class Histogram(Metric):
+    kind = 'histogram'
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+    
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                # One count per bucket plus +Inf (not cumulative), then the sum
+                counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+    
+    def copy(self, value):
+        return list(value)
+    
+    def combine(self, total, value):
+        return [a + b for a, b in zip(total, value)]
+    
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, counts in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = ('le', format_metric_value(bound))
+                lines.append(f"{self.name}_bucket{format_metric_labels(self.labels, labels, le)} {cumulative}")
+            label_text = format_metric_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{label_text} {format_metric_value(counts[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+def process_alive(pid):
+    if pid == os.getpid() or fcntl is None:  # without POSIX semantics, assume alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class MetricsRegistry:
+    """Process-local metrics, combined across worker processes through snapshot files.
+
+    Every METRICS_FLUSH_SECONDS, on each scrape and at exit, a worker writes all
+    its values to METRICS_DIR/<pid>-<token>.json. A scrape merges every file.
+    Counters and histograms of exited workers are folded into retired.json, so
+    totals never go backwards; gauges of exited workers are dropped.
+    """
+    RETIRED = 'retired.json'
+    
+    def __init__(self, flush_interval=None):
+        self.metrics = {}
+        self.process = None  # (pid, snapshot file name) of the process that owns the values
+        interval = flush_interval or float(os.environ.get('METRICS_FLUSH_SECONDS', 5))
+        self.flusher = BackgroundFlusher('metrics-flusher', interval, self.write_snapshot)
+    
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name, documentation, labels=(), collect=None):
+        return self.register(Counter(name, documentation, labels, collect))
+    
+    def gauge(self, name, documentation, labels=(), collect=None, aggregate='sum'):
+        return self.register(Gauge(name, documentation, labels, collect, aggregate))
+    
+    def histogram(self, name, documentation, labels=(), buckets=Histogram.DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+    
+    def reset(self):
+        """Forget values inherited from the parent process (each new worker calls this)"""
+        for metric in self.metrics.values():
+            metric.reset()
+        self.process = None
+    
+    def has_values(self):
+        """True once this process has recorded anything (scripts importing the app never do)"""
+        return any(metric.values for metric in self.metrics.values())
+    
+    def snapshot_path(self):
+        if self.process is None or self.process[0] != os.getpid():
+            pid = os.getpid()
+            self.process = (pid, f"{pid}-{uuid.uuid4().hex[:8]}.json")
+        return os.path.join(app.config['METRICS_DIR'], self.process[1])
+    
+    def write_snapshot(self):
+        path = self.snapshot_path()
+        data = {'pid': os.getpid(), 'metrics': {name: metric.snapshot() for name, metric in self.metrics.items()}}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temporary, path)
+    
+    def read_snapshots(self):
+        """[(file name, snapshot)] for every readable snapshot in METRICS_DIR"""
+        directory = app.config['METRICS_DIR']
+        snapshots = []
+        for filename in os.listdir(directory):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                    snapshots.append((filename, json.load(f)))
+            except (OSError, ValueError):
+                continue  # replaced or retired meanwhile
+        return snapshots
+    
+    def merge(self, snapshots):
+        """Sum counters and histograms over all snapshots; gauges only over running processes"""
+        merged = {name: {} for name in self.metrics}
+        for data in snapshots:
+            running = data['pid'] is not None and process_alive(data['pid'])
+            for name, entries in data['metrics'].items():
+                metric = self.metrics.get(name)
+                if metric is None or (metric.kind == 'gauge' and not running):
+                    continue
+                values = merged[name]
+                for labels, value in entries:
+                    key = tuple(str(label) for label in labels)
+                    values[key] = metric.combine(values[key], value) if key in values else value
+        return merged
+    
+    @contextmanager
+    def directory_lock(self, exclusive=False):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(app.config['METRICS_DIR'], '.lock'), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    
+    def retire(self, filenames):
+        """Fold exited workers' counters and histograms into retired.json and delete their files"""
+        directory = app.config['METRICS_DIR']
+        with self.directory_lock(exclusive=True):
+            snapshots = dict(self.read_snapshots())
+            retiring = [name for name in filenames if name in snapshots]
+            if not retiring:
+                return  # another worker got there first
+            kept = [snapshots[name] for name in retiring + [self.RETIRED] if name in snapshots]
+            retired = {'pid': None, 'metrics': {
+                name: [[list(labels), value] for labels, value in values.items()]
+                for name, values in self.merge(kept).items() if values
+            }}
+            temporary = os.path.join(directory, self.RETIRED + '.tmp')
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(retired, f, separators=(',', ':'))
+            os.replace(temporary, os.path.join(directory, self.RETIRED))
+            for name in retiring:
+                os.remove(os.path.join(directory, name))
+    
+    def render(self):
+        self.write_snapshot()
+        with self.directory_lock():
+            snapshots = self.read_snapshots()
+        merged = self.merge([data for _, data in snapshots])
+        
+        exited = [name for name, data in snapshots if data['pid'] is not None and not process_alive(data['pid'])]
+        if exited and fcntl is not None:
+            self.retire(exited)
+        
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.extend(metric.render(merged[name]))
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+REQUEST_LATENCY = metrics.histogram(
+    'http_request_duration_seconds', 'Time to build the response (streamed bodies not included)', ('endpoint', 'status'))
+REQUESTS_IN_FLIGHT = metrics.gauge('http_requests_in_flight', 'Requests currently being handled', ('endpoint',))
+SQL_QUERIES = metrics.counter('sqlite_queries_total', 'SQL statements executed', ('endpoint',))
+SQL_SECONDS = metrics.counter('sqlite_query_seconds_total', 'Time spent executing SQL and fetching rows', ('endpoint',))
+REQUEST_SQL_SECONDS = metrics.histogram('http_request_sql_seconds', 'SQLite time per request', ('endpoint',))
+ORDER_QUEUE_WAIT = metrics.histogram(
+    'order_queue_wait_seconds', 'Time from checkout until an admin starts processing the order',
+    buckets=(1, 10, 60, 300, 900, 3600, 4 * 3600, 24 * 3600))
+
+def record_sql(endpoint):
+    if query_stats.count:
+        SQL_QUERIES.inc((endpoint,), query_stats.count)
+        SQL_SECONDS.inc((endpoint,), query_stats.seconds)
+
+def collect_order_queue_depth():
+    return order_queue.size()
+
+def collect_order_queue_age():
+    oldest = order_queue.peek()
+    return time.time() - oldest['enqueued_at'] if oldest else 0
+
+def collect_threads():
+    counts = {}
+    for thread in threading.enumerate():
+        # "Thread-7 (process_order_async)" -> "process_order_async", "ThreadPoolExecutor-0_3" -> "ThreadPoolExecutor"
+        name = re.sub(r'^Thread-\d+ \((.+)\)$', r'\1', thread.name)
+        name = re.sub(r'[-_]\d+(_\d+)?$', '', name)
+        counts[(name,)] = counts.get((name,), 0) + 1
+    return counts
+
+def collect_browsing_history(attribute):
+    store = services.built('history_store')
+    if store is None:
+        return 0
+    with store.lock:
+        return len(getattr(store, attribute))
+
+def collect_browsing_history_items():
+    store = services.built('history_store')
+    if store is None:
+        return 0
+    with store.lock:
+        return sum(history.size for history in store.histories.values())
+
+def collect_cache_entries():
+    entries = {('sessions',): len(app.session_interface.cache),
+               ('compressed_responses',): len(compressed_cache),
+               ('format_peso',): format_peso.cache_info().currsize}
+    views = services.built('product_views')
+    if views is not None:
+        entries[('product_scores',)] = len(views.scores)
+    return entries
+
+def collect_cache_requests():
+    info = format_peso.cache_info()
+    return {('format_peso', 'hit'): info.hits, ('format_peso', 'miss'): info.misses}
+
+def collect_sse_subscribers():
+    broker = services.built('order_events')
+    return len(broker) if broker is not None else 0
+
+# Every worker reads the same shared queue, so merge with max rather than sum
+metrics.gauge('order_queue_depth', 'Orders waiting in the processing queue', collect=collect_order_queue_depth,
+              aggregate='max')
+metrics.gauge('order_queue_oldest_age_seconds', 'Age of the oldest order waiting to be processed',
+              collect=collect_order_queue_age, aggregate='max')
+metrics.gauge('app_threads', 'Live threads by name', ('name',), collect=collect_threads)
+metrics.gauge('browsing_history_cached_users', 'Browsing histories held in memory',
+              collect=functools.partial(collect_browsing_history, 'histories'))
+metrics.gauge('browsing_history_dirty_users', 'Browsing histories waiting for write-behind',
+              collect=functools.partial(collect_browsing_history, 'dirty'))
+metrics.gauge('browsing_history_cached_items', 'Products across all in-memory browsing histories',
+              collect=collect_browsing_history_items)
+metrics.gauge('cache_entries', 'Entries held by in-process caches', ('cache',), collect=collect_cache_entries)
+metrics.counter('cache_requests_total', 'In-process cache lookups', ('cache', 'result'), collect=collect_cache_requests)
+metrics.gauge('sse_subscribers', 'Open order event streams', collect=collect_sse_subscribers)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'Not found'}), 404
+    token = app.config['METRICS_TOKEN']
+    if token and not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+# Request timing: slow-request log and opt-in profiling
+@service('slow_request_log')
+def slow_request_log():
+    """JSONL logger; the file is opened on the first slow request of each process"""
+    logger = logging.getLogger('ecommerce.slow_requests')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+    os.makedirs(os.path.dirname(app.config['SLOW_REQUEST_LOG']), exist_ok=True)
+    handler = RotatingFileHandler(app.config['SLOW_REQUEST_LOG'], maxBytes=app.config['SLOW_REQUEST_LOG_BYTES'],
+                                  backupCount=app.config['SLOW_REQUEST_LOG_BACKUPS'], encoding='utf-8', delay=True)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    return logger
+
+# One profile at a time per process (Python 3.12+ refuses a second active cProfile anyway)
+profile_lock = threading.Lock()
+
+def start_profile(mode):
+    if not profile_lock.acquire(blocking=False):
+        g.profile_busy = True
+        return
+    g.profile_mode = mode
+    g.profiler = cProfile.Profile()
+    g.profiler.enable()
+
+def stop_profile():
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return None
+    profiler.disable()
+    profile_lock.release()
+    return profiler
+
+def profile_response(profiler, response):
+    """Return the text report in place of the response (?_profile=text), else save a .prof dump"""
+    if g.profile_mode == 'text':
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(40)
+        profiled = app.response_class(report.getvalue(), mimetype='text/plain')
+        profiled.headers['X-Profile-Status'] = str(response.status_code)
+        return profiled
+    
+    os.makedirs(app.config['PROFILE_FOLDER'], exist_ok=True)
+    filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint or 'unknown'}-{uuid.uuid4().hex[:6]}.prof"
+    profiler.dump_stats(os.path.join(app.config['PROFILE_FOLDER'], filename))
+    response.headers['X-Profile-File'] = filename
+    return response
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    query_stats.reset()
+    
+    # Opt in with ?_profile=1 (or =text) or an X-Profile header; admins only
+    mode = request.args.get('_profile') or request.headers.get('X-Profile')
+    if mode and app.config['PROFILING_ENABLED'] and session.get('role') == 'admin':
+        start_profile(mode)
+
+# Registered before conditional_and_compress, so it runs after it and sees the final body
+@app.after_request
+def log_slow_request(response):
+    profiler = stop_profile()
+    started = g.get('request_started')
+    if started is not None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= app.config['SLOW_REQUEST_MS']:
+            slow_request_log.info(json.dumps({
+                'time': datetime.now().isoformat(timespec='milliseconds'),
+                'method': request.method,
+                'path': request.path,
+                'route': request.url_rule.rule if request.url_rule else None,
+                'status': response.status_code,
+                'duration_ms': round(elapsed_ms, 2),
+                'sql_count': query_stats.count,
+                'sql_ms': round(query_stats.seconds * 1000, 2),
+                # None for streamed bodies (exports, event streams); their time is up to the first byte
+                'response_bytes': None if response.is_streamed else response.content_length,
+                'user_id': session.get('user_id'),
+                'pid': os.getpid()
+            }))
+    
+    if g.get('profile_busy'):
+        response.headers['X-Profile'] = 'busy'
+    if profiler is not None:
+        response = profile_response(profiler, response)
+    return response
+
+@app.teardown_request
+def stop_abandoned_profile(exc):
+    # after_request is skipped when an exception propagates; never leave the profiler running
+    stop_profile()
+
+@app.before_request
+def track_request_start():
+    if app.config['METRICS_ENABLED']:
+        g.metrics_endpoint = request.endpoint or 'none'
+        REQUESTS_IN_FLIGHT.inc((g.metrics_endpoint,))
+        metrics.flusher.ensure_started()
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = g.get('metrics_endpoint')
+    started = g.get('request_started')
+    if endpoint is not None and started is not None:
+        REQUEST_LATENCY.observe((endpoint, str(response.status_code)), time.perf_counter() - started)
+        REQUEST_SQL_SECONDS.observe((endpoint,), query_stats.seconds)
+        record_sql(endpoint)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    endpoint = g.pop('metrics_endpoint', None)
+    if endpoint is not None:
+        REQUESTS_IN_FLIGHT.dec((endpoint,))
+
+# Conditional GET and compression
+COMPRESSIBLE_TYPES = {'application/json', 'text/html', 'text/css', 'text/plain',
+                      'text/javascript', 'application/javascript', 'image/svg+xml'}
+compressed_cache = OrderedDict()  # (etag, encoding) -> compressed body
+compressed_cache_lock = threading.Lock()
+COMPRESSED_CACHE_SIZE = 256
+
+def etag_matches(etag):
+    """True if the request's If-None-Match covers etag or one of its compressed variants"""
+    if not request.if_none_match:
+        return False
+    return any(request.if_none_match.contains_weak(tag) for tag in (etag, f"{etag}-br", f"{etag}-gzip"))
+
+def not_modified(etag):
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+def versioned(version_names):
+    """Answer GETs with a 304 from data versions alone, before the view touches the database.
+
+    version_names() returns the data_versions rows the response depends on, or
+    None to skip (the generic body-hash ETag still applies then).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(*args, **kwargs):
+            names = version_names() if request.method == 'GET' else None
+            if not names:
+                return view(*args, **kwargs)
+            
+            versions = db.get_versions(names)
+            key = f"{request.full_path}|{session.get('user_id')}|{names}|{versions}"
+            etag = hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+            if etag_matches(etag):
+                return not_modified(etag)
+            
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+        return wrapped
+    return decorator
+
+def compress_body(data, encoding, cache_key=None):
+    if cache_key:
+        with compressed_cache_lock:
+            cached = compressed_cache.get(cache_key)
+            if cached is not None:
+                compressed_cache.move_to_end(cache_key)
+                return cached
+    
+    level = app.config['COMPRESS_LEVEL']
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=min(level, 11))
+    else:
+        compressed = gzip.compress(data, compresslevel=level, mtime=0)
+    
+    if cache_key:
+        with compressed_cache_lock:
+            compressed_cache[cache_key] = compressed
+            while len(compressed_cache) > COMPRESSED_CACHE_SIZE:
+                compressed_cache.popitem(last=False)
+    return compressed
+
+@app.after_request
+def conditional_and_compress(response):
+    if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+        return response
+    if response.mimetype not in COMPRESSIBLE_TYPES or response.headers.get('Content-Encoding'):
+        return response
+    
+    # Static files arrive as passthrough file wrappers (with their own ETag); other
+    # streamed bodies such as exports and event streams are left alone
+    if response.direct_passthrough:
+        if (response.content_length or 0) > 1024 * 1024:
+            return response
+        response.direct_passthrough = False
+    elif response.is_streamed:
+        return response
+    data = response.get_data()
+    
+    etag, _ = response.get_etag()
+    if not etag:
+        etag = hashlib.blake2b(data, digest_size=12).hexdigest()
+        response.set_etag(etag)
+        response.headers.setdefault('Cache-Control', 'private, no-cache')
+    if etag_matches(etag):
+        return not_modified(etag)
+    
+    response.vary.add('Accept-Encoding')
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        encoding = 'br'
+    elif accepted['gzip']:
+        encoding = 'gzip'
+    else:
+        return response
+    
+    # Keyed by ETag, so identical product/category payloads and static files compress once
+    response.set_data(compress_body(data, encoding, (etag, encoding)))
+    response.headers['Content-Encoding'] = encoding
+    response.set_etag(f"{etag}-{encoding}")
+    return response
+
+# Server-Sent Events
+app.config['SSE_KEEPALIVE_SECONDS'] = int(os.environ.get('SSE_KEEPALIVE_SECONDS', 15))
+app.config['SSE_MAX_SECONDS'] = int(os.environ.get('SSE_MAX_SECONDS', 60))
+app.config['SSE_BUSY_RETRY_SECONDS'] = int(os.environ.get('SSE_BUSY_RETRY_SECONDS', 15))
+
+def format_sse(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append(f'data: {app.json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+def event_stream(channel):
+    """Stream a broker channel as text/event-stream.
+
+    Streams end after SSE_MAX_SECONDS so their threads are handed back; EventSource
+    reconnects with Last-Event-ID and missed events are replayed. A 'resync' event
+    tells the client its buffer overflowed and it should refetch the full list.
+    When this worker already holds SSE_MAX_SUBSCRIBERS streams the answer is 503
+    with a retry hint, and the page keeps working from its own re-fetches.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    subscription = order_events.subscribe(channel, last_event_id)
+    if subscription is None:
+        retry = app.config['SSE_BUSY_RETRY_SECONDS']
+        return Response(f'retry: {retry * 1000}\n\n', status=503, mimetype='text/event-stream',
+                        headers={'Retry-After': str(retry), 'Cache-Control': 'no-cache'})
+    
+    keepalive = app.config['SSE_KEEPALIVE_SECONDS']
+    deadline = time.monotonic() + app.config['SSE_MAX_SECONDS']
+    
+    def generate():
         try:
-            # For development, just log the email instead of sending
-            print(f"📧 EMAIL NOTIFICATION:")
-            print(f"To: {customer_email}")
-            print(f"Subject: Order #{order_id} Status Update")
-            print(f"Status: {status.upper()}")
-            if expected_delivery:
-                print(f"Expected Delivery: {expected_delivery}")
-            print("=" * 50)
-            return True
-        except Exception as e:
-            print(f"Email sending failed: {e}")
-            return False
+            yield 'retry: 3000\n\n'
+            while time.monotonic() < deadline:
+                events, dropped = subscription.drain(min(keepalive, max(0, deadline - time.monotonic())))
+                if dropped:
+                    yield format_sse({'dropped': dropped}, 'resync')
+                for event_id, event in events:
+                    yield format_sse(event, 'order', event_id)
+                if not events and not dropped:
+                    yield ': keepalive\n\n'
+        finally:
+            order_events.unsubscribe(subscription)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
-# Initialize global objects
-db = DatabaseManager()
-email_service = EmailService()
-category_tree = CategoryTree()
-order_queue = OrderQueue()
+# Static assets (fingerprinted builds in static/dist, see build_assets.py)
+ASSET_DIST_FOLDER = os.path.join(app.static_folder, 'dist')
+ASSET_MAX_AGE = 365 * 24 * 3600
 
-# Load categories into tree and add ALL products to each category
-def load_categories():
-    categories = db.execute_query("SELECT id, name, parent_id FROM categories ORDER BY parent_id, id")
-    for cat_id, name, parent_id in categories:
-        category_tree.add_category(cat_id, name, parent_id)
-    
-    # Load products into categories
-    products = db.execute_query("SELECT id, category_id FROM products WHERE is_active = 1")
-    for product_id, category_id in products:
-        category_node = category_tree.get_category(category_id)
-        if category_node:
-            category_node.add_product(product_id)
-        
-        # IMPORTANT: Add ALL products to the root "All Categories" node
-        root_category = category_tree.get_category(0)
-        if root_category:
-            root_category.add_product(product_id)
+class AssetManifest:
+    """Maps static source paths (e.g. 'js/account.js') to their fingerprinted build.
 
-load_categories()
+    Without a build, URLs point at the source file with a ?v=<content hash> query,
+    so browsers still pick up every change. The manifest is re-read when it changes
+    on disk in debug mode, otherwise once per process.
+    """
+    def __init__(self, static_folder, dist_folder, watch=False):
+        self.static_folder = static_folder
+        self.manifest_path = os.path.join(dist_folder, 'manifest.json')
+        self.watch = watch
+        self.entries = {}
+        self.mtime = None
+        self.source_hashes = {}  # path -> (mtime, hash)
+        self.lock = threading.Lock()
+        self._load()
+    
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.manifest_path)
+        except OSError:
+            self.entries, self.mtime = {}, None
+            return
+        if mtime != self.mtime:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+            self.mtime = mtime
+    
+    def _source_hash(self, path):
+        full_path = os.path.join(self.static_folder, path)
+        try:
+            mtime = os.path.getmtime(full_path)
+        except OSError:
+            return None
+        cached = self.source_hashes.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(full_path, 'rb') as f:
+            digest = hashlib.blake2b(f.read(), digest_size=6).hexdigest()
+        self.source_hashes[path] = (mtime, digest)
+        return digest
+    
+    def url(self, path):
+        if self.watch:
+            with self.lock:
+                self._load()
+        built = self.entries.get(path)
+        if built:
+            return url_for('dist_asset', filename=built)
+        with self.lock:
+            version = self._source_hash(path)
+        return url_for('static', filename=path, v=version)
 
-# Session management for browsing history only
-user_browsing_history = {}  # Hash table for user browsing histories
+@service('assets')
+def assets():
+    return AssetManifest(app.static_folder, ASSET_DIST_FOLDER, watch=app.debug)
 
-# File upload configuration
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+@app.template_global()
+def asset_url(path):
+    return assets.url(path)
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+@app.route('/assets/<path:filename>')
+def dist_asset(filename):
+    # Built file names carry a content hash, so they can be cached forever
+    response = send_from_directory(ASSET_DIST_FOLDER, filename, max_age=ASSET_MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    return response
 
 # Routes
 
@@ -418,27 +2650,26 @@ def login():
         if not username or not password:
             return jsonify({'success': False, 'message': 'Please fill in all fields'})
         
-        # Hash password for comparison
-        password_hash = db.hash_password(password)
-        
+        # Look up by the unique username index, then the unique email index
         user_data = db.execute_query(
-            "SELECT id, username, email, role FROM users WHERE (username = ? OR email = ?) AND password_hash = ?",
-            (username, username, password_hash)
+            "SELECT id, username, email, role FROM users WHERE username = ?", (username,)
+        ) or db.execute_query(
+            "SELECT id, username, email, role FROM users WHERE email = ?", (username,)
         )
         
-        if user_data:
+        # Unknown users still go through a KDF run inside verify_user_password
+        user_id = user_data[0][0] if user_data else None
+        if db.verify_user_password(user_id, password) and user_data:
             user_id, username, email, role = user_data[0]
             
-            # Store in session
+            # Store in session (under a fresh session id)
+            session.clear()
+            session.regenerate()
             session['user_id'] = user_id
             session['username'] = username
             session['email'] = email
             session['role'] = role
             
-            # Initialize user browsing history only
-            if user_id not in user_browsing_history:
-                user_browsing_history[user_id] = BrowsingHistory()
-            
             return jsonify({
                 'success': True, 
                 'role': role,
@@ -483,6 +2714,7 @@ def register():
                 "INSERT INTO users (username, email, password_hash, role) VALUES (?, ?, ?, ?)",
                 (username, email, password_hash, 'customer')
             )
+            admin_summary.invalidate()
             return jsonify({'success': True, 'message': 'Registration successful! Please login.'})
         except Exception as e:
             return jsonify({'success': False, 'message': f'Registration failed: {str(e)}'})
@@ -507,6 +2739,8 @@ def admin_dashboard():
     return render_template('admin_dashboard.html', user=session)
 
 @app.route('/api/products')
+@rate_limited('search', when=lambda: request.args.get('search'))
+@versioned(lambda: None if request.args.get('sort') == 'popular' else ['products'])
 def get_products():
     category_id = request.args.get('category_id', type=int)
     search_query = request.args.get('search', '')
@@ -531,7 +2765,7 @@ def get_products():
             ''')
         else:
             # Get all products in category and subcategories using tree structure
-            product_ids = category_tree.get_all_products_in_category(category_id)
+            product_ids = category_tree.current().get_all_products_in_category(category_id)
             if product_ids:
                 placeholders = ','.join('?' for _ in product_ids)
                 products = db.execute_query(f'''
@@ -553,39 +2787,54 @@ def get_products():
         ''')
     
     # Convert to list of dictionaries with peso formatting
-    products_list = []
-    for product in products:
-        products_list.append({
-            'id': product[0],
-            'name': product[1],
-            'description': product[2],
-            'price': product[3],
-            'price_formatted': format_peso(product[3]),
-            'stock': product[4],
-            'image_path': product[5],
-            'category': product[6]
-        })
+    products_list = PRODUCT_ROW.many(products)
+    
+    if request.args.get('sort') == 'popular':
+        now = time.time()
+        score = product_views.score
+        products_list.sort(key=lambda item: score(item['id'], now), reverse=True)
     
     return jsonify(products_list)
 
+@app.route('/api/products/trending')
+def get_trending_products():
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    
+    # Over-fetch a little since inactive or deleted products are filtered out below
+    ranked = product_views.trending(limit * 2)
+    if not ranked:
+        return jsonify([])
+    
+    product_ids = [product_id for product_id, _ in ranked]
+    placeholders = ','.join('?' for _ in product_ids)
+    rows = db.execute_query(f'''
+        SELECT p.id, p.name, p.description, p.price, p.stock, p.image_path, c.name as category
+        FROM products p
+        LEFT JOIN categories c ON p.category_id = c.id
+        WHERE p.is_active = 1 AND p.id IN ({placeholders})
+    ''', product_ids)
+    products = {row[0]: row for row in rows}
+    
+    trending = []
+    for product_id, score in ranked:
+        product = products.get(product_id)
+        if not product:
+            continue
+        item = PRODUCT_ROW.one(product)
+        item['score'] = round(score, 3)
+        trending.append(item)
+        if len(trending) == limit:
+            break
+    
+    return jsonify(trending)
+
 @app.route('/api/categories')
+@versioned(lambda: ['products'])
 def get_categories():
-    return jsonify(category_tree.to_dict())
+    return jsonify(category_tree.current().to_dict())
 
 @app.route('/api/product/<int:product_id>')
 def get_product(product_id):
-    if 'user_id' in session:
-        user_id = session['user_id']
-        
-        # Add to browsing history with complete product info
-        product_data = db.execute_query(
-            "SELECT name, price, image_path FROM products WHERE id = ?", (product_id,)
-        )
-        
-        if product_data and user_id in user_browsing_history:
-            product_name, price, image_path = product_data[0]
-            user_browsing_history[user_id].add_product(product_id, product_name, image_path, price)
-    
     # Get product details
     product = db.execute_query('''
         SELECT p.id, p.name, p.description, p.price, p.stock, p.image_path, c.name as category
@@ -597,16 +2846,14 @@ def get_product(product_id):
     if not product:
         return jsonify({'error': 'Product not found'}), 404
     
-    product_data = {
-        'id': product[0][0],
-        'name': product[0][1],
-        'description': product[0][2],
-        'price': product[0][3],
-        'price_formatted': format_peso(product[0][3]),
-        'stock': product[0][4],
-        'image_path': product[0][5],
-        'category': product[0][6]
-    }
+    product_data = PRODUCT_ROW.one(product[0])
+    
+    # Record the view for trending, then add to browsing history
+    # (both in memory; persisted by background write-behind)
+    product_views.record(product_id, session.get('user_id'))
+    if 'user_id' in session:
+        history_store.record_view(session['user_id'], product_id, product_data['name'],
+                                  product_data['image_path'], product_data['price'])
     
     # Get recommendations (same category)
     recommendations = db.execute_query('''
@@ -617,15 +2864,7 @@ def get_product(product_id):
         LIMIT 3
     ''', (product_id, product_id))
     
-    product_data['recommendations'] = [
-        {
-            'id': rec[0],
-            'name': rec[1],
-            'price': rec[2],
-            'price_formatted': format_peso(rec[2]),
-            'image_path': rec[3]
-        } for rec in recommendations
-    ]
+    product_data['recommendations'] = PRODUCT_CARD_ROW.many(recommendations)
     
     return jsonify(product_data)
 
@@ -634,17 +2873,14 @@ def get_browsing_history():
     if 'user_id' not in session:
         return jsonify([])
     
-    user_id = session['user_id']
-    if user_id in user_browsing_history:
-        history_data = user_browsing_history[user_id].to_dict()
-        # Format prices in history
-        for item in history_data['items']:
-            item['price_formatted'] = format_peso(item['price']) if item['price'] else '₱0.00'
-        return jsonify(history_data)
-    
-    return jsonify({'items': [], 'size': 0, 'max_size': 5})
+    history_data = history_store.get(session['user_id']).to_dict()
+    # Format prices in history
+    for item in history_data['items']:
+        item['price_formatted'] = format_peso(item['price']) if item['price'] else '₱0.00'
+    return jsonify(history_data)
 
 @app.route('/api/cart', methods=['GET', 'POST', 'PUT', 'DELETE'])
+@versioned(lambda: ['products', f"cart:{session['user_id']}"] if 'user_id' in session else None)
 def manage_cart():
     if 'user_id' not in session:
         return jsonify({'error': 'Not logged in'}), 401
@@ -706,6 +2942,7 @@ def manage_cart():
                 VALUES (?, ?, ?)
             ''', (user_id, product_id, quantity))
 
+        db.bump_versions(f'cart:{user_id}')
         return jsonify({'success': True, 'message': 'Product added to cart'})
 
     elif request.method == 'PUT':
@@ -721,20 +2958,24 @@ def manage_cart():
                 WHERE user_id = ? AND product_id = ?
             ''', (quantity, user_id, product_id))
 
+        db.bump_versions(f'cart:{user_id}')
         return jsonify({'success': True, 'message': 'Cart updated'})
 
     elif request.method == 'DELETE':
         data = request.get_json()
         if data.get('clear_all'):
             db.execute_query('DELETE FROM cart_items WHERE user_id = ?', (user_id,))
+            db.bump_versions(f'cart:{user_id}')
             return jsonify({'success': True, 'message': 'Cart cleared'})
 
         product_id = data.get('product_id')
         if product_id:
             db.execute_query('DELETE FROM cart_items WHERE user_id = ? AND product_id = ?', (user_id, product_id))
+            db.bump_versions(f'cart:{user_id}')
             return jsonify({'success': True, 'message': 'Item removed from cart'})
 
 @app.route('/api/checkout', methods=['POST'])
+@rate_limited('checkout')
 def checkout():
     if 'user_id' not in session:
         return jsonify({'error': 'Not logged in'}), 401
@@ -764,34 +3005,35 @@ def checkout():
         # Calculate total
         total = sum(price * qty for product_id, qty, price in cart_items)
         
-        # Create order
-        order_id = db.execute_insert('''
-            INSERT INTO orders (user_id, total_amount, status, shipping_address, contact_number, notes)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (user_id, total, 'pending', address, contact, notes))
-        
-        # Add order items & update stock
-        for product_id, qty, price in cart_items:
-            db.execute_insert('''
-                INSERT INTO order_items (order_id, product_id, quantity, price)
-                VALUES (?, ?, ?, ?)
-            ''', (order_id, product_id, qty, price))
+        with db.transaction() as cursor:
+            # Create order
+            cursor.execute('''
+                INSERT INTO orders (user_id, total_amount, status, shipping_address, contact_number, notes, item_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, total, 'pending', address, contact, notes, len(cart_items)))
+            order_id = cursor.lastrowid
             
-            db.execute_query('''
-                UPDATE products SET stock = stock - ? WHERE id = ?
-            ''', (qty, product_id))
-        
-        # Clear DB cart after checkout
-        db.execute_query('DELETE FROM cart_items WHERE user_id = ?', (user_id,))
+            # Add order items & update stock
+            for product_id, qty, price in cart_items:
+                cursor.execute('''
+                    INSERT INTO order_items (order_id, product_id, quantity, price)
+                    VALUES (?, ?, ?, ?)
+                ''', (order_id, product_id, qty, price))
+                
+                cursor.execute('''
+                    UPDATE products SET stock = stock - ? WHERE id = ?
+                ''', (qty, product_id))
+            
+            # Clear DB cart after checkout
+            cursor.execute('DELETE FROM cart_items WHERE user_id = ?', (user_id,))
+            
+            db.record_order_stats(cursor, user_id, total, len(cart_items))
+            db.bump_versions('products', f'cart:{user_id}', cursor=cursor)
+            order_events.publish_order('created', order_id, user_id, 'pending', cursor=cursor,
+                                       total=total, total_formatted=format_peso(total))
         
-        # Add to order processing queue
-        order_data = {
-            'id': order_id,
-            'user_id': user_id,
-            'total': total,
-            'status': 'pending'
-        }
-        order_queue.enqueue(order_data)
+        # The new pending order is now at the back of the processing queue (see OrderQueue)
+        admin_summary.record_order(total)
         
         return jsonify({
             'success': True, 
@@ -806,6 +3048,7 @@ def checkout():
 # Add this new route to your app.py after the existing checkout route
 
 @app.route('/api/checkout_selective', methods=['POST'])
+@rate_limited('checkout')
 def checkout_selective():
     if 'user_id' not in session:
         return jsonify({'error': 'Not logged in'}), 401
@@ -862,55 +3105,46 @@ def checkout_selective():
             })
             total += current_price * requested_quantity
         
-        # Create order
-        order_id = db.execute_insert('''
-            INSERT INTO orders (user_id, total_amount, status, shipping_address, contact_number, notes)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (user_id, total, 'pending', address, contact, notes))
-        
-        # Add order items, update stock, and adjust cart
-        for item in verified_items:
-            product_id = item['product_id']
-            quantity = item['quantity']
-            price = item['price']
-            
-            # Add to order items
-            db.execute_insert('''
-                INSERT INTO order_items (order_id, product_id, quantity, price)
-                VALUES (?, ?, ?, ?)
-            ''', (order_id, product_id, quantity, price))
-            
-            # Update product stock
-            db.execute_query('''
-                UPDATE products SET stock = stock - ? WHERE id = ?
-            ''', (quantity, product_id))
-            
-            # Update cart - reduce quantity or remove if quantity becomes 0
-            current_cart_qty = db.execute_query('''
-                SELECT quantity FROM cart_items WHERE user_id = ? AND product_id = ?
-            ''', (user_id, product_id))[0][0]
-            
-            new_cart_qty = current_cart_qty - quantity
+        with db.transaction() as cursor:
+            # Create order
+            cursor.execute('''
+                INSERT INTO orders (user_id, total_amount, status, shipping_address, contact_number, notes, item_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, total, 'pending', address, contact, notes, len(verified_items)))
+            order_id = cursor.lastrowid
             
-            if new_cart_qty <= 0:
-                # Remove item from cart completely
-                db.execute_query('''
-                    DELETE FROM cart_items WHERE user_id = ? AND product_id = ?
+            # Add order items, update stock, and adjust cart
+            for item in verified_items:
+                product_id = item['product_id']
+                quantity = item['quantity']
+                price = item['price']
+                
+                # Add to order items
+                cursor.execute('''
+                    INSERT INTO order_items (order_id, product_id, quantity, price)
+                    VALUES (?, ?, ?, ?)
+                ''', (order_id, product_id, quantity, price))
+                
+                # Update product stock
+                cursor.execute('''
+                    UPDATE products SET stock = stock - ? WHERE id = ?
+                ''', (quantity, product_id))
+                
+                # Update cart - reduce quantity and remove the row if it reaches 0
+                cursor.execute('''
+                    UPDATE cart_items SET quantity = quantity - ? WHERE user_id = ? AND product_id = ?
+                ''', (quantity, user_id, product_id))
+                cursor.execute('''
+                    DELETE FROM cart_items WHERE user_id = ? AND product_id = ? AND quantity <= 0
                 ''', (user_id, product_id))
-            else:
-                # Update cart quantity
-                db.execute_query('''
-                    UPDATE cart_items SET quantity = ? WHERE user_id = ? AND product_id = ?
-                ''', (new_cart_qty, user_id, product_id))
-        
-        # Add to order processing queue
-        order_data = {
-            'id': order_id,
-            'user_id': user_id,
-            'total': total,
-            'status': 'pending'
-        }
-        order_queue.enqueue(order_data)
+            
+            db.record_order_stats(cursor, user_id, total, len(verified_items))
+            db.bump_versions('products', f'cart:{user_id}', cursor=cursor)
+            order_events.publish_order('created', order_id, user_id, 'pending', cursor=cursor,
+                                       total=total, total_formatted=format_peso(total))
+        
+        # The new pending order is now at the back of the processing queue (see OrderQueue)
+        admin_summary.record_order(total)
         
         return jsonify({
             'success': True, 
@@ -923,7 +3157,66 @@ def checkout_selective():
     except Exception as e:
         return jsonify({'success': False, 'message': f'Failed to place order: {str(e)}'})
 
+# Batched reads: one round trip (one session load, one DB connection) for a page's initial data
+BATCH_ENDPOINTS = {'get_categories', 'get_products', 'get_trending_products', 'get_product',
+                   'manage_cart', 'get_browsing_history', 'get_user_orders'}
+app.config['BATCH_MAX_REQUESTS'] = int(os.environ.get('BATCH_MAX_REQUESTS', 10))
+
+def run_batched_read(adapter, path):
+    """Dispatch one GET sub-request in the current session and return its status and JSON body"""
+    url = urlsplit(path)
+    try:
+        endpoint, _ = adapter.match(url.path, method='GET')
+    except HTTPException as e:
+        return {'path': path, 'status': e.code, 'body': {'error': e.name}}
+    if endpoint not in BATCH_ENDPOINTS:
+        return {'path': path, 'status': 400, 'body': {'error': 'Not available in a batch'}}
+    
+    environ = EnvironBuilder(
+        path=url.path, query_string=url.query, base_url=request.host_url,
+        headers={'Accept': 'application/json'},
+        environ_base={'REMOTE_ADDR': request.remote_addr}
+    ).get_environ()
+    context = app.request_context(environ)
+    context.session = session._get_current_object()  # reuse the loaded session, changes are saved with the batch
+    with context:
+        try:
+            response = app.make_response(app.dispatch_request())
+        except HTTPException as e:
+            response = app.make_response((jsonify({'error': e.name}), e.code))
+    return {'path': path, 'status': response.status_code, 'body': response.get_json(silent=True)}
+
+@app.route('/api/batch', methods=['POST'])
+def batch_read():
+    """Run a list of whitelisted GET API paths and return their responses in order.
+
+    Sub-requests run one after another on a shared SQLite connection; reads are
+    sub-millisecond, so the saving is the round trips and per-request overhead.
+    """
+    data = request.get_json(silent=True) or {}
+    paths = data.get('requests')
+    if not isinstance(paths, list) or not paths or not all(isinstance(path, str) for path in paths):
+        return jsonify({'error': "Expected 'requests': a list of API paths"}), 400
+    if len(paths) > app.config['BATCH_MAX_REQUESTS']:
+        return jsonify({'error': f"At most {app.config['BATCH_MAX_REQUESTS']} requests per batch"}), 400
+    
+    adapter = app.url_map.bind_to_environ(request.environ)
+    with db.shared_connection():
+        responses = [run_batched_read(adapter, path) for path in paths]
+    return jsonify({'responses': responses})
+
+def wants_archive():
+    """History endpoints read archived orders too only with ?include_archive=1"""
+    return request.args.get('include_archive', '0') not in ('0', '')
+
 # Admin routes
+@app.route('/api/admin/profiles/<path:filename>')
+def admin_get_profile(filename):
+    """Download a .prof dump written for a profiled request (open with pstats or snakeviz)"""
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return send_from_directory(app.config['PROFILE_FOLDER'], filename, as_attachment=True)
+
 @app.route('/api/admin/products')
 def admin_get_products():
     if 'user_id' not in session or session['role'] != 'admin':
@@ -937,51 +3230,112 @@ def admin_get_products():
         ORDER BY p.id DESC
     ''')
     
-    products_list = []
-    for product in products:
-        products_list.append({
-            'id': product[0],
-            'name': product[1],
-            'description': product[2],
-            'price': product[3],
-            'price_formatted': format_peso(product[3]),
-            'stock': product[4],
-            'category_id': product[5],
-            'category': product[6] or 'Uncategorized',
-            'is_active': bool(product[7]),
-            'image_path': product[8] or ''
-        })
+    return jsonify(ADMIN_PRODUCT_ROW.many(products))
+
+@app.route('/api/admin/summary')
+def admin_get_summary():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
     
-    return jsonify(products_list)
+    return jsonify(admin_summary.get())
+
+@app.route('/api/admin/analytics')
+def admin_get_analytics():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    if not sales_analytics.available():
+        return jsonify({'error': 'Analytics requires NumPy (pip install numpy)'}), 503
+    
+    # The snapshot is built and extended off the request path
+    analytics_refresher.ensure_started()
+    if not sales_analytics.ready():
+        return too_many_requests(5, 'Analytics are still being prepared, please try again shortly', 503)
+    
+    bucket = request.args.get('bucket', 'day')
+    start = request.args.get('start') or None
+    end = request.args.get('end') or None
+    limit = request.args.get('limit', 10, type=int)
+    
+    try:
+        revenue = sales_analytics.revenue_by(bucket, start, end)
+        top_products = sales_analytics.top_products(limit, start, end)
+        category_mix = sales_analytics.category_mix(start, end)
+        average = sales_analytics.average_order_value(start, end)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Only the handful of ranked products need names from the database
+    product_ids = [item['product_id'] for item in top_products]
+    names = {}
+    if product_ids:
+        placeholders = ','.join('?' for _ in product_ids)
+        names = dict(db.execute_query(f"SELECT id, name FROM products WHERE id IN ({placeholders})", product_ids))
+    
+    for item in top_products:
+        item['name'] = names.get(item['product_id'], 'Deleted product')
+        item['revenue_formatted'] = format_peso(item['revenue'])
+    tree = category_tree.current()
+    for item in category_mix:
+        category = tree.get_category(item['category_id'])
+        item['name'] = category.name if category else 'Uncategorized'
+        item['revenue_formatted'] = format_peso(item['revenue'])
+    for item in revenue:
+        item['revenue_formatted'] = format_peso(item['revenue'])
+    average['revenue_formatted'] = format_peso(average['revenue'])
+    average['average_order_value_formatted'] = format_peso(average['average_order_value'])
+    
+    return jsonify({
+        'bucket': bucket,
+        'start': start,
+        'end': end,
+        'revenue': revenue,
+        'top_products': top_products,
+        'category_mix': category_mix,
+        'orders': average
+    })
+
+@app.route('/api/admin/export/<dataset>')
+def admin_export(dataset):
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    fmt = request.args.get('format', 'csv')
+    start = request.args.get('start') or None
+    end = request.args.get('end') or None
+    
+    try:
+        chunks = iter_export(dataset, fmt, start, end, include_archive=wants_archive())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filename = f"{dataset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return Response(
+        chunks,
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
 
 @app.route('/api/admin/orders')
 def admin_get_orders():
     if 'user_id' not in session or session['role'] != 'admin':
         return jsonify({'error': 'Unauthorized'}), 401
     
-    orders = db.execute_query('''
+    orders = db.execute_history('''
         SELECT o.id, u.username, u.email, o.total_amount, o.status, 
                o.shipping_address, o.contact_number, o.created_at
-        FROM orders o
+        FROM {orders} o
         JOIN users u ON o.user_id = u.id
         ORDER BY o.created_at DESC
-    ''')
-    
-    orders_list = []
-    for order in orders:
-        orders_list.append({
-            'id': order[0],
-            'customer': order[1],
-            'email': order[2],
-            'total': order[3],
-            'total_formatted': format_peso(order[3]),
-            'status': order[4],
-            'address': order[5],
-            'contact': order[6],
-            'date': order[7]
-        })
+    ''', include_archive=wants_archive())
     
-    return jsonify(orders_list)
+    return jsonify(ADMIN_ORDER_ROW.many(orders))
+
+@app.route('/api/admin/orders/stream')
+def stream_admin_orders():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return event_stream('admin')
 
 @app.route('/api/admin/orders/<int:order_id>/status', methods=['PUT'])
 def update_order_status(order_id):
@@ -995,7 +3349,7 @@ def update_order_status(order_id):
     try:
         # Get customer email
         customer_data = db.execute_query('''
-            SELECT u.email FROM users u
+            SELECT u.email, o.status, o.user_id FROM users u
             JOIN orders o ON u.id = o.user_id
             WHERE o.id = ?
         ''', (order_id,))
@@ -1003,18 +3357,17 @@ def update_order_status(order_id):
         if not customer_data:
             return jsonify({'success': False, 'message': 'Order not found'})
         
-        customer_email = customer_data[0][0]
+        customer_email, old_status, customer_id = customer_data[0]
         
-        # Update order status
-        db.execute_query(
-            "UPDATE orders SET status = ? WHERE id = ?",
-            (new_status, order_id)
-        )
+        # Update order status; the event is published by the same transaction
+        with db.transaction() as cursor:
+            cursor.execute("UPDATE orders SET status = ? WHERE id = ?", (new_status, order_id))
+            order_events.publish_order('status', order_id, customer_id, new_status, old_status, cursor=cursor,
+                                       expected_delivery=expected_delivery or None)
+        admin_summary.record_status_change(old_status, new_status)
         
-        # Send email notification
-        email_sent = email_service.send_order_status_email(
-            customer_email, order_id, new_status, expected_delivery
-        )
+        # Queue email notification (merged with other changes inside the coalescing window)
+        notification_coalescer.notify(customer_email, order_id, new_status, expected_delivery)
         
         return jsonify({
             'success': True,
@@ -1029,24 +3382,36 @@ def process_orders():
     if 'user_id' not in session or session['role'] != 'admin':
         return jsonify({'error': 'Unauthorized'}), 401
     
-    if order_queue.is_empty():
+    order = order_queue.dequeue()
+    if order is None:
         return jsonify({'message': 'No orders in processing queue'})
+    ORDER_QUEUE_WAIT.observe((), time.time() - order['enqueued_at'])
     
-    order = order_queue.dequeue()
+    customer_data = db.execute_query('''
+        SELECT u.email, o.status FROM orders o
+        LEFT JOIN users u ON u.id = o.user_id
+        WHERE o.id = ?
+    ''', (order['id'],))
+    customer_email, current_status = customer_data[0] if customer_data else (None, order['status'])
     
     def process_order_async():
         # Simulate processing with 5-second intervals
         statuses = ['processing', 'shipping', 'delivered']
+        previous_status = current_status
         
         for i, status in enumerate(statuses):
             time.sleep(5)  # 5-second delay as specified
             
             try:
-                db.execute_query(
-                    "UPDATE orders SET status = ? WHERE id = ?",
-                    (status, order['id'])
-                )
+                with db.transaction() as cursor:
+                    cursor.execute("UPDATE orders SET status = ? WHERE id = ?", (status, order['id']))
+                    order_events.publish_order('status', order['id'], order.get('user_id'), status,
+                                               previous_status, cursor=cursor)
                 print(f"Order {order['id']} status updated to {status}")
+                admin_summary.record_status_change(previous_status, status)
+                previous_status = status
+                if customer_email:
+                    notification_coalescer.notify(customer_email, order['id'], status)
             except Exception as e:
                 print(f"Error updating order {order['id']}: {e}")
     
@@ -1065,64 +3430,38 @@ def admin_get_users():
     
     users = db.execute_query('''
         SELECT u.id, u.username, u.email, u.role, u.created_at,
-               COUNT(o.id) as order_count,
-               COALESCE(SUM(o.total_amount), 0) as total_spent
+               COALESCE(cs.order_count, 0) as order_count,
+               COALESCE(cs.total_spent, 0) as total_spent
         FROM users u
-        LEFT JOIN orders o ON u.id = o.user_id
+        LEFT JOIN customer_stats cs ON cs.user_id = u.id
         WHERE u.role = 'customer'
-        GROUP BY u.id, u.username, u.email, u.role, u.created_at
         ORDER BY u.created_at DESC
     ''')
     
-    users_list = []
-    for user in users:
-        users_list.append({
-            'id': user[0],
-            'username': user[1],
-            'email': user[2],
-            'role': user[3],
-            'created_at': user[4],
-            'order_count': user[5],
-            'total_spent': user[6],
-            'total_spent_formatted': format_peso(user[6])
-        })
-    
-    return jsonify(users_list)
+    return jsonify(ADMIN_USER_ROW.many(users))
 
 @app.route('/api/admin/users/<int:user_id>/transactions')
 def get_user_transactions(user_id):
     if 'user_id' not in session or session['role'] != 'admin':
         return jsonify({'error': 'Unauthorized'}), 401
     
-    transactions = db.execute_query('''
-        SELECT o.id, o.created_at, o.total_amount, o.status,
-               COUNT(oi.id) as item_count
-        FROM orders o
-        LEFT JOIN order_items oi ON o.id = oi.order_id
-        WHERE o.user_id = ?
-        GROUP BY o.id, o.created_at, o.total_amount, o.status
-        ORDER BY o.created_at DESC
-    ''', (user_id,))
+    transactions = db.execute_history('''
+        SELECT id, created_at, total_amount, status, COALESCE(item_count, 0)
+        FROM {orders}
+        WHERE user_id = ?
+        ORDER BY created_at DESC
+    ''', (user_id,), include_archive=wants_archive())
     
-    transactions_list = []
-    total_spent = 0
-    
-    for transaction in transactions:
-        total_spent += transaction[2]
-        transactions_list.append({
-            'order_id': transaction[0],
-            'date': transaction[1],
-            'total': transaction[2],
-            'total_formatted': format_peso(transaction[2]),
-            'status': transaction[3],
-            'item_count': transaction[4]
-        })
+    stats = db.execute_query(
+        "SELECT order_count, total_spent FROM customer_stats WHERE user_id = ?", (user_id,)
+    )
+    total_orders, total_spent = stats[0] if stats else (0, 0)
     
     return jsonify({
-        'transactions': transactions_list,
+        'transactions': TRANSACTION_ROW.many(transactions),
         'total_spent': total_spent,
         'total_spent_formatted': format_peso(total_spent),
-        'total_orders': len(transactions_list)
+        'total_orders': total_orders
     })
 
 @app.route('/api/admin/products', methods=['POST'])
@@ -1146,16 +3485,8 @@ def admin_add_product():
             data.get('image_path', '')
         ))
         
-        # Add to category tree
-        category_node = category_tree.get_category(int(data['category_id']))
-        if category_node:
-            category_node.add_product(product_id)
-        
-        # Add to "All Categories" root node
-        root_category = category_tree.get_category(0)
-        if root_category:
-            root_category.add_product(product_id)
-        
+        db.bump_versions('products', 'categories')  # every worker rebuilds its category tree
+        admin_summary.invalidate()
         return jsonify({'success': True, 'product_id': product_id})
         
     except Exception as e:
@@ -1175,19 +3506,7 @@ def admin_get_product(product_id):
     if not product:
         return jsonify({'error': 'Product not found'}), 404
     
-    product_data = {
-        'id': product[0][0],
-        'name': product[0][1],
-        'description': product[0][2],
-        'price': product[0][3],
-        'price_formatted': format_peso(product[0][3]),
-        'stock': product[0][4],
-        'category_id': product[0][5],
-        'image_path': product[0][6],
-        'is_active': bool(product[0][7])
-    }
-    
-    return jsonify(product_data)
+    return jsonify(ADMIN_PRODUCT_DETAIL_ROW.one(product[0]))
 
 @app.route('/api/admin/products/<int:product_id>', methods=['PUT'])
 def admin_update_product(product_id):
@@ -1212,6 +3531,8 @@ def admin_update_product(product_id):
             data.get('image_path', ''),
             product_id
         ))
+        db.bump_versions('products', 'categories')
+        admin_summary.invalidate()
         
         return jsonify({'success': True})
         
@@ -1225,6 +3546,8 @@ def admin_delete_product(product_id):
     
     try:
         db.execute_query("DELETE FROM products WHERE id = ?", (product_id,))
+        db.bump_versions('products', 'categories')
+        admin_summary.invalidate()
         return jsonify({'success': True})
         
     except Exception as e:
@@ -1275,13 +3598,7 @@ def update_account():
         return jsonify({'success': False, 'message': 'Current password required'})
     
     # Verify current password
-    current_hash = db.hash_password(current_password)
-    user_check = db.execute_query(
-        "SELECT id FROM users WHERE id = ? AND password_hash = ?",
-        (user_id, current_hash)
-    )
-    
-    if not user_check:
+    if not db.verify_user_password(user_id, current_password):
         return jsonify({'success': False, 'message': 'Current password is incorrect'})
     
     # Check if new username is available
@@ -1310,6 +3627,8 @@ def update_account():
                 "UPDATE users SET password_hash = ? WHERE id = ?",
                 (new_hash, user_id)
             )
+            # Sign out the user's other sessions
+            app.session_interface.revoke_user(user_id, keep_sid=session.sid)
         
         # Update session
         session['username'] = new_username
@@ -1325,28 +3644,25 @@ def get_user_orders():
         return jsonify({'error': 'Not logged in'}), 401
     
     user_id = session['user_id']
-    orders = db.execute_query('''
+    orders = db.execute_history('''
         SELECT id, total_amount, status, created_at
-        FROM orders
+        FROM {orders}
         WHERE user_id = ?
         ORDER BY created_at DESC
         LIMIT 10
-    ''', (user_id,))
-    
-    orders_list = []
-    for order in orders:
-        orders_list.append({
-            'id': order[0],
-            'total': order[1],
-            'total_formatted': format_peso(order[1]),
-            'status': order[2],
-            'date': order[3]
-        })
+    ''', (user_id,), include_archive=wants_archive())
     
-    return jsonify(orders_list)
+    return jsonify(USER_ORDER_ROW.many(orders))
+
+@app.route('/api/orders/stream')
+def stream_user_orders():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+    return event_stream(f"user:{session['user_id']}")
 
 # Image upload route with unique filename generation
 @app.route('/upload_image', methods=['POST'])
+@rate_limited('upload')
 def upload_image():
     if 'user_id' not in session or session['role'] != 'admin':
         return jsonify({'success': False, 'message': 'Unauthorized'})
@@ -1382,5 +3698,569 @@ def upload_image():
 def uploaded_file(filename):
     return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
 
+# Online backups
+app.config['BACKUP_DIR'] = os.environ.get('BACKUP_DIR', os.path.join(INSTANCE_PATH, 'backups'))
+app.config['BACKUP_KEEP'] = int(os.environ.get('BACKUP_KEEP', 7))
+app.config['BACKUP_STEP_PAGES'] = int(os.environ.get('BACKUP_STEP_PAGES', 256))
+app.config['BACKUP_STEP_SLEEP'] = float(os.environ.get('BACKUP_STEP_SLEEP', 0.02))
+app.config['BACKUP_MAX_RESTARTS'] = int(os.environ.get('BACKUP_MAX_RESTARTS', 3))  # rollback-journal databases only
+app.config['BACKUP_INTERVAL_HOURS'] = float(os.environ.get('BACKUP_INTERVAL_HOURS', 0))  # 0 = no scheduled backups
+
+class BackupRestarted(Exception):
+    """Another connection wrote to the source, so SQLite started the copy over"""
+
+class BackupBusy(sqlite3.OperationalError):
+    """The source kept changing, so the copy was abandoned after max_restarts restarts"""
+
+class BackupManager:
+    """Throttled online snapshots through SQLite's backup API.
+
+    Pages are copied step_pages at a time with a step_sleep pause in between. On a
+    WAL database (the default, see init_database) the copy reads from one snapshot
+    held open for the whole backup, so writers are never blocked and the copy never
+    restarts; the WAL just cannot be checkpointed past that snapshot meanwhile. On
+    a rollback-journal database each step holds the read lock for a millisecond or
+    so, and a write from another connection restarts the copy; after max_restarts
+    restarts it gives up with BackupBusy (a scheduled backup is retried on the next
+    check). Snapshots are written to a .partial file, checked with PRAGMA
+    integrity_check, then renamed, and only the newest `keep` are kept.
+    """
+    PREFIX = 'ecommerce-'
+    
+    def __init__(self, db_path, directory, keep=7, step_pages=256, step_sleep=0.02, max_restarts=3):
+        self.db_path = db_path
+        self.directory = directory
+        self.keep = keep
+        self.step_pages = step_pages
+        self.step_sleep = step_sleep
+        self.max_restarts = max_restarts
+        self.progress = None  # the running (or last) backup of this process
+        self.lock = threading.Lock()
+        self.scheduler = BackgroundFlusher('backup-scheduler', 60, self.run_if_due)
+    
+    def snapshots(self):
+        """Finished snapshots, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for filename in os.listdir(self.directory):
+            if filename.startswith(self.PREFIX) and filename.endswith('.db'):
+                path = os.path.join(self.directory, filename)
+                info = {'file': filename, 'size': os.path.getsize(path), 'created_at': os.path.getmtime(path)}
+                try:
+                    with open(path + '.json', encoding='utf-8') as f:
+                        info.update(json.load(f))
+                except (OSError, ValueError):
+                    pass
+                found.append(info)
+        return sorted(found, key=lambda info: info['file'], reverse=True)
+    
+    @contextmanager
+    def exclusive(self):
+        """Yield True if no other thread or process (POSIX) is backing up"""
+        if not self.lock.acquire(blocking=False):
+            yield False
+            return
+        try:
+            if fcntl is None:
+                yield True
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, '.lock'), 'a') as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        finally:
+            self.lock.release()
+    
+    def run(self, reason='manual', min_age=None):
+        """Take a snapshot; returns its metadata, or None if one younger than min_age seconds exists.
+
+        Raises RuntimeError if a backup is already running.
+        """
+        with self.exclusive() as acquired:
+            if not acquired:
+                raise RuntimeError('A backup is already running')
+            latest = self.snapshots()[:1]
+            if min_age and latest and time.time() - latest[0]['created_at'] < min_age:
+                return None
+            return self._backup(reason)
+    
+    def start(self, reason='manual'):
+        """run() in a background thread; raises RuntimeError at once if a backup is already running"""
+        claim = ExitStack()
+        if not claim.enter_context(self.exclusive()):
+            claim.close()
+            raise RuntimeError('A backup is already running')
+        
+        def backup():
+            with claim:
+                try:
+                    self._backup(reason)
+                except Exception:
+                    pass  # recorded in self.progress and printed
+        
+        threading.Thread(target=backup, name='backup', daemon=True).start()
+    
+    def run_if_due(self):
+        interval = app.config['BACKUP_INTERVAL_HOURS'] * 3600
+        if interval:
+            try:
+                self.run('scheduled', min_age=interval)
+            except RuntimeError:
+                pass  # another worker is on it
+    
+    def _backup(self, reason):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        filename = f"{self.PREFIX}{stamp}.db"
+        suffix = 1
+        while os.path.exists(os.path.join(self.directory, filename)):
+            suffix += 1
+            filename = f"{self.PREFIX}{stamp}-{suffix}.db"
+        target = os.path.join(self.directory, filename)
+        partial = target + '.partial'
+        started = time.perf_counter()
+        progress = self.progress = {'file': filename, 'reason': reason, 'status': 'copying', 'started_at': time.time(),
+                                    'pages_total': None, 'pages_copied': 0, 'restarts': 0}
+        print(f"💾 Backup {filename} started ({reason})")
+        
+        def on_step(status, remaining, total):
+            done = total - remaining
+            if done < progress['pages_copied']:
+                raise BackupRestarted()
+            if total and done * 10 // total > progress['pages_copied'] * 10 // total:
+                print(f"💾 Backup {filename}: {done * 100 // total}% ({done:,}/{total:,} pages)")
+            progress.update(pages_total=total, pages_copied=done)
+            if remaining:
+                time.sleep(self.step_sleep)
+        
+        try:
+            source = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                progress['journal_mode'] = source.execute("PRAGMA journal_mode").fetchone()[0]
+                if progress['journal_mode'] == 'wal':
+                    # Pin one snapshot; the backup reads through this connection's transaction
+                    source.execute("BEGIN")
+                    source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                while True:
+                    target_conn = sqlite3.connect(partial)
+                    try:
+                        source.backup(target_conn, pages=self.step_pages, progress=on_step)
+                        break
+                    except BackupRestarted:
+                        if progress['restarts'] >= self.max_restarts:
+                            raise BackupBusy(f"database kept changing ({progress['restarts']} restarts), "
+                                             f"giving up until the next attempt")
+                        progress.update(restarts=progress['restarts'] + 1, pages_total=None, pages_copied=0)
+                        print(f"💾 Backup {filename}: database changed, restarting")
+                    finally:
+                        target_conn.close()
+            finally:
+                source.close()
+            
+            progress['status'] = 'verifying'
+            target_conn = sqlite3.connect(partial)
+            try:
+                problems = [row[0] for row in target_conn.execute("PRAGMA integrity_check")]
+            finally:
+                target_conn.close()
+            if problems != ['ok']:
+                raise sqlite3.DatabaseError(f"integrity_check failed: {'; '.join(problems[:5])}")
+            
+            os.replace(partial, target)
+            progress.update(status='done', integrity='ok', size=os.path.getsize(target),
+                            seconds=round(time.perf_counter() - started, 3))
+            with open(target + '.json', 'w', encoding='utf-8') as f:
+                json.dump(progress, f)
+        except Exception as e:
+            progress.update(status='failed', error=str(e))
+            if os.path.exists(partial):
+                os.remove(partial)
+            print(f"❌ Backup {filename} failed: {e}")
+            raise
+        
+        removed = self.rotate()
+        print(f"✅ Backup {filename}: {progress['size']:,} bytes in {progress['seconds']}s, "
+              f"{progress['restarts']} restart(s), integrity ok, {removed} old snapshot(s) removed")
+        return progress
+    
+    def rotate(self):
+        """Delete all but the newest `keep` snapshots"""
+        removed = 0
+        for info in self.snapshots()[self.keep:]:
+            path = os.path.join(self.directory, info['file'])
+            for stale in (path, path + '.json'):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            removed += 1
+        return removed
+
+@service('backups')
+def backups():
+    return BackupManager(app.config['DATABASE_PATH'], app.config['BACKUP_DIR'], app.config['BACKUP_KEEP'],
+                         app.config['BACKUP_STEP_PAGES'], app.config['BACKUP_STEP_SLEEP'],
+                         app.config['BACKUP_MAX_RESTARTS'])
+
+def collect_last_backup():
+    latest = backups.snapshots()[:1]
+    return latest[0]['created_at'] if latest else 0
+
+metrics.gauge('backup_last_success_timestamp_seconds', 'When the newest verified snapshot was taken',
+              collect=collect_last_backup, aggregate='max')
+
+@app.route('/api/admin/backups', methods=['GET', 'POST'])
+def admin_backups():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    if request.method == 'POST':
+        try:
+            backups.start('admin')
+        except RuntimeError as e:
+            return jsonify({'success': False, 'message': str(e)}), 409
+        return jsonify({'success': True, 'message': 'Backup started'}), 202
+    
+    return jsonify({'snapshots': backups.snapshots(), 'progress': backups.progress})
+
+# Order archival (hot/cold split of orders and order_items)
+app.config['ARCHIVE_AFTER_DAYS'] = int(os.environ.get('ARCHIVE_AFTER_DAYS', 180))
+app.config['ARCHIVE_BATCH_SIZE'] = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+app.config['ARCHIVE_BATCH_SLEEP'] = float(os.environ.get('ARCHIVE_BATCH_SLEEP', 0.05))
+app.config['ARCHIVE_INTERVAL_HOURS'] = float(os.environ.get('ARCHIVE_INTERVAL_HOURS', 0))  # 0 = no scheduled runs
+
+class OrderArchiver:
+    """Moves delivered orders older than after_days, with their items, to the archive database.
+
+    Each batch of up to batch_size orders is first copied to the archive in its own
+    transaction, then deleted from the hot tables in a second, short one; batches are
+    batch_sleep apart so checkouts get the write lock in between. A crash between the
+    two leaves copies of orders that are still in the hot tables, which the next run
+    copies again over the top. Ids are kept; the hot tables are AUTOINCREMENT, so
+    archived ids are never handed out again.
+    """
+    def __init__(self, database, after_days=180, batch_size=500, batch_sleep=0.05):
+        self.db = database
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.batch_sleep = batch_sleep
+        self.progress = None  # the running (or last) run of this process
+        self.lock = threading.Lock()
+        self.scheduler = BackgroundFlusher('order-archiver', app.config['ARCHIVE_INTERVAL_HOURS'] * 3600,
+                                           self.run_scheduled)
+    
+    @contextmanager
+    def exclusive(self):
+        """Yield True if no other thread or process (POSIX) is archiving"""
+        if not self.lock.acquire(blocking=False):
+            yield False
+            return
+        try:
+            if fcntl is None:
+                yield True
+                return
+            with open(self.db.archive_path + '.lock', 'a') as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        finally:
+            self.lock.release()
+    
+    def run(self, reason='manual', limit=None):
+        """Archive up to limit (default: all) eligible orders and return the run's summary.
+
+        Raises RuntimeError if archival is already running.
+        """
+        with self.exclusive() as acquired:
+            if not acquired:
+                raise RuntimeError('Order archival is already running')
+            return self._archive(reason, limit)
+    
+    def start(self, reason='manual'):
+        """run() in a background thread; raises RuntimeError at once if archival is already running"""
+        claim = ExitStack()
+        if not claim.enter_context(self.exclusive()):
+            claim.close()
+            raise RuntimeError('Order archival is already running')
+        
+        def archive():
+            with claim:
+                try:
+                    self._archive(reason, None)
+                except Exception:
+                    pass  # recorded in self.progress and printed
+        
+        threading.Thread(target=archive, name='order-archiver', daemon=True).start()
+    
+    def run_scheduled(self):
+        try:
+            self.run('scheduled')
+        except RuntimeError:
+            pass  # another worker is on it
+    
+    def _archive(self, reason, limit):
+        started = time.perf_counter()
+        progress = self.progress = {'reason': reason, 'status': 'running', 'started_at': time.time(),
+                                    'after_days': self.after_days, 'orders': 0, 'items': 0, 'batches': 0}
+        select_batch = '''
+            SELECT id FROM main.orders
+            WHERE status = 'delivered' AND created_at < datetime('now', ?)
+            ORDER BY id
+            LIMIT ?
+        '''
+        conn = self.db.open_connection()
+        try:
+            self.db.attach_archive(conn)
+            while limit is None or progress['orders'] < limit:
+                size = self.batch_size if limit is None else min(self.batch_size, limit - progress['orders'])
+                ids = [row[0] for row in conn.execute(select_batch, (f"-{self.after_days} days", size))]
+                if not ids:
+                    break
+                items = self._copy(conn, ids)
+                moved = self._delete(conn, ids)
+                progress['orders'] += len(moved)
+                progress['items'] += items
+                progress['batches'] += 1
+                if len(ids) < size:
+                    break
+                time.sleep(self.batch_sleep)
+        except Exception as e:
+            progress.update(status='failed', error=str(e), seconds=round(time.perf_counter() - started, 3))
+            print(f"❌ Order archival failed after {progress['orders']} orders: {e}")
+            raise
+        finally:
+            conn.close()
+        
+        progress.update(status='done', seconds=round(time.perf_counter() - started, 3))
+        if progress['orders']:
+            admin_summary.invalidate()  # archived_order_count moved
+        print(f"🗄️ Archived {progress['orders']} orders ({progress['items']} items) older than "
+              f"{self.after_days} days in {progress['batches']} batch(es), {progress['seconds']}s")
+        return progress
+    
+    def _copy(self, conn, ids):
+        """Copy orders ids and their items into the archive (replacing earlier copies), return the item count"""
+        placeholders = ','.join('?' for _ in ids)
+        orders, items = ARCHIVED_TABLES['orders'], ARCHIVED_TABLES['order_items']
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")  # only writes the archive, so main's write lock is not taken
+        try:
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO archive.orders ({orders})
+                SELECT {orders} FROM main.orders WHERE id IN ({placeholders})
+            ''', ids)
+            cursor.execute(f"DELETE FROM archive.order_items WHERE order_id IN ({placeholders})", ids)
+            cursor.execute(f'''
+                INSERT INTO archive.order_items ({items})
+                SELECT {items} FROM main.order_items WHERE order_id IN ({placeholders})
+            ''', ids)
+            conn.commit()
+            return cursor.rowcount
+        except Exception:
+            conn.rollback()
+            raise
+    
+    def _delete(self, conn, ids):
+        """Delete the copied orders that are still delivered from the hot tables, return their ids.
+
+        Orders whose status changed since the copy stay, and their copies are dropped.
+        """
+        placeholders = ','.join('?' for _ in ids)
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            moved = [row[0] for row in cursor.execute(
+                f"SELECT id FROM main.orders WHERE id IN ({placeholders}) AND status = 'delivered'", ids
+            )]
+            moved_placeholders = ','.join('?' for _ in moved)
+            cursor.execute(f"DELETE FROM main.order_items WHERE order_id IN ({moved_placeholders})", moved)
+            cursor.execute(f"DELETE FROM main.orders WHERE id IN ({moved_placeholders})", moved)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        stale = [order_id for order_id in ids if order_id not in set(moved)]
+        if stale:
+            placeholders = ','.join('?' for _ in stale)
+            with conn:
+                conn.execute(f"DELETE FROM archive.order_items WHERE order_id IN ({placeholders})", stale)
+                conn.execute(f"DELETE FROM archive.orders WHERE id IN ({placeholders})", stale)
+        return moved
+
+@service('order_archiver')
+def order_archiver():
+    return OrderArchiver(db, app.config['ARCHIVE_AFTER_DAYS'], app.config['ARCHIVE_BATCH_SIZE'],
+                         app.config['ARCHIVE_BATCH_SLEEP'])
+
+@app.route('/api/admin/archive', methods=['GET', 'POST'])
+def admin_archive():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    if request.method == 'POST':
+        try:
+            order_archiver.start('admin')
+        except RuntimeError as e:
+            return jsonify({'success': False, 'message': str(e)}), 409
+        return jsonify({'success': True, 'message': 'Order archival started'}), 202
+    
+    return jsonify({
+        'after_days': order_archiver.after_days,
+        'archive_size': os.path.getsize(db.archive_path) if db.has_archive() else 0,
+        'database_size': os.path.getsize(db.db_path),
+        'progress': order_archiver.progress
+    })
+
+# Application factory and process model
+#
+# Importing this module only defines the app and its routes. create_app() does the
+# one-off work (schema setup and migrations, preloading the category tree) in the
+# calling process; under a preforking server (see gunicorn.conf.py) that is the
+# master, before any worker exists. Each worker then runs init_worker() once,
+# which drops the services inherited from the master except PROCESS_SHARED_SERVICES,
+# so threads, timers, buffers and SSE subscribers are always created per process.
+PROCESS_SHARED_SERVICES = ('db', 'category_tree')
+worker_init_hooks = []
+worker_pid = None
+
+def on_worker_init(func):
+    """Register func to run in every worker process before it serves its first request"""
+    worker_init_hooks.append(func)
+    return func
+
+def init_worker():
+    """Per-process initialization (gunicorn post_fork, or the first request in a process)"""
+    global worker_pid
+    with services.lock:
+        services.reset(keep=PROCESS_SHARED_SERVICES)
+        for hook in worker_init_hooks:
+            hook()
+        worker_pid = os.getpid()
+
+def shutdown_worker():
+    """Flush the write-behind buffers of the services this process created"""
+    for name, flush in (('history_store', 'flush'), ('product_views', 'flush'),
+                        ('notification_coalescer', 'flush_all')):
+        instance = services.built(name)
+        if instance is not None:
+            getattr(instance, flush)()
+    if metrics.has_values():
+        metrics.write_snapshot()  # final counters, retired into the totals by the next scrape
+
+atexit.register(shutdown_worker)
+
+@on_worker_init
+def reset_metrics():
+    metrics.reset()
+
+@on_worker_init
+def start_backup_scheduler():
+    if app.config['BACKUP_INTERVAL_HOURS']:
+        backups.scheduler.ensure_started()
+
+@on_worker_init
+def start_view_log():
+    # Scores are rebuilt off the request path, before the first trending request
+    product_views.flusher.ensure_started()
+
+@on_worker_init
+def start_order_archiver():
+    if app.config['ARCHIVE_INTERVAL_HOURS']:
+        order_archiver.scheduler.ensure_started()
+
+@on_worker_init
+def reset_session_cache():
+    with app.session_interface.lock:
+        app.session_interface.cache.clear()
+        app.session_interface.touched.clear()
+
+def ensure_worker_initialized():
+    if worker_pid != os.getpid():
+        with services.lock:
+            if worker_pid != os.getpid():
+                init_worker()
+
+# Ahead of every other before_request hook, so none of them touches state init_worker() resets
+app.before_request_funcs.setdefault(None, []).insert(0, ensure_worker_initialized)
+
+def create_app(config=None):
+    """Configure the app and do the one-off startup work in this process.
+
+    config overrides app.config (e.g. a throwaway DATABASE_PATH for tests and
+    load runs). Call it once in the master before forking workers.
+    """
+    if config:
+        if 'DATABASE_PATH' in config and config['DATABASE_PATH'] != app.config['DATABASE_PATH']:
+            services.reset()
+        app.config.update(config)
+    
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    services.get('db')  # creates the schema and runs migrations
+    if app.config['PRELOAD_SERVICES']:
+        services.get('category_tree')
+    # A fresh database hashes the default admin password; stop that pool so
+    # workers are not forked with its processes and management thread
+    password_hasher.shutdown(wait=True)
+    return app
+
+# CLI commands (run with: flask --app app <command>)
+@app.cli.command('rebuild-customer-stats')
+def rebuild_customer_stats_command():
+    """Backfill customer_stats and orders.item_count from the order history."""
+    count = db.rebuild_customer_stats()
+    print(f"✅ Rebuilt spending stats for {count} customers")
+
+@app.cli.command('export')
+@click.argument('dataset', type=click.Choice(list(EXPORT_DATASETS)))
+@click.option('--format', 'fmt', type=click.Choice(list(EXPORT_FORMATS)), default='csv')
+@click.option('--start', help='First day to include (YYYY-MM-DD)')
+@click.option('--end', help='Last day to include (YYYY-MM-DD)')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-', help='Output file (default: stdout)')
+@click.option('--include-archive', is_flag=True, help='Include orders moved to the archive database')
+def export_command(dataset, fmt, start, end, output, include_archive):
+    """Stream orders, order_items or customers as CSV or NDJSON."""
+    for chunk in iter_export(dataset, fmt, start, end, include_archive=include_archive):
+        output.write(chunk)
+
+@app.cli.command('backup')
+@click.option('--keep', type=int, help='Snapshots to keep (default: BACKUP_KEEP)')
+@click.option('--list', 'list_only', is_flag=True, help='List snapshots instead of taking one')
+def backup_command(keep, list_only):
+    """Take a verified online snapshot of the database without blocking the app."""
+    if keep is not None:
+        backups.keep = keep
+    if list_only:
+        for info in backups.snapshots():
+            print(f"{info['file']}  {info['size']:>14,} bytes  {info.get('seconds', '?')}s  {info.get('restarts', '?')} restart(s)")
+        return
+    try:
+        backups.run('cli')
+    except (RuntimeError, sqlite3.Error) as e:
+        raise click.ClickException(str(e))
+
+@app.cli.command('archive-orders')
+@click.option('--days', type=int, help='Archive delivered orders older than this (default: ARCHIVE_AFTER_DAYS)')
+@click.option('--limit', type=int, help='Stop after this many orders')
+def archive_orders_command(days, limit):
+    """Move old delivered orders and their items into the archive database."""
+    if days is not None:
+        order_archiver.after_days = days
+    try:
+        order_archiver.run('cli', limit)
+    except (RuntimeError, sqlite3.Error) as e:
+        raise click.ClickException(str(e))
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""Browsing history micro-benchmark: insert cost and per-user memory footprint.
+
+Compares the current BrowsingHistory with the original singly linked list
+implementation (kept below as the baseline).
+
+Run with: python benchmarks/bench_history.py [--depth 50] [--users 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import BrowsingHistory  # noqa: E402
+
+
+class LinkedNode:
+    def __init__(self, product_id, product_name, image_path=None, price=None, timestamp=None):
+        self.product_id = product_id
+        self.product_name = product_name
+        self.image_path = image_path or ''
+        self.price = price or 0
+        self.timestamp = timestamp or datetime.now().isoformat()
+        self.next = None
+
+
+class LinkedListHistory:
+    """Original implementation: O(n) remove and O(n) tail eviction per insert"""
+    def __init__(self, max_size=5):
+        self.head = None
+        self.max_size = max_size
+        self.size = 0
+
+    def add_product(self, product_id, product_name, image_path=None, price=None):
+        self.remove_product(product_id)
+        new_node = LinkedNode(product_id, product_name, image_path, price)
+        new_node.next = self.head
+        self.head = new_node
+        self.size += 1
+        if self.size > self.max_size:
+            self._remove_last()
+
+    def remove_product(self, product_id):
+        if not self.head:
+            return
+        if self.head.product_id == product_id:
+            self.head = self.head.next
+            self.size -= 1
+            return
+        current = self.head
+        while current.next:
+            if current.next.product_id == product_id:
+                current.next = current.next.next
+                self.size -= 1
+                break
+            current = current.next
+
+    def _remove_last(self):
+        if not self.head.next:
+            self.head = None
+            self.size = 0
+            return
+        current = self.head
+        while current.next.next:
+            current = current.next
+        current.next = None
+        self.size -= 1
+
+
+def bench_inserts(factory, depth, operations, catalog):
+    rng = random.Random(42)
+    product_ids = [rng.randrange(catalog) for _ in range(operations)]
+    history = factory(depth)
+    start = time.perf_counter()
+    for product_id in product_ids:
+        history.add_product(product_id, 'Product name', 'image.jpg', 999.0)
+    elapsed = time.perf_counter() - start
+    return operations / elapsed
+
+
+def bench_memory(factory, depth, users):
+    names = [f'Product {i}' for i in range(depth)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    histories = []
+    for _ in range(users):
+        history = factory(depth)
+        for i in range(depth):
+            history.add_product(i, names[i], 'image.jpg', 999.0)
+        histories.append(history)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=50, help='history max_size')
+    parser.add_argument('--operations', type=int, default=200000)
+    parser.add_argument('--catalog', type=int, default=500, help='distinct products viewed')
+    parser.add_argument('--users', type=int, default=20000, help='histories for the memory measurement')
+    args = parser.parse_args()
+
+    implementations = [('linked list (baseline)', LinkedListHistory), ('BrowsingHistory', BrowsingHistory)]
+    print(f"depth={args.depth} operations={args.operations} catalog={args.catalog} users={args.users}")
+    print(f"{'implementation':<24} {'inserts/s':>12} {'bytes/user':>12}")
+    for label, factory in implementations:
+        rate = bench_inserts(factory, args.depth, args.operations, args.catalog)
+        per_user = bench_memory(factory, args.depth, args.users)
+        print(f"{label:<24} {rate:>12,.0f} {per_user:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""JSON serialization micro-benchmark for a large product listing.
+
+Compares the original per-route dict building with Flask's default JSON
+provider (sorted keys, stdlib encoder) against RowMapper + FastJSONProvider.
+orjson is used by the fast path when it is installed.
+
+Run with: python benchmarks/bench_json.py [--products 10000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import PRODUCT_ROW, app, format_peso, orjson  # noqa: E402
+
+unmemoized_format_peso = format_peso.__wrapped__
+
+
+def make_rows(count):
+    rng = random.Random(42)
+    categories = ['Electronics', 'Clothing', 'Books', 'Home & Garden', None]
+    return [
+        (
+            i,
+            f'Product {i}',
+            f'Description for product {i} with a few more words in it',
+            rng.choice([199.0, 499.5, 999.0, 1299.99, 24999.0, rng.randrange(100, 100000) / 100]),
+            rng.randrange(0, 200),
+            f'images/product_{i}.jpg',
+            rng.choice(categories)
+        )
+        for i in range(count)
+    ]
+
+
+def baseline(rows):
+    """Original route code: hand-built dicts and Flask's default dumps settings"""
+    products_list = []
+    for product in rows:
+        products_list.append({
+            'id': product[0],
+            'name': product[1],
+            'description': product[2],
+            'price': product[3],
+            'price_formatted': unmemoized_format_peso(product[3]),
+            'stock': product[4],
+            'image_path': product[5],
+            'category': product[6]
+        })
+    return json.dumps(products_list, ensure_ascii=True, sort_keys=True).encode()
+
+
+def fast(rows):
+    return app.json.response(PRODUCT_ROW.many(rows)).get_data()
+
+
+def timed(func, rows, repeat):
+    func(rows)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func(rows)
+        best = min(best, time.perf_counter() - start)
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20, help='runs per implementation (best is reported)')
+    args = parser.parse_args()
+
+    rows = make_rows(args.products)
+    print(f"products={args.products} repeat={args.repeat} encoder={'orjson' if orjson else 'stdlib json'}")
+    print(f"{'implementation':<28} {'best ms':>10} {'bytes':>12}")
+    with app.app_context():
+        results = [('dict loop + default json', baseline), ('RowMapper + FastJSON', fast)]
+        timings = []
+        for label, func in results:
+            elapsed, size = timed(func, rows, args.repeat)
+            timings.append(elapsed)
+            print(f"{label:<28} {elapsed * 1000:>10.2f} {size:>12,}")
+    print(f"speedup: {timings[0] / timings[1]:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
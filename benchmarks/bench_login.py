@@ -0,0 +1,73 @@
+"""Password verification throughput at a few KDF cost settings.
+
+Run with: python benchmarks/bench_login.py [--logins 200] [--threads 8] [--workers 2]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passwords import PasswordHasher, hash_password  # noqa: E402
+
+SETTINGS = [
+    ('legacy_sha256', None),
+    ('pbkdf2_sha256', 100000),
+    ('pbkdf2_sha256', 260000),
+    ('pbkdf2_sha256', 600000),
+    ('scrypt', 14),
+    ('scrypt', 15),
+]
+
+
+def run(scheme, cost, logins, threads, workers):
+    if scheme == 'legacy_sha256':
+        import hashlib
+        hasher = PasswordHasher(workers=workers)
+        encoded = hashlib.sha256(b'correct horse').hexdigest()
+    else:
+        hasher = PasswordHasher(scheme=scheme, cost=cost, workers=workers)
+        encoded = hash_password('correct horse', scheme, cost)
+
+    hasher.verify('correct horse', encoded)  # warm up the pool
+    latencies = []
+
+    def login(_):
+        start = time.perf_counter()
+        assert hasher.verify('correct horse', encoded)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+
+    latencies.sort()
+    return {
+        'scheme': scheme,
+        'cost': cost,
+        'logins_per_sec': logins / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8, help='concurrent request threads')
+    parser.add_argument('--workers', type=int, default=2, help='hashing process pool size (0 = inline)')
+    args = parser.parse_args()
+
+    print(f"{'scheme':<15} {'cost':>8} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for scheme, cost in SETTINGS:
+        result = run(scheme, cost, args.logins, args.threads, args.workers)
+        print(f"{result['scheme']:<15} {str(result['cost'] or '-'):>8} {result['logins_per_sec']:>10.1f} "
+              f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
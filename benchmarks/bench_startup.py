@@ -0,0 +1,161 @@
+"""Startup benchmark: cold start time and per-worker memory.
+
+Every measurement runs in a fresh interpreter against a throwaway copy of the
+database:
+  lazy    import + create_app() as wsgi.py does, then the first request
+  eager   the same, but every service is built up front (the old import-time behaviour)
+  workers private memory of forked workers after their first request, with the app
+          preloaded in the parent (gunicorn preload_app) vs imported by each worker
+
+Run with: python benchmarks/bench_startup.py [--runs 5] [--workers 4]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def private_kb():
+    """Memory only this process holds (Linux), else peak RSS"""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return sum(int(fields[key].split()[0]) for key in ('Private_Clean', 'Private_Dirty'))
+    except (OSError, KeyError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def first_request(app):
+    response = app.test_client().get('/api/products')
+    assert response.status_code == 200, response.status_code
+
+
+def run_startup(database, eager):
+    start = time.perf_counter()
+    import app as module
+    imported = time.perf_counter()
+    app = module.create_app({'DATABASE_PATH': database})
+    if eager:
+        for name in module.services.factories:
+            module.services.get(name)
+    created = time.perf_counter()
+    first_request(app)
+    served = time.perf_counter()
+    return {
+        'import_ms': (imported - start) * 1000,
+        'create_app_ms': (created - imported) * 1000,
+        'first_request_ms': (served - created) * 1000,
+        'total_ms': (served - start) * 1000,
+        'rss_kb': rss_kb()
+    }
+
+
+def run_workers(database, workers, preload):
+    if preload:
+        import app as module
+        module.create_app({'DATABASE_PATH': database})
+
+    readers = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        if os.fork() == 0:
+            os.close(read_fd)
+            if preload:
+                module.init_worker()
+                app = module.app
+            else:
+                import app as module
+                app = module.create_app({'DATABASE_PATH': database})
+            first_request(app)
+            os.write(write_fd, str(private_kb()).encode())
+            os._exit(0)
+        os.close(write_fd)
+        readers.append(read_fd)
+
+    sizes = []
+    for read_fd in readers:
+        sizes.append(int(os.read(read_fd, 64)))
+        os.close(read_fd)
+        os.wait()
+    return {'private_kb': statistics.mean(sizes)}
+
+
+def child(args):
+    if args.child == 'workers':
+        result = run_workers(args.database, args.workers, args.preload)
+    else:
+        result = run_startup(args.database, args.child == 'eager')
+    print(json.dumps(result))
+
+
+def measure(mode, database, runs, extra=()):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', mode, '--database', database, *extra],
+            check=True, capture_output=True, text=True, cwd=ROOT
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: statistics.median(result[key] for result in results) for key in results[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per mode (median is reported)')
+    parser.add_argument('--workers', type=int, default=4, help='forked workers per memory measurement')
+    parser.add_argument('--child', choices=['lazy', 'eager', 'workers'], help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    parser.add_argument('--preload', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        database = os.path.join(workdir, 'ecommerce.db')
+        source = os.path.join(ROOT, 'instance', 'ecommerce.db')
+        if os.path.exists(source):
+            shutil.copy(source, database)
+        # Create the schema once so no run pays for migrations
+        measure('lazy', database, 1)
+
+        print(f"runs={args.runs} workers={args.workers}")
+        print(f"{'startup':<10} {'import ms':>10} {'create ms':>10} {'1st req ms':>11} {'total ms':>10} {'RSS MB':>8}")
+        for mode in ('eager', 'lazy'):
+            r = measure(mode, database, args.runs)
+            print(f"{mode:<10} {r['import_ms']:>10.1f} {r['create_app_ms']:>10.1f} "
+                  f"{r['first_request_ms']:>11.1f} {r['total_ms']:>10.1f} {r['rss_kb'] / 1024:>8.1f}")
+
+        print(f"\n{'workers':<10} {'private MB per worker':>22}")
+        for label, extra in (('import', ()), ('preload', ('--preload',))):
+            r = measure('workers', database, 1, ('--workers', str(args.workers), *extra))
+            print(f"{label:<10} {r['private_kb'] / 1024:>22.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+"""Load test: scripted storefront and admin scenarios against a local WSGI server.
+
+Starts the app in a subprocess on a threaded WSGI server with a throwaway,
+freshly seeded database (rate limiting off, cheap password hashing), then runs
+each scenario with N concurrent keep-alive clients and reports p50/p95/p99
+latency and requests/sec. Results are written as JSON so runs can be compared.
+
+Scenarios:
+  browse_categories  GET /api/categories, then a category listing
+  search             GET /api/products?search=<term>
+  product_detail     GET /api/product/<id> (logged in, so views and history are recorded)
+  add_to_cart        POST /api/cart
+  checkout           POST /api/cart, then POST /api/checkout
+  admin_orders       GET /api/admin/orders, PUT an order status, POST /api/admin/process_orders
+
+Run with: python benchmarks/load_test.py [--clients 8] [--duration 10] [--compare old.json]
+          [--backup-every SECONDS] [--from-database generated.db]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.cookies import SimpleCookie
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FOLDER = os.path.join(ROOT, 'benchmarks', 'results')
+CUSTOMER_PASSWORD = 'loadtest123'
+SEARCH_TERMS = ['phone', 'book', 'shirt', 'lamp', 'pro', 'max', 'classic', 'zzz-no-match']
+ADJECTIVES = ['Classic', 'Pro', 'Max', 'Mini', 'Ultra', 'Eco', 'Smart', 'Vintage']
+NOUNS = ['Phone', 'Laptop', 'Shirt', 'Jacket', 'Book', 'Lamp', 'Chair', 'Headphones']
+
+
+# Server side (runs in the subprocess)
+
+def seed(module, products, customers):
+    db = module.db
+    category_ids = [row[0] for row in db.execute_query("SELECT id FROM categories WHERE id != 0")]
+    rng = random.Random(1)
+    db.execute_many('''
+        INSERT INTO products (name, description, price, stock, category_id, is_active, image_path)
+        VALUES (?, ?, ?, ?, ?, 1, '')
+    ''', [
+        (f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}", f"Load test product {i}",
+         float(rng.randrange(100, 100000)), 10 ** 9, rng.choice(category_ids))
+        for i in range(products)
+    ])
+    password_hash = db.hash_password(CUSTOMER_PASSWORD)
+    db.execute_many('''
+        INSERT INTO users (username, email, password_hash, role) VALUES (?, ?, ?, 'customer')
+    ''', [(f"loadtest{i}", f"loadtest{i}@example.com", password_hash) for i in range(customers)])
+
+
+def serve(args):
+    import logging
+    from werkzeug.serving import make_server
+
+    sys.path.insert(0, ROOT)
+    import app as module
+
+    # Schema first, then seed, then build the category tree from the seeded data
+    # Logs and metrics snapshots go next to the throwaway database
+    workdir = os.path.dirname(args.database)
+    module.create_app({
+        'DATABASE_PATH': args.database,
+        'RATELIMIT_ENABLED': False,
+        'PRELOAD_SERVICES': False,
+        'SLOW_REQUEST_LOG': os.path.join(workdir, 'slow_requests.jsonl'),
+        'METRICS_DIR': os.path.join(workdir, 'metrics'),
+        'BACKUP_DIR': os.path.join(workdir, 'backups'),
+        'BACKUP_KEEP': 1
+    })
+    seed(module, args.products, args.customers)
+    module.services.get('category_tree')
+
+    if args.backup_every is not None:
+        # Back up continuously to measure what an online backup costs the storefront
+        def back_up():
+            while True:
+                try:
+                    module.services.get('backups').run('load test')
+                except sqlite3.Error:
+                    pass  # printed by the backup; try again after the pause
+                time.sleep(args.backup_every)
+        threading.Thread(target=back_up, name='load-test-backups', daemon=True).start()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', args.port, module.app, threaded=True)
+    server.serve_forever()
+
+
+# Client side
+
+class Client:
+    """One keep-alive HTTP connection with its own session cookie"""
+    def __init__(self, port):
+        self.port = port
+        self.conn = None
+        self.cookies = {}
+
+    def request(self, method, path, payload=None):
+        body = json.dumps(payload) if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body else {}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{name}={value}" for name, value in self.cookies.items())
+
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle keep-alive connection; reconnect once
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        if response.getheader('Connection', '').lower() == 'close':
+            self.conn.close()
+            self.conn = None
+        return response.status, data
+
+    def json(self, method, path, payload=None):
+        status, data = self.request(method, path, payload)
+        return status, json.loads(data) if data else None
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+class Recorder:
+    """Latencies and failures of the measured phase of one scenario"""
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.iterations = 0
+        self.lock = threading.Lock()
+        self.recording = False
+
+    def timed(self, client, method, path, payload=None):
+        start = time.perf_counter()
+        try:
+            status, data = client.request(method, path, payload)
+            ok = status < 400
+        except OSError:
+            status, data, ok = None, b'', False
+        elapsed = time.perf_counter() - start
+        if self.recording:
+            with self.lock:
+                self.latencies.append(elapsed)
+                if not ok:
+                    self.errors += 1
+        return status, data
+
+
+def login(client, username, password):
+    status, result = client.json('POST', '/login', {'username': username, 'password': password})
+    if status != 200 or not result.get('success'):
+        raise RuntimeError(f"Login failed for {username}: {result}")
+
+
+def scenario_browse_categories(client, recorder, rng, state):
+    recorder.timed(client, 'GET', '/api/categories')
+    recorder.timed(client, 'GET', f"/api/products?category_id={rng.choice(state['category_ids'])}")
+
+
+def scenario_search(client, recorder, rng, state):
+    recorder.timed(client, 'GET', f"/api/products?search={rng.choice(SEARCH_TERMS)}")
+
+
+def scenario_product_detail(client, recorder, rng, state):
+    recorder.timed(client, 'GET', f"/api/product/{rng.choice(state['product_ids'])}")
+
+
+def scenario_add_to_cart(client, recorder, rng, state):
+    recorder.timed(client, 'POST', '/api/cart', {'product_id': rng.choice(state['product_ids']), 'quantity': 1})
+
+
+def scenario_checkout(client, recorder, rng, state):
+    recorder.timed(client, 'POST', '/api/cart', {'product_id': rng.choice(state['product_ids']), 'quantity': 1})
+    recorder.timed(client, 'POST', '/api/checkout', {'address': '1 Load Test Street', 'contact': '09170000000'})
+
+
+def scenario_admin_orders(client, recorder, rng, state):
+    status, data = recorder.timed(client, 'GET', '/api/admin/orders')
+    orders = json.loads(data) if status == 200 else []
+    if orders:
+        order = rng.choice(orders[:50])
+        recorder.timed(client, 'PUT', f"/api/admin/orders/{order['id']}/status",
+                       {'status': rng.choice(['processing', 'shipping', 'delivered'])})
+    recorder.timed(client, 'POST', '/api/admin/process_orders')
+
+
+SCENARIOS = {
+    'browse_categories': (scenario_browse_categories, 'customer'),
+    'search': (scenario_search, 'customer'),
+    'product_detail': (scenario_product_detail, 'customer'),
+    'add_to_cart': (scenario_add_to_cart, 'customer'),
+    'checkout': (scenario_checkout, 'customer'),
+    'admin_orders': (scenario_admin_orders, 'admin'),
+}
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_scenario(name, args, port, state):
+    func, role = SCENARIOS[name]
+    recorder = Recorder()
+    ready = threading.Barrier(args.clients + 1)
+    stop = threading.Event()
+    failures = []
+
+    def worker(index):
+        client = Client(port)
+        rng = random.Random(f"{name}-{index}")
+        try:
+            if role == 'admin':
+                login(client, 'admin', 'admin123')
+            else:
+                login(client, f"loadtest{index}", CUSTOMER_PASSWORD)
+            for _ in range(args.warmup):
+                func(client, recorder, rng, state)
+        except Exception as e:
+            failures.append(e)
+        finally:
+            ready.wait()
+        try:
+            while not stop.is_set() and not failures:
+                func(client, recorder, rng, state)
+                with recorder.lock:
+                    recorder.iterations += 1
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    if failures:
+        stop.set()
+        raise failures[0]
+
+    recorder.recording = True
+    started = time.perf_counter()
+    time.sleep(args.duration)
+    recorder.recording = False
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    ordered = sorted(recorder.latencies)
+    count = len(ordered)
+    return {
+        'clients': args.clients,
+        'duration_s': round(elapsed, 3),
+        'iterations': recorder.iterations,
+        'requests': count,
+        'errors': recorder.errors,
+        'rps': round(count / elapsed, 1),
+        'mean_ms': round(1000 * sum(ordered) / count, 2) if count else 0.0,
+        'p50_ms': round(1000 * percentile(ordered, 0.50), 2),
+        'p95_ms': round(1000 * percentile(ordered, 0.95), 2),
+        'p99_ms': round(1000 * percentile(ordered, 0.99), 2),
+        'max_ms': round(1000 * ordered[-1], 2) if count else 0.0,
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(process, port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            status, _ = Client(port).request('GET', '/api/categories')
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('Server did not start in time')
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    header = f"{'scenario':<18} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    print(header + ('   Δrps    Δp95' if baseline else ''))
+    for name, r in results.items():
+        line = f"{name:<18} {r['rps']:>8.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>7}"
+        before = (baseline or {}).get(name)
+        if before:
+            rps_change = (r['rps'] / before['rps'] - 1) * 100 if before['rps'] else 0
+            p95_change = (r['p95_ms'] / before['p95_ms'] - 1) * 100 if before['p95_ms'] else 0
+            line += f" {rps_change:>+6.1f}% {p95_change:>+6.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8, help='concurrent clients per scenario')
+    parser.add_argument('--duration', type=float, default=10, help='measured seconds per scenario')
+    parser.add_argument('--warmup', type=int, default=3, help='unmeasured iterations per client first')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma separated subset')
+    parser.add_argument('--products', type=int, default=500, help='products seeded into the throwaway DB')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/load_test_<time>.json)')
+    parser.add_argument('--compare', help='earlier results file to print changes against')
+    parser.add_argument('--backup-every', type=float, metavar='SECONDS',
+                        help='run online backups in the server, this many seconds apart')
+    parser.add_argument('--from-database', metavar='PATH',
+                        help='start from a copy of this database (e.g. one made by generate_data.py)')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    parser.add_argument('--customers', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix='load_test_')
+    if args.from_database:
+        shutil.copy(args.from_database, os.path.join(workdir, 'loadtest.db'))
+    port = free_port()
+    env = dict(os.environ, RATELIMIT_ENABLED='0', PASSWORD_HASH_COST='1000', PASSWORD_HASH_WORKERS='0',
+               EMAIL_COALESCE_SECONDS='3600', PYTHONUNBUFFERED='1')
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', '--port', str(port),
+         '--database', os.path.join(workdir, 'loadtest.db'),
+         '--products', str(args.products), '--customers', str(args.clients),
+         *(('--backup-every', str(args.backup_every)) if args.backup_every is not None else ())],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        wait_until_up(server, port)
+        status, categories = Client(port).json('GET', '/api/categories')
+        category_ids = []
+        pending = [categories]
+        while pending:
+            node = pending.pop()
+            category_ids.append(node['id'])
+            pending.extend(node.get('children', []))
+        _, products = Client(port).json('GET', '/api/products')
+        state = {'category_ids': category_ids, 'product_ids': [product['id'] for product in products]}
+
+        print(f"clients={args.clients} duration={args.duration}s products={args.products} port={port}")
+        results = {}
+        for name in names:
+            results[name] = run_scenario(name, args, port, state)
+            r = results[name]
+            print(f"  {name:<18} {r['requests']:>7} requests  {r['rps']:>8.1f} rps  p95 {r['p95_ms']:.2f} ms")
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'clients': args.clients,
+            'duration_s': args.duration,
+            'products': args.products,
+            'server': 'werkzeug threaded',
+            'backup_every_s': args.backup_every,
+            'from_database': args.from_database,
+        },
+        'scenarios': results
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        output = os.path.join(RESULTS_FOLDER, f"load_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['scenarios']
+    print()
+    print_results(results, baseline)
+    print(f"\n📄 Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
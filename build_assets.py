@@ -0,0 +1,233 @@
+"""Minify and fingerprint static assets for long-lived caching.
+
+Reads the JS and CSS sources under static/, writes minified copies named
+<name>.<content hash>.min.<ext> to static/dist/ and records the mapping in
+static/dist/manifest.json, which the app's asset_url() helper reads.
+--clean deletes outputs of earlier builds the new manifest no longer references.
+
+rjsmin / rcssmin are used when installed; otherwise a conservative built-in
+minifier strips comments and indentation only.
+
+Run with: python build_assets.py [--no-minify] [--clean]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+
+# Optional third-party minifiers
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_FOLDER = os.path.join(STATIC_FOLDER, 'dist')
+MANIFEST_PATH = os.path.join(DIST_FOLDER, 'manifest.json')
+SOURCE_FOLDERS = {'js': '.js', 'css': '.css'}
+
+# A '/' after one of these starts a regex literal, not a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'delete', 'new')
+
+
+def minify_js(source):
+    """Strip comments, indentation and blank lines; strings, template literals and
+    regex literals are copied untouched. Line breaks are kept so automatic
+    semicolon insertion behaves exactly as in the source."""
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+
+    out = []
+    line = []
+    literal_tail = [False]  # the current line starts inside a template literal
+    i = 0
+    n = len(source)
+    template_depth = []  # brace depth of each open ${...} inside template literals
+
+    def last_significant():
+        text = ''.join(line).rstrip()
+        if text:
+            return text
+        for previous in reversed(out):
+            if previous.strip():
+                return previous.rstrip()
+        return ''
+
+    def end_line():
+        text = ''.join(line).rstrip() if literal_tail[0] else ''.join(line).strip()
+        if text:
+            out.append(text)
+        line.clear()
+        literal_tail[0] = False
+
+    def copy_template(start):
+        # Copy a template literal up to its closing backtick or the next ${
+        j = start
+        while j < n:
+            if source[j] == '\\':
+                j += 2
+                continue
+            if source[j] == '`':
+                return j + 1, False
+            if source.startswith('${', j):
+                return j + 2, True
+            j += 1
+        return n, False
+
+    while i < n:
+        char = source[i]
+        if char == '\n':
+            end_line()
+            i += 1
+        elif source.startswith('//', i):
+            while i < n and source[i] != '\n':
+                i += 1
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            line.append(' ')
+        elif char in '"\'':
+            j = i + 1
+            while j < n and source[j] != char and source[j] != '\n':
+                j += 2 if source[j] == '\\' else 1
+            line.append(source[i:j + 1])
+            i = j + 1
+        elif char == '`' or (char == '}' and template_depth and template_depth[-1] == 0):
+            if char == '}':
+                template_depth.pop()
+            end, opened = copy_template(i + 1)
+            # Multi-line literals keep their content; only the first line joins the current one
+            parts = source[i:end].split('\n')
+            line.append(parts[0])
+            if len(parts) > 1:
+                text = ''.join(line)
+                out.append(text if literal_tail[0] else text.lstrip())
+                line.clear()
+                out.extend(parts[1:-1])
+                line.append(parts[-1])
+                literal_tail[0] = True
+            if opened:
+                template_depth.append(0)
+            i = end
+        elif char == '/' and (
+            not last_significant() or last_significant()[-1] in REGEX_PRECEDERS
+            or re.search(r'\b(' + '|'.join(REGEX_KEYWORDS) + r')$', last_significant())
+        ):
+            j = i + 1
+            in_class = False
+            while j < n and source[j] != '\n':
+                if source[j] == '\\':
+                    j += 2
+                    continue
+                if source[j] == '[':
+                    in_class = True
+                elif source[j] == ']':
+                    in_class = False
+                elif source[j] == '/' and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and source[j].isalpha():
+                j += 1
+            line.append(source[i:j])
+            i = j
+        else:
+            if template_depth:
+                if char == '{':
+                    template_depth[-1] += 1
+                elif char == '}':
+                    template_depth[-1] -= 1
+            if char in ' \t':
+                if line and line[-1] not in (' ', '\t'):
+                    line.append(' ')
+            else:
+                line.append(char)
+            i += 1
+    end_line()
+    return '\n'.join(out) + '\n'
+
+
+def minify_css(source):
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = re.sub(r':\s+', ':', source)
+    return source.replace(';}', '}').strip() + '\n'
+
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+def iter_sources():
+    for folder, extension in SOURCE_FOLDERS.items():
+        root = os.path.join(STATIC_FOLDER, folder)
+        for directory, _, files in os.walk(root):
+            for filename in sorted(files):
+                if filename.endswith(extension):
+                    path = os.path.join(directory, filename)
+                    yield os.path.relpath(path, STATIC_FOLDER).replace(os.sep, '/')
+
+
+def build(minify=True):
+    os.makedirs(DIST_FOLDER, exist_ok=True)
+    manifest = {}
+    for source_path in iter_sources():
+        with open(os.path.join(STATIC_FOLDER, source_path), encoding='utf-8') as f:
+            source = f.read()
+        stem, extension = os.path.splitext(source_path)
+        output = MINIFIERS[extension](source) if minify else source
+        digest = hashlib.blake2b(output.encode('utf-8'), digest_size=6).hexdigest()
+        built_path = f"{stem}.{digest}.min{extension}" if minify else f"{stem}.{digest}{extension}"
+
+        target = os.path.join(DIST_FOLDER, built_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if not os.path.exists(target):
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(output)
+        manifest[source_path] = built_path
+        print(f"  {source_path:<32} {len(source):>8,} → {len(output):>8,} bytes  {built_path}")
+
+    # Write the manifest atomically so running workers never read half of it
+    temporary = MANIFEST_PATH + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temporary, MANIFEST_PATH)
+    return manifest
+
+
+def clean(manifest):
+    """Delete built files the manifest no longer references"""
+    keep = set(manifest.values()) | {'manifest.json'}
+    removed = 0
+    for directory, _, files in os.walk(DIST_FOLDER):
+        for filename in files:
+            path = os.path.relpath(os.path.join(directory, filename), DIST_FOLDER).replace(os.sep, '/')
+            if path not in keep:
+                os.remove(os.path.join(directory, filename))
+                removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--no-minify', action='store_true', help='only fingerprint, copy sources as-is')
+    parser.add_argument('--clean', action='store_true', help='delete outputs of earlier builds')
+    args = parser.parse_args()
+
+    print(f"📦 Building assets into {DIST_FOLDER}")
+    manifest = build(minify=not args.no_minify)
+    if args.clean:
+        print(f"🧹 Removed {clean(manifest)} stale file(s)")
+    print(f"✅ Wrote {len(manifest)} entries to {MANIFEST_PATH}")
+
+
+if __name__ == '__main__':
+    main()
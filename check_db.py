@@ -1,9 +1,62 @@
+"""Inspect, audit and maintain the e-commerce SQLite database.
+
+Without arguments an interactive menu opens. Subcommands:
+  overview              tables, columns and sample rows
+  dump [TABLE ...]      every row, streamed page by page
+  query                 interactive SQL prompt
+  clear TABLE           delete all rows of a table
+  audit                 EXPLAIN QUERY PLAN for every SQL statement in app.py;
+                        flags full table scans, temp B-trees and automatic indexes
+  stats                 page count, freelist and fragmentation, table and index
+                        sizes, and which indexes app.py's queries use
+  maintain              ANALYZE, PRAGMA optimize and incremental vacuum on demand
+  consistency           invariant checks (order totals, stock, carts, categories)
+                        sharded by id range over a process pool; --repair fixes them
+
+Run with: python check_db.py [--database PATH] [command]
+"""
+import argparse
+import ast
+import json
+import re
 import sqlite3
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
 # Always use the same DB file as Flask (inside /instance folder)
-DB_PATH = os.path.join(os.path.dirname(__file__), "instance", "ecommerce.db")
+DB_PATH = os.environ.get('DATABASE_PATH', os.path.join(os.path.dirname(__file__), "instance", "ecommerce.db"))
+APP_PATH = os.path.join(os.path.dirname(__file__), "app.py")
+
+TABLES = ['users', 'products', 'categories', 'orders', 'order_items', 'cart_items', 'customer_stats',
+          'data_versions', 'sessions', 'browsing_history', 'product_views']
+PAGE_SIZE = 500  # rows per page when dumping
+
+CART_ITEMS_QUERY = '''
+    SELECT ci.id, ci.user_id, ci.product_id, p.name, p.price, ci.quantity, ci.created_at
+    FROM cart_items ci
+    JOIN products p ON ci.product_id = p.id
+'''
+
+
+def iter_pages(conn, query, key, page_size=PAGE_SIZE):
+    """Yield the rows of query a page at a time, keyed on its first column.
+
+    Every page is its own short statement (WHERE key > last ORDER BY key LIMIT n),
+    so memory stays flat and no read lock is held between pages while the app writes.
+    """
+    last = None
+    while True:
+        if last is None:
+            rows = conn.execute(f"{query} ORDER BY {key} LIMIT ?", (page_size,)).fetchall()
+        else:
+            rows = conn.execute(f"{query} WHERE {key} > ? ORDER BY {key} LIMIT ?", (last, page_size)).fetchall()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
 
 def check_database():
     print(f"📂 Using database: {os.path.abspath(DB_PATH)}")
@@ -30,8 +83,7 @@ def check_database():
             print(f"  - {table[0]}")
         print("="*50)
         
-        # Include cart_items table
-        for table_name in ['users', 'products', 'categories', 'orders', 'order_items', 'cart_items']:
+        for table_name in TABLES:
             print(f"\n🔍 TABLE: {table_name.upper()}")
             try:
                 cursor.execute(f"PRAGMA table_info({table_name})")
@@ -46,12 +98,7 @@ def check_database():
                 
                 if count > 0:
                     if table_name == "cart_items":
-                        cursor.execute('''
-                            SELECT ci.id, ci.user_id, ci.product_id, p.name, p.price, ci.quantity, ci.created_at
-                            FROM cart_items ci
-                            JOIN products p ON ci.product_id = p.id
-                            LIMIT 5
-                        ''')
+                        cursor.execute(CART_ITEMS_QUERY + " LIMIT 5")
                         rows = cursor.fetchall()
                         print("Sample data (with product details):")
                         for row in rows:
@@ -75,37 +122,27 @@ def check_database():
         print(f"❌ Database error: {e}")
 
 
-def show_all_data():
+def show_all_data(tables=None):
     print(f"📂 Using database: {os.path.abspath(DB_PATH)}")
     conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
     
-    tables = ['users', 'products', 'categories', 'orders', 'order_items', 'cart_items']
-    
-    for table_name in tables:
+    for table_name in tables or TABLES:
         print(f"\n{'='*20} {table_name.upper()} {'='*20}")
         try:
+            count = 0
             if table_name == "cart_items":
-                cursor.execute('''
-                    SELECT ci.id, ci.user_id, ci.product_id, p.name, p.price, ci.quantity, ci.created_at
-                    FROM cart_items ci
-                    JOIN products p ON ci.product_id = p.id
-                ''')
-                rows = cursor.fetchall()
-                if rows:
+                for rows in iter_pages(conn, CART_ITEMS_QUERY, 'ci.id'):
                     for row in rows:
                         print(f"CartID={row[0]}, User={row[1]}, ProductID={row[2]}, "
                               f"Name={row[3]}, Price={row[4]}, Qty={row[5]}, Added={row[6]}")
-                else:
-                    print("No data")
+                    count += len(rows)
             else:
-                cursor.execute(f"SELECT * FROM {table_name}")
-                rows = cursor.fetchall()
-                if rows:
-                    for i, row in enumerate(rows, 1):
-                        print(f"{i}: {row}")
-                else:
-                    print("No data")
+                for rows in iter_pages(conn, f"SELECT rowid, * FROM {table_name}", 'rowid'):
+                    for row in rows:
+                        count += 1
+                        print(f"{count}: {row[1:]}")
+            if not count:
+                print("No data")
                 
         except sqlite3.Error as e:
             print(f"Error: {e}")
@@ -172,7 +209,458 @@ def clear_table(table_name):
         conn.close()
 
 
-if __name__ == "__main__":
+# Query plan audit
+SQL_STATEMENT = re.compile(r'^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|REPLACE)\b.*\b(FROM|INTO|SET|VALUES)\b', re.S)
+INDEX_USE = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+
+
+def extract_statements(path=APP_PATH):
+    """(line, sql) for every SQL string literal in a Python source file.
+
+    Interpolated parts of f-strings (IN ({placeholders}) and the like) become a
+    single ? so the statement can still be planned. History queries name their
+    tables as {orders} / {order_items}; those are planned against the hot tables.
+    """
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    
+    fstring_parts = {id(part) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr) for part in node.values}
+    statements = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and id(node) not in fstring_parts:
+            sql = node.value
+        elif isinstance(node, ast.JoinedStr):
+            sql = ''.join(part.value if isinstance(part, ast.Constant) else '?' for part in node.values)
+        else:
+            continue
+        if SQL_STATEMENT.match(sql):
+            sql = sql.replace('{orders}', 'orders').replace('{order_items}', 'order_items')
+            statements.append((node.lineno, ' '.join(sql.split())))
+    return sorted(statements)
+
+
+def explain(conn, sql):
+    """EXPLAIN QUERY PLAN rows for sql, binding NULL to every placeholder"""
+    try:
+        return conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    except sqlite3.ProgrammingError as e:
+        # "... The current statement uses 3, and there are 0 supplied."
+        match = re.search(r'uses (\d+)', str(e))
+        if not match:
+            raise
+        return conn.execute(f"EXPLAIN QUERY PLAN {sql}", [None] * int(match.group(1))).fetchall()
+
+
+def plan_issues(plan):
+    issues = []
+    for row in plan:
+        detail = row[3]
+        if detail.startswith('SCAN ') and ' USING ' not in detail and 'CONSTANT ROW' not in detail \
+                and not detail.startswith('SCAN (subquery'):
+            issues.append(('full scan', detail))
+        elif detail.startswith('SCAN ') and ' INDEX ' in detail:
+            issues.append(('index scan', detail))
+        if 'AUTOMATIC' in detail:
+            issues.append(('automatic index', detail))
+        if 'TEMP B-TREE' in detail:
+            issues.append(('temp b-tree', detail))
+    return issues
+
+
+def connect_readonly():
+    return sqlite3.connect(f"file:{os.path.abspath(DB_PATH)}?mode=ro", uri=True)
+
+
+def audit_queries(conn, sources):
+    """[(source, line, sql, plan, issues, error)] for every statement in sources"""
+    results = []
+    for source in sources:
+        for line, sql in extract_statements(source):
+            try:
+                plan = explain(conn, sql)
+                results.append((source, line, sql, plan, plan_issues(plan), None))
+            except sqlite3.Error as e:
+                results.append((source, line, sql, [], [], str(e)))
+    return results
+
+
+def run_audit(sources=(APP_PATH,), verbose=False):
+    """Print flagged statements; returns the number with full table scans"""
+    print(f"📂 Using database: {os.path.abspath(DB_PATH)}")
+    conn = connect_readonly()
+    try:
+        results = audit_queries(conn, sources)
+    finally:
+        conn.close()
+    
+    print(f"🔎 Planned {len(results)} SQL statements from {', '.join(os.path.basename(s) for s in sources)}")
+    print("="*50)
+    counts = {}
+    errors = 0
+    for source, line, sql, plan, issues, error in results:
+        location = f"{os.path.basename(source)}:{line}"
+        if error:
+            errors += 1
+            print(f"❔ {location}  {sql[:90]}")
+            print(f"      not planned: {error}")
+            continue
+        for kind in {kind for kind, _ in issues}:
+            counts[kind] = counts.get(kind, 0) + 1
+        if issues or verbose:
+            print(f"{'⚠️ ' if issues else '✅'} {location}  {sql[:90]}")
+            for kind, detail in issues:
+                print(f"      {kind}: {detail}")
+            if verbose:
+                for row in plan:
+                    print(f"        {row[3]}")
+    
+    print("="*50)
+    print(f"Full table scans: {counts.get('full scan', 0)}, full index scans: {counts.get('index scan', 0)}, "
+          f"temp B-trees: {counts.get('temp b-tree', 0)}, automatic indexes: {counts.get('automatic index', 0)}")
+    if errors:
+        print(f"{errors} statement(s) could not be planned (dynamic SQL, or tables this database does not have)")
+    print("Scans of small tables (categories, data_versions) are expected; check the row counts with 'stats'.")
+    return counts.get('full scan', 0)
+
+
+# Storage statistics
+def database_stats(sources=(APP_PATH,)):
+    print(f"📂 Using database: {os.path.abspath(DB_PATH)}")
+    conn = connect_readonly()
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        auto_vacuum = {0: 'none', 1: 'full', 2: 'incremental'}[conn.execute("PRAGMA auto_vacuum").fetchone()[0]]
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        
+        print(f"File size: {os.path.getsize(DB_PATH):,} bytes")
+        print(f"Pages: {page_count:,} x {page_size} bytes, free: {freelist:,} "
+              f"({freelist / page_count:.1%} of the file reclaimable)" if page_count else "Pages: 0")
+        print(f"auto_vacuum: {auto_vacuum}, journal_mode: {journal_mode}")
+        analyzed = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()[0]
+        print(f"ANALYZE statistics: {'present' if analyzed else 'missing (run: maintain --analyze)'}")
+        print("="*50)
+        
+        # Per table and index size; dbstat is compiled into most builds, but not all
+        try:
+            sizes = {name: (pages, size, unused) for name, pages, size, unused in conn.execute(
+                "SELECT name, COUNT(*), SUM(pgsize), SUM(unused) FROM dbstat GROUP BY name")}
+        except sqlite3.Error:
+            sizes = {}
+        
+        print(f"{'table':<20} {'rows':>12} {'pages':>10} {'size':>14} {'fill':>6}")
+        for (table_name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name").fetchall():
+            rows = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            pages, size, unused = sizes.get(table_name, (None, None, None))
+            if pages is None:
+                print(f"{table_name:<20} {rows:>12,}")
+            else:
+                print(f"{table_name:<20} {rows:>12,} {pages:>10,} {size:>14,} {1 - unused / size:>6.0%}")
+        
+        # Index usage as seen in app.py's query plans (SQLite keeps no runtime counters)
+        usage = {}
+        for _, _, _, plan, _, _ in audit_queries(conn, sources):
+            for name in {match for row in plan for match in INDEX_USE.findall(row[3])}:
+                usage[name] = usage.get(name, 0) + 1
+        print(f"\n{'index':<32} {'table':<18} {'pages':>8} {'size':>12} {'used by':>8}")
+        for name, table_name, sql in conn.execute(
+                "SELECT name, tbl_name, sql FROM sqlite_master WHERE type = 'index' ORDER BY tbl_name, name"):
+            pages, size, _ = sizes.get(name, (0, 0, 0))
+            used = usage.get(name, 0)
+            note = '  (constraint)' if sql is None else '  ⚠️ unused' if not used else ''
+            print(f"{name:<32} {table_name:<18} {pages:>8,} {size:>12,} {used:>8}{note}")
+    finally:
+        conn.close()
+
+
+# Maintenance
+def maintain(analyze=False, optimize=False, vacuum_pages=None, enable_incremental_vacuum=False):
+    print(f"📂 Using database: {os.path.abspath(DB_PATH)}")
+    # Autocommit: VACUUM cannot run inside a transaction; wait for the app's writes
+    conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+    
+    def step(label, sql):
+        # executescript steps the statement to completion; execute() would free one
+        # page per incremental_vacuum call
+        start = time.perf_counter()
+        conn.executescript(sql)
+        print(f"✅ {label} ({time.perf_counter() - start:.2f}s)")
+    
+    try:
+        if enable_incremental_vacuum:
+            print("⚠️ Rebuilding the whole file with VACUUM; writers are blocked until it finishes")
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            step("auto_vacuum set to incremental", "VACUUM")
+        if analyze:
+            step("ANALYZE", "ANALYZE")
+        if optimize:
+            step("PRAGMA optimize", "PRAGMA optimize")
+        if vacuum_pages is not None:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                print("❌ Incremental vacuum needs auto_vacuum=incremental; run once with --enable-incremental-vacuum")
+            else:
+                before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                step(f"incremental vacuum ({vacuum_pages or 'all'} pages)", f"PRAGMA incremental_vacuum({vacuum_pages})")
+                after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                print(f"   Freed {before - after:,} pages, {after:,} still on the freelist")
+    except sqlite3.Error as e:
+        print(f"❌ Maintenance failed: {e}")
+    finally:
+        conn.close()
+
+
+# Consistency checks (parallel, read-only)
+class InvariantCheck:
+    """One data invariant, checked over id ranges of `table`.
+
+    find selects the violating rows of one range (its first column is the row id
+    and it takes the range bounds as its two parameters). repair fixes whatever
+    still matches find inside a range; versions names the data_versions rows
+    (ETags) a repair must bump. {ids} in either stands for the ids find returns.
+    """
+    def __init__(self, name, description, table, find, columns, repair=None, versions=None, follow_up=None):
+        self.name = name
+        self.description = description
+        self.table = table
+        self.find = find
+        self.columns = columns
+        self.repair = repair
+        self.versions = versions
+        self.follow_up = follow_up
+
+    def ids(self):
+        return f"SELECT id FROM ({self.find})"
+
+
+REBUILD_STATS_HINT = "run 'flask --app app rebuild-customer-stats' so customer_stats matches the repaired orders"
+
+CONSISTENCY_CHECKS = [
+    InvariantCheck(
+        'order_total', 'orders whose total_amount differs from the sum of their items', 'orders',
+        '''SELECT o.id AS id, o.total_amount, ROUND(SUM(oi.quantity * oi.price), 2), COUNT(oi.id)
+           FROM orders o JOIN order_items oi ON oi.order_id = o.id
+           WHERE o.id BETWEEN ? AND ?
+           GROUP BY o.id
+           HAVING ABS(o.total_amount - SUM(oi.quantity * oi.price)) > 0.005''',
+        ('order_id', 'total_amount', 'items_total', 'item_rows'),
+        repair='''UPDATE orders SET total_amount = (
+                      SELECT ROUND(SUM(quantity * price), 2) FROM order_items WHERE order_id = orders.id
+                  ) WHERE id IN ({ids})''',
+        follow_up=REBUILD_STATS_HINT),
+    InvariantCheck(
+        'empty_order', 'orders without any items (checkout stopped before inserting them)', 'orders',
+        '''SELECT o.id AS id, o.user_id, o.total_amount, o.status, o.created_at
+           FROM orders o
+           WHERE o.id BETWEEN ? AND ? AND o.status != 'cancelled'
+             AND NOT EXISTS (SELECT 1 FROM order_items oi WHERE oi.order_id = o.id)''',
+        ('order_id', 'user_id', 'total_amount', 'status', 'created_at'),
+        repair="UPDATE orders SET status = 'cancelled' WHERE id IN ({ids})",
+        follow_up=REBUILD_STATS_HINT),
+    InvariantCheck(
+        'order_item_count', 'orders whose item_count differs from their number of item rows', 'orders',
+        '''SELECT o.id AS id, o.item_count, COUNT(oi.id)
+           FROM orders o LEFT JOIN order_items oi ON oi.order_id = o.id
+           WHERE o.id BETWEEN ? AND ?
+           GROUP BY o.id
+           HAVING o.item_count IS NOT NULL AND o.item_count != COUNT(oi.id)''',
+        ('order_id', 'item_count', 'item_rows'),
+        repair='''UPDATE orders SET item_count = (
+                      SELECT COUNT(*) FROM order_items WHERE order_id = orders.id
+                  ) WHERE id IN ({ids})'''),
+    InvariantCheck(
+        'orphan_order_item', 'order items whose order no longer exists', 'order_items',
+        '''SELECT oi.id AS id, oi.order_id, oi.product_id, oi.quantity, oi.price
+           FROM order_items oi LEFT JOIN orders o ON o.id = oi.order_id
+           WHERE oi.id BETWEEN ? AND ? AND o.id IS NULL''',
+        ('item_id', 'order_id', 'product_id', 'quantity', 'price'),
+        repair="DELETE FROM order_items WHERE id IN ({ids})"),
+    InvariantCheck(
+        'cart_missing_product', 'cart rows for products that were deleted', 'cart_items',
+        '''SELECT ci.id AS id, ci.user_id, ci.product_id, ci.quantity
+           FROM cart_items ci LEFT JOIN products p ON p.id = ci.product_id
+           WHERE ci.id BETWEEN ? AND ? AND p.id IS NULL''',
+        ('cart_item_id', 'user_id', 'product_id', 'quantity'),
+        repair="DELETE FROM cart_items WHERE id IN ({ids})",
+        versions="SELECT DISTINCT 'cart:' || user_id FROM cart_items WHERE id IN ({ids})"),
+    InvariantCheck(
+        'negative_stock', 'products with negative stock', 'products',
+        "SELECT id, name, stock FROM products WHERE id BETWEEN ? AND ? AND stock < 0",
+        ('product_id', 'name', 'stock'),
+        repair="UPDATE products SET stock = 0 WHERE id IN ({ids})",
+        versions="SELECT 'products' WHERE EXISTS ({ids})"),
+    InvariantCheck(
+        'product_missing_category', 'products whose category is not in the category tree', 'products',
+        '''SELECT p.id AS id, p.name, p.category_id
+           FROM products p LEFT JOIN categories c ON c.id = p.category_id
+           WHERE p.id BETWEEN ? AND ? AND (p.category_id IS NULL OR (p.category_id != 0 AND c.id IS NULL))''',
+        ('product_id', 'name', 'category_id'),
+        # 0 is the tree's root ("All Categories"); the storefront shows these as Uncategorized
+        repair="UPDATE products SET category_id = 0 WHERE id IN ({ids})",
+        versions="SELECT 'products' WHERE EXISTS ({ids})",
+        follow_up="restart the app (or its workers) so the category tree is rebuilt"),
+    InvariantCheck(
+        'category_missing_parent', 'categories whose parent does not exist', 'categories',
+        '''SELECT c.id AS id, c.name, c.parent_id
+           FROM categories c LEFT JOIN categories parent ON parent.id = c.parent_id
+           WHERE c.id BETWEEN ? AND ? AND c.parent_id != 0 AND parent.id IS NULL''',
+        ('category_id', 'name', 'parent_id'),
+        repair="UPDATE categories SET parent_id = 0 WHERE id IN ({ids})",
+        follow_up="restart the app (or its workers) so the category tree is rebuilt"),
+]
+CHECKS_BY_NAME = {check.name: check for check in CONSISTENCY_CHECKS}
+
+shard_connections = {}  # database path -> read-only connection of this worker process
+
+
+def check_shard(db_path, name, low, high, limit):
+    """Run one check over one id range in a pool worker: (name, low, high, count, sample, error)"""
+    conn = shard_connections.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True, timeout=30)
+        shard_connections[db_path] = conn
+    check = CHECKS_BY_NAME[name]
+    count = 0
+    sample = []
+    try:
+        cursor = conn.execute(check.find, (low, high))
+        while True:
+            rows = cursor.fetchmany(PAGE_SIZE)
+            if not rows:
+                break
+            count += len(rows)
+            sample.extend(rows[:max(limit - len(sample), 0)])
+    except sqlite3.Error as e:
+        return name, low, high, 0, [], str(e)
+    return name, low, high, count, sample, None
+
+
+def plan_shards(checks, shard_size):
+    """(check name, low id, high id) for every range of every check's table"""
+    conn = connect_readonly()
+    try:
+        shards = []
+        for check in checks:
+            try:
+                low, high = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {check.table}").fetchone()
+            except sqlite3.Error:
+                low = high = None
+            if low is None:
+                shards.append((check.name, 0, -1))  # empty or missing table: one empty shard reports it
+                continue
+            for start in range(low, high + 1, shard_size):
+                shards.append((check.name, start, min(start + shard_size - 1, high)))
+        return shards
+    finally:
+        conn.close()
+
+
+def repair_shards(check, ranges):
+    """Fix what still violates check in each range, one short write transaction per range"""
+    conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+    repaired = 0
+    try:
+        for low, high in ranges:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                names = []
+                if check.versions:
+                    names = [row[0] for row in conn.execute(check.versions.format(ids=check.ids()), (low, high))]
+                cursor = conn.execute(check.repair.format(ids=check.ids()), (low, high))
+                repaired += cursor.rowcount
+                if cursor.rowcount and names:
+                    conn.executemany('''
+                        INSERT INTO data_versions (name, version) VALUES (?, 1)
+                        ON CONFLICT(name) DO UPDATE SET version = version + 1
+                    ''', [(name,) for name in names])
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+    finally:
+        conn.close()
+    return repaired
+
+
+def run_consistency_checks(names=None, workers=None, shard_size=100000, limit=100, repair=False, report_path=None):
+    """Shard every check by id range across a process pool; returns the number of violations left"""
+    out = sys.stderr if report_path == '-' else sys.stdout
+    checks = [CHECKS_BY_NAME[name] for name in names] if names else CONSISTENCY_CHECKS
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    shards = plan_shards(checks, shard_size)
+    print(f"📂 Using database: {os.path.abspath(DB_PATH)}", file=out)
+    print(f"🧪 Running {len(checks)} checks as {len(shards)} shards on {workers} worker processes", file=out)
+    
+    results = {check.name: {'description': check.description, 'violations': 0, 'columns': list(check.columns),
+                            'sample': [], 'errors': [], 'ranges': []} for check in checks}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(check_shard, DB_PATH, name, low, high, limit) for name, low, high in shards]
+        for future in as_completed(futures):
+            name, low, high, count, sample, error = future.result()
+            result = results[name]
+            if error:
+                result['errors'].append(f"ids {low}-{high}: {error}")
+                continue
+            result['violations'] += count
+            if count:
+                result['ranges'].append((low, high))
+                result['sample'].extend(sample[:max(limit - len(result['sample']), 0)])
+    checked_in = time.perf_counter() - started
+    
+    remaining = 0
+    follow_ups = set()
+    for check in checks:
+        result = results[check.name]
+        result['sample'].sort()
+        status = '✅' if not result['violations'] and not result['errors'] else '⚠️ '
+        print(f"  {status} {check.name:<26} {result['violations']:>10,} violation(s)  {check.description}", file=out)
+        for error in result['errors'][:3]:
+            print(f"      ❌ {error}", file=out)
+        
+        if repair and result['violations'] and check.repair:
+            try:
+                result['repaired'] = repair_shards(check, sorted(result['ranges']))
+                print(f"      🔧 repaired {result['repaired']:,} row(s)", file=out)
+            except sqlite3.Error as e:
+                result['errors'].append(f"repair: {e}")
+                print(f"      ❌ repair stopped: {e}", file=out)
+            if check.follow_up:
+                follow_ups.add(check.follow_up)
+        remaining += max(result['violations'] - result.get('repaired', 0), 0) + len(result['errors'])
+        del result['ranges']
+    
+    for follow_up in sorted(follow_ups):
+        print(f"👉 Next: {follow_up}", file=out)
+    print(f"{'✅ Consistent' if not remaining else f'⚠️ {remaining:,} problem(s) left'} "
+          f"(checked in {checked_in:.1f}s, total {time.perf_counter() - started:.1f}s)", file=out)
+    
+    if report_path:
+        report = {
+            'database': os.path.abspath(DB_PATH),
+            'checked_at': datetime.now().isoformat(timespec='seconds'),
+            'duration_seconds': round(time.perf_counter() - started, 3),
+            'workers': workers,
+            'shards': len(shards),
+            'shard_size': shard_size,
+            'repair': repair,
+            'checks': {name: {**result, 'sample': [dict(zip(result['columns'], row)) for row in result['sample']]}
+                       for name, result in results.items()}
+        }
+        for result in report['checks'].values():
+            del result['columns']
+        if report_path == '-':
+            json.dump(report, sys.stdout, indent=2, default=str)
+            print()
+        else:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, default=str)
+            print(f"📄 Report written to {report_path}", file=out)
+    return remaining
+
+
+def interactive_menu():
     print("🗄️  E-COMMERCE DATABASE CHECKER")
     print("="*50)
     
@@ -182,9 +670,13 @@ if __name__ == "__main__":
         print("2. Show all data")
         print("3. Run custom SQL query")
         print("4. Clear a table")
-        print("5. Exit")
+        print("5. Audit query plans")
+        print("6. Storage and index statistics")
+        print("7. Run ANALYZE and PRAGMA optimize")
+        print("8. Check data consistency")
+        print("9. Exit")
         
-        choice = input("\nChoose an option (1-5): ").strip()
+        choice = input("\nChoose an option (1-9): ").strip()
         
         if choice == '1':
             check_database()
@@ -193,11 +685,89 @@ if __name__ == "__main__":
         elif choice == '3':
             run_custom_query()
         elif choice == '4':
-            print("\nAvailable tables: users, products, categories, orders, order_items, cart_items")
+            print(f"\nAvailable tables: {', '.join(TABLES)}")
             table = input("Enter table name to clear: ").strip()
             clear_table(table)
         elif choice == '5':
+            run_audit()
+        elif choice == '6':
+            database_stats()
+        elif choice == '7':
+            maintain(analyze=True, optimize=True)
+        elif choice == '8':
+            run_consistency_checks()
+        elif choice == '9':
             print("👋 Goodbye!")
             break
         else:
-            print("❌ Invalid choice. Please enter 1-5.")
+            print("❌ Invalid choice. Please enter 1-9.")
+
+
+def main():
+    global DB_PATH
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', default=DB_PATH, help='SQLite file (default: instance/ecommerce.db)')
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('overview', help='tables, columns and sample rows')
+    dump = commands.add_parser('dump', help='print every row, page by page')
+    dump.add_argument('tables', nargs='*', help=f"tables to dump (default: all of {', '.join(TABLES)})")
+    commands.add_parser('query', help='interactive SQL prompt')
+    clear = commands.add_parser('clear', help='delete all rows of a table')
+    clear.add_argument('table')
+    for name, help_text in (('audit', 'EXPLAIN QUERY PLAN for the SQL in app.py'),
+                            ('stats', 'page, freelist, table and index statistics')):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('--source', action='append', help='Python file to take SQL from (default: app.py, repeatable)')
+        if name == 'audit':
+            command.add_argument('--verbose', action='store_true', help='print every plan, not only flagged ones')
+            command.add_argument('--strict', action='store_true', help='exit with status 1 if any full table scan is found')
+    maintenance = commands.add_parser('maintain', help='ANALYZE, PRAGMA optimize, incremental vacuum')
+    maintenance.add_argument('--analyze', action='store_true', help='refresh the planner statistics')
+    maintenance.add_argument('--optimize', action='store_true', help='run PRAGMA optimize')
+    maintenance.add_argument('--vacuum', type=int, nargs='?', const=0, metavar='PAGES',
+                             help='return up to PAGES free pages to the OS (default: all)')
+    maintenance.add_argument('--enable-incremental-vacuum', action='store_true',
+                             help='switch auto_vacuum to incremental (one full VACUUM, blocks writers)')
+    consistency = commands.add_parser('consistency', help='parallel invariant checks with optional repair')
+    consistency.add_argument('--checks', help=f"comma separated subset of: {', '.join(CHECKS_BY_NAME)}")
+    consistency.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    consistency.add_argument('--shard-size', type=int, default=100000, help='ids per shard (default: 100000)')
+    consistency.add_argument('--limit', type=int, default=100, help='sample rows kept per check in the report')
+    consistency.add_argument('--report', help="write a JSON report to this file ('-' for stdout)")
+    consistency.add_argument('--repair', action='store_true', help='fix violations, one short transaction per shard')
+    args = parser.parse_args()
+    
+    DB_PATH = args.database
+    if args.command not in (None, 'overview') and not os.path.exists(DB_PATH):
+        parser.error(f"database not found: {DB_PATH}")
+    
+    if args.command is None:
+        interactive_menu()
+    elif args.command == 'overview':
+        check_database()
+    elif args.command == 'dump':
+        show_all_data(args.tables)
+    elif args.command == 'query':
+        run_custom_query()
+    elif args.command == 'clear':
+        clear_table(args.table)
+    elif args.command == 'audit':
+        if run_audit(args.source or [APP_PATH], args.verbose) and args.strict:
+            raise SystemExit(1)
+    elif args.command == 'stats':
+        database_stats(args.source or [APP_PATH])
+    elif args.command == 'maintain':
+        if not (args.analyze or args.optimize or args.vacuum is not None or args.enable_incremental_vacuum):
+            parser.error("maintain: choose at least one of --analyze, --optimize, --vacuum, --enable-incremental-vacuum")
+        maintain(args.analyze, args.optimize, args.vacuum, args.enable_incremental_vacuum)
+    elif args.command == 'consistency':
+        names = [name.strip() for name in args.checks.split(',')] if args.checks else None
+        unknown = [name for name in names or [] if name not in CHECKS_BY_NAME]
+        if unknown:
+            parser.error(f"unknown check(s): {', '.join(unknown)}")
+        if run_consistency_checks(names, args.workers, args.shard_size, args.limit, args.repair, args.report):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Fill a fresh database with synthetic users, products, orders and carts for scale testing.
+
+The schema comes from the app's DatabaseManager, so it always matches app.py.
+Output is fully determined by --seed, apart from password salts. Rows are
+inserted in chunks with executemany, with journaling off and secondary indexes
+dropped during the load (recreated at the end), then customer_stats is rebuilt
+and ANALYZE run.
+
+Generated customers all share the password 'password123'.
+
+Run with: python generate_data.py --database instance/synthetic.db --users 100000 --products 1000000 --orders 4000000
+"""
+import argparse
+import bisect
+import itertools
+import math
+import os
+import random
+import sqlite3
+import time
+from array import array
+from datetime import datetime, timedelta
+
+from app import DatabaseManager
+
+CUSTOMER_PASSWORD = 'password123'
+BULK_TABLES = ('users', 'products', 'orders', 'order_items', 'cart_items')
+ADJECTIVES = ['Classic', 'Pro', 'Max', 'Mini', 'Ultra', 'Eco', 'Smart', 'Vintage', 'Deluxe', 'Compact',
+              'Wireless', 'Premium', 'Essential', 'Sport', 'Travel', 'Modern']
+NOUNS = {
+    'Electronics': ['Speaker', 'Charger', 'Camera', 'Monitor', 'Keyboard', 'Headphones'],
+    'Clothing': ['Shirt', 'Jacket', 'Jeans', 'Sneakers', 'Dress', 'Hoodie'],
+    'Books': ['Novel', 'Cookbook', 'Guide', 'Atlas', 'Anthology', 'Workbook'],
+    'Home & Garden': ['Lamp', 'Chair', 'Planter', 'Rug', 'Kettle', 'Shelf'],
+    'Smartphones': ['Phone', 'Phone Case', 'Screen Guard'],
+    'Laptops': ['Laptop', 'Notebook', 'Laptop Sleeve'],
+}
+DEFAULT_NOUNS = ['Item', 'Gadget', 'Set', 'Kit']
+# (share of orders, status) for orders older than two weeks; newer ones are still in flight
+SETTLED_STATUSES = [(0.96, 'delivered'), (1.0, 'cancelled')]
+RECENT_STATUSES = [(0.35, 'pending'), (0.6, 'processing'), (0.85, 'shipping'), (0.97, 'delivered'), (1.0, 'cancelled')]
+# Items per order: mostly 1-3, occasionally up to 10 (mean about 2.5)
+ITEM_COUNT_WEIGHTS = [30, 25, 17, 10, 7, 4, 3, 2, 1, 1]
+
+
+def chunked(rows, size):
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def pick(cumulative, roll):
+    for threshold, value in cumulative:
+        if roll < threshold:
+            return value
+    return cumulative[-1][1]
+
+
+class Generator:
+    def __init__(self, conn, args):
+        self.conn = conn
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.end = datetime(2025, 1, 1) if args.end is None else datetime.strptime(args.end, '%Y-%m-%d')
+        self.start = self.end - timedelta(days=args.days)
+        self.prices = array('d')
+
+    def insert(self, label, query, rows, total):
+        started = time.perf_counter()
+        done = 0
+        for chunk in chunked(rows, self.args.chunk_size):
+            self.conn.executemany(query, chunk)
+            done += len(chunk)
+            if total >= 10 * self.args.chunk_size and done % (10 * self.args.chunk_size) < len(chunk):
+                print(f"   {label}: {done:,}/{total:,}")
+        elapsed = time.perf_counter() - started
+        print(f"✅ {label}: {done:,} rows in {elapsed:.1f}s ({done / max(elapsed, 1e-9):,.0f} rows/s)")
+        return done
+
+    def timestamp(self, fraction):
+        return (self.start + (self.end - self.start) * fraction).strftime('%Y-%m-%d %H:%M:%S')
+
+    def users(self, password_hash):
+        rng = self.rng
+        first_id = self.next_id('users')
+        for i in range(self.args.users):
+            user_id = first_id + i
+            yield (user_id, f"user{user_id}", f"user{user_id}@example.com", password_hash, 'customer',
+                   self.timestamp(rng.random() * 0.5))
+
+    def products(self, categories):
+        rng = self.rng
+        # Leaf categories hold most of the catalog, parents a little of it
+        parents = {parent_id for _, _, parent_id in categories}
+        weighted = [(cat_id, name, 1 if cat_id in parents else 4) for cat_id, name, _ in categories]
+        cumulative = list(itertools.accumulate(weight for _, _, weight in weighted))
+        total_weight = cumulative[-1]
+
+        first_id = self.next_id('products')
+        for i in range(self.args.products):
+            cat_id, cat_name, _ = weighted[bisect.bisect_right(cumulative, rng.random() * total_weight)]
+            nouns = NOUNS.get(cat_name, DEFAULT_NOUNS)
+            # Log-normal prices: most items are cheap, a long tail is expensive
+            price = round(min(max(math.exp(rng.gauss(7.0, 1.1)), 49.0), 250000.0), 2)
+            self.prices.append(price)
+            yield (first_id + i, f"{rng.choice(ADJECTIVES)} {rng.choice(nouns)} {first_id + i}",
+                   f"Synthetic {cat_name.lower()} product", price, rng.randrange(0, 500), cat_id,
+                   '', 0 if rng.random() < 0.03 else 1, self.timestamp(rng.random() * 0.8))
+
+    def pick_product(self):
+        # Zipf-like popularity: a small share of the catalog gets most of the orders
+        return int(len(self.prices) * self.rng.random() ** 3)
+
+    def orders(self, user_ids, product_first_id):
+        """Yield (order row, item rows) with order ids increasing over time"""
+        rng = self.rng
+        count = self.args.orders
+        item_counts = list(itertools.accumulate(ITEM_COUNT_WEIGHTS))
+        item_total = item_counts[-1]
+        recent_cutoff = 1 - 14 / max(self.args.days, 14)
+        first_id = self.next_id('orders')
+        item_id = self.next_id('order_items')
+
+        # Heavy buyers: user picks follow a Pareto-like skew
+        user_count = len(user_ids)
+        step = 1.0 / count
+        for i in range(count):
+            # Steady growth over the period: later days see more orders
+            fraction = min(1.0, math.sqrt((i + rng.random()) * step))
+            order_id = first_id + i
+            user_id = user_ids[int(user_count * rng.random() ** 2)]
+            n_items = bisect.bisect_right(item_counts, rng.random() * item_total) + 1
+            statuses = RECENT_STATUSES if fraction > recent_cutoff else SETTLED_STATUSES
+            items = []
+            total = 0.0
+            seen = set()
+            for _ in range(n_items):
+                index = self.pick_product()
+                if index in seen:
+                    continue
+                seen.add(index)
+                quantity = 1 if rng.random() < 0.8 else rng.randrange(2, 5)
+                price = self.prices[index]
+                total += price * quantity
+                items.append((item_id, order_id, product_first_id + index, quantity, price))
+                item_id += 1
+            order = (order_id, user_id, round(total, 2), pick(statuses, rng.random()),
+                     f"{rng.randrange(1, 999)} Synthetic St, Barangay {rng.randrange(1, 200)}",
+                     f"09{rng.randrange(100000000, 999999999)}", '', self.timestamp(fraction), len(items))
+            yield order, items
+
+    def carts(self, user_ids, product_first_id):
+        rng = self.rng
+        for user_id in rng.sample(user_ids, min(self.args.carts, len(user_ids))):
+            for index in {self.pick_product() for _ in range(rng.randrange(1, 5))}:
+                yield (user_id, product_first_id + index, rng.randrange(1, 4), self.timestamp(0.98 + rng.random() * 0.02))
+
+    def next_id(self, table):
+        return (self.conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]) + 1
+
+
+def drop_indexes(conn):
+    """Drop secondary indexes on the bulk-loaded tables, returning their SQL to recreate them"""
+    placeholders = ','.join('?' for _ in BULK_TABLES)
+    indexes = conn.execute(f'''
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+    ''', BULK_TABLES).fetchall()
+    for name, _ in indexes:
+        conn.execute(f"DROP INDEX {name}")
+    return [sql for _, sql in indexes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'synthetic.db'))
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--products', type=int, default=50000)
+    parser.add_argument('--orders', type=int, default=200000, help='orders (about 2.5 items each on average)')
+    parser.add_argument('--carts', type=int, default=2000, help='users with an active cart')
+    parser.add_argument('--days', type=int, default=730, help='order history spread')
+    parser.add_argument('--end', help='last day of the order history (YYYY-MM-DD, default 2025-01-01)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--force', action='store_true', help='overwrite an existing database file')
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        if not args.force:
+            parser.error(f"{args.database} exists, pass --force to replace it")
+        os.remove(args.database)
+    os.makedirs(os.path.dirname(os.path.abspath(args.database)), exist_ok=True)
+
+    started = time.perf_counter()
+    print(f"📂 Generating into {os.path.abspath(args.database)} (seed {args.seed})")
+    manager = DatabaseManager(args.database)  # schema, default categories and admin user
+    password_hash = manager.hash_password(CUSTOMER_PASSWORD)
+
+    conn = sqlite3.connect(args.database, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -262144")  # 256 MB
+    conn.execute("BEGIN")
+    index_sql = drop_indexes(conn)
+
+    generator = Generator(conn, args)
+    categories = conn.execute("SELECT id, name, parent_id FROM categories WHERE id != 0").fetchall()
+
+    first_user = generator.next_id('users')
+    generator.insert('users', '''
+        INSERT INTO users (id, username, email, password_hash, role, created_at) VALUES (?, ?, ?, ?, ?, ?)
+    ''', generator.users(password_hash), args.users)
+    user_ids = list(range(first_user, first_user + args.users))
+
+    first_product = generator.next_id('products')
+    generator.insert('products', '''
+        INSERT INTO products (id, name, description, price, stock, category_id, image_path, is_active, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', generator.products(categories), args.products)
+
+    if user_ids and args.products:
+        items = []
+        item_count = 0
+
+        def order_rows():
+            nonlocal item_count
+            for order, order_items in generator.orders(user_ids, first_product):
+                items.extend(order_items)
+                item_count += len(order_items)
+                yield order
+                if len(items) >= args.chunk_size:
+                    conn.executemany('INSERT INTO order_items (id, order_id, product_id, quantity, price) VALUES (?, ?, ?, ?, ?)', items)
+                    items.clear()
+
+        generator.insert('orders', '''
+            INSERT INTO orders (id, user_id, total_amount, status, shipping_address, contact_number, notes, created_at, item_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', order_rows(), args.orders)
+        conn.executemany('INSERT INTO order_items (id, order_id, product_id, quantity, price) VALUES (?, ?, ?, ?, ?)', items)
+        print(f"✅ order_items: {item_count:,} rows")
+
+        generator.insert('cart_items', '''
+            INSERT INTO cart_items (user_id, product_id, quantity, created_at) VALUES (?, ?, ?, ?)
+        ''', generator.carts(user_ids, first_product), args.carts)
+
+    print(f"🔧 Rebuilding {len(index_sql)} indexes")
+    index_started = time.perf_counter()
+    for sql in index_sql:
+        conn.execute(sql)
+    conn.execute("COMMIT")
+    print(f"✅ indexes in {time.perf_counter() - index_started:.1f}s")
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.close()
+
+    # customer_stats and orders.item_count go through the app's own rebuild
+    count = manager.rebuild_customer_stats()
+    print(f"✅ customer_stats: {count:,} customers")
+
+    conn = sqlite3.connect(args.database)
+    conn.execute("ANALYZE")
+    conn.close()
+
+    size = os.path.getsize(args.database) / (1024 * 1024)
+    print(f"🎉 Done in {time.perf_counter() - started:.1f}s, {size:,.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
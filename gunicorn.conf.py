@@ -0,0 +1,59 @@
+"""Gunicorn settings for the preforking production server.
+
+Process model: with preload_app the master imports wsgi.py once, which runs
+create_app() (schema setup and migrations, category tree preload) before any
+worker exists. Workers are forked from that state and share its memory pages
+copy-on-write; post_fork runs init_worker() so every worker builds its own
+background threads, buffers and caches. worker_exit flushes what they hold.
+Anything workers must agree on (sessions, the order queue, order events,
+data versions) lives in SQLite, so the worker count only trades memory for
+throughput.
+
+Thread budget: every worker has `threads` request threads, and each open SSE
+order stream holds one of them for up to SSE_MAX_SECONDS. SSE_MAX_SUBSCRIBERS
+streams per worker are allowed (default: half the threads); more get a 503
+and retry later, so at least the other half always serve normal requests.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# SSE order streams hold a thread each, so use threaded workers
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Set before the app is imported (preload_app), which reads it
+sse_streams = int(os.environ.setdefault('SSE_MAX_SUBSCRIBERS', str(max(1, threads // 2))))
+if sse_streams >= threads:
+    raise RuntimeError(f"SSE_MAX_SUBSCRIBERS={sse_streams} would let streams take all {threads} "
+                       f"threads of a worker; keep it below GUNICORN_THREADS")
+
+preload_app = True
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then; jitter keeps them from restarting together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+
+
+def pre_fork(server, worker):
+    # Move everything the master built out of the GC's reach, so collections in
+    # workers do not write to (and un-share) the inherited pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import init_worker
+    init_worker()
+
+
+def worker_exit(server, worker):
+    from app import shutdown_worker
+    shutdown_worker()
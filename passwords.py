@@ -0,0 +1,135 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Encoded hash formats:
+#   pbkdf2_sha256$<iterations>$<salt>$<hash>
+#   scrypt$<log2 n>$<r>$<p>$<salt>$<hash>
+#   <64 hex chars>  (legacy unsalted SHA-256, upgraded on next login)
+SCHEMES = ('pbkdf2_sha256', 'scrypt')
+DEFAULT_SCHEME = 'pbkdf2_sha256'
+DEFAULT_COST = {'pbkdf2_sha256': 260000, 'scrypt': 14}
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+
+
+def _scrypt(password, salt, log_n, r, p):
+    n = 1 << log_n
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + (1 << 20))
+
+
+def is_legacy_hash(encoded):
+    return len(encoded) == 64 and '$' not in encoded
+
+
+def hash_password(password, scheme=DEFAULT_SCHEME, cost=None):
+    """Return an encoded salted hash of password"""
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown password hash scheme '{scheme}'")
+    cost = cost or DEFAULT_COST[scheme]
+    salt = secrets.token_bytes(SALT_BYTES)
+    if scheme == 'pbkdf2_sha256':
+        return f"pbkdf2_sha256${cost}${_b64(salt)}${_b64(_pbkdf2(password, salt, cost))}"
+    digest = _scrypt(password, salt, cost, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${cost}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+def verify_password(password, encoded):
+    """Constant-time check of password against any supported encoded hash"""
+    if not encoded:
+        return False
+    if is_legacy_hash(encoded):
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(candidate, encoded)
+
+    parts = encoded.split('$')
+    try:
+        if parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+            expected = _unb64(parts[3])
+            candidate = _pbkdf2(password, _unb64(parts[2]), int(parts[1]))
+        elif parts[0] == 'scrypt' and len(parts) == 6:
+            expected = _unb64(parts[5])
+            candidate = _scrypt(password, _unb64(parts[4]), int(parts[1]), int(parts[2]), int(parts[3]))
+        else:
+            return False
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(candidate, expected)
+
+
+def needs_rehash(encoded, scheme=DEFAULT_SCHEME, cost=None):
+    """True if encoded is legacy or was produced with a different scheme/cost"""
+    if not encoded or is_legacy_hash(encoded):
+        return True
+    parts = encoded.split('$')
+    cost = cost or DEFAULT_COST.get(scheme)
+    return parts[0] != scheme or parts[1] != str(cost)
+
+
+class PasswordHasher:
+    """Runs KDF hashing and verification in a small process pool.
+
+    workers=0 hashes inline in the calling thread. The pool is created on first
+    use and recreated after a fork, so it is safe to build before workers start.
+    """
+    def __init__(self, scheme=None, cost=None, workers=None):
+        self.scheme = scheme or os.environ.get('PASSWORD_HASH_SCHEME', DEFAULT_SCHEME)
+        if self.scheme not in SCHEMES:
+            raise ValueError(f"Unknown password hash scheme '{self.scheme}'")
+        self.cost = cost or int(os.environ.get('PASSWORD_HASH_COST', DEFAULT_COST[self.scheme]))
+        self.workers = workers if workers is not None else int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+        self.pool = None
+        self.pool_pid = None
+        self.dummy_hash = None
+        self.lock = threading.Lock()
+
+    def _run(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+        with self.lock:
+            if self.pool is None or self.pool_pid != os.getpid():
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+                self.pool_pid = os.getpid()
+            pool = self.pool
+        return pool.submit(func, *args).result()
+
+    def hash(self, password):
+        return self._run(hash_password, password, self.scheme, self.cost)
+
+    def verify(self, password, encoded):
+        # Unknown users still pay for one KDF run so response time does not reveal them
+        if not encoded:
+            if self.dummy_hash is None:
+                self.dummy_hash = self.hash(secrets.token_hex(8))
+            self._run(verify_password, password, self.dummy_hash)
+            return False
+        if is_legacy_hash(encoded):
+            return verify_password(password, encoded)
+        return self._run(verify_password, password, encoded)
+
+    def needs_rehash(self, encoded):
+        return needs_rehash(encoded, self.scheme, self.cost)
+
+    def shutdown(self, wait=False):
+        with self.lock:
+            if self.pool is not None and self.pool_pid == os.getpid():
+                self.pool.shutdown(wait=wait)
+            self.pool = None
+            self.pool_pid = None
@@ -0,0 +1,599 @@
+        let currentSection = 'overview';
+        let productsData = [];
+        let ordersData = [];
+        let usersData = [];
+
+        // Initialize dashboard
+        document.addEventListener('DOMContentLoaded', function() {
+            loadOverviewData();
+            connectOrderStream();
+        });
+
+        // Live order updates (Server-Sent Events) on top of the re-fetches after each action
+        let overviewRefresh = null;
+
+        function connectOrderStream() {
+            if (!window.EventSource) return;
+            const stream = new EventSource('/api/admin/orders/stream');
+
+            stream.addEventListener('order', function(e) {
+                const event = JSON.parse(e.data);
+                const order = ordersData.find(o => o.id === event.order_id);
+
+                if (event.type === 'status' && order) {
+                    order.status = event.status;
+                    if (currentSection === 'orders') displayOrders();
+                } else {
+                    // New order (or one we have not loaded yet)
+                    if (currentSection === 'orders') loadOrders();
+                }
+
+                if (currentSection === 'overview') {
+                    clearTimeout(overviewRefresh);
+                    overviewRefresh = setTimeout(loadOverviewData, 500);
+                }
+            });
+
+            // Events were dropped while we were behind, reload the full list
+            stream.addEventListener('resync', function() {
+                if (currentSection === 'orders') loadOrders();
+            });
+
+            // The browser gives up on a refused stream (503 while the server is at its
+            // stream limit), so try again later and catch up with a re-fetch
+            stream.addEventListener('error', function() {
+                if (stream.readyState !== EventSource.CLOSED) return;
+                setTimeout(function() {
+                    connectOrderStream();
+                    if (currentSection === 'orders') loadOrders();
+                }, 15000 + Math.random() * 15000);
+            });
+        }
+
+        // Section management
+        function showSection(sectionName) {
+            // Hide all sections
+            document.querySelectorAll('.content-section').forEach(section => {
+                section.style.display = 'none';
+            });
+
+            // Show selected section
+            document.getElementById(sectionName + 'Section').style.display = 'block';
+            currentSection = sectionName;
+
+            // Load section data
+            switch(sectionName) {
+                case 'overview':
+                    loadOverviewData();
+                    break;
+                case 'products':
+                    loadProducts();
+                    break;
+                case 'orders':
+                    loadOrders();
+                    break;
+                case 'users':
+                    loadUsers();
+                    break;
+            }
+        }
+
+        // Overview functionality
+        async function loadOverviewData() {
+            try {
+                const response = await fetch('/api/admin/summary');
+                const summary = await response.json();
+
+                document.getElementById('productCount').textContent = summary.product_count;
+                document.getElementById('orderCount').textContent = summary.order_count;
+                document.getElementById('archivedOrderCount').textContent = summary.archived_order_count;
+                document.getElementById('userCount').textContent = summary.customer_count;
+                document.getElementById('revenueMonth').textContent = summary.revenue_month_formatted;
+                document.getElementById('revenueToday').textContent = summary.revenue_today_formatted;
+                document.getElementById('pendingCount').textContent = summary.orders_by_status.pending || 0;
+                document.getElementById('lowStockCount').textContent = summary.low_stock_count;
+            } catch (error) {
+                console.error('Error loading overview data:', error);
+            }
+        }
+
+        // Products functionality
+        async function loadProducts() {
+            try {
+                const response = await fetch('/api/admin/products');
+                productsData = await response.json();
+                displayProducts();
+            } catch (error) {
+                console.error('Error loading products:', error);
+            }
+        }
+
+        // Image upload handling
+        document.addEventListener('DOMContentLoaded', function() {
+            const imageUpload = document.getElementById('productImageFile');
+            if (imageUpload) {
+                imageUpload.addEventListener('change', async function(e) {
+                    const file = e.target.files[0];
+                    if (!file) return;
+
+                    const formData = new FormData();
+                    formData.append('file', file);
+
+                    try {
+                        showProductAlert('info', 'Uploading image...');
+
+                        const response = await fetch('/upload_image', {
+                            method: 'POST',
+                            body: formData
+                        });
+
+                        const result = await response.json();
+
+                        if (result.success) {
+                            document.getElementById('productImage').value = result.filename;
+
+                            // Show preview
+                            const preview = document.getElementById('imagePreview');
+                            const previewImg = document.getElementById('previewImg');
+                            previewImg.src = `/static/images/${result.filename}`;
+                            preview.style.display = 'block';
+
+                            showProductAlert('success', 'Image uploaded successfully!');
+                        } else {
+                            showProductAlert('error', result.message);
+                        }
+                    } catch (error) {
+                        console.error('Upload error:', error);
+                        showProductAlert('error', 'Failed to upload image');
+                    }
+                });
+            }
+        });
+
+        function displayProducts() {
+            const tbody = document.querySelector('#productsTable tbody');
+
+            if (productsData.length === 0) {
+                tbody.innerHTML = '<tr><td colspan="7" style="text-align: center; color: var(--text-light);">No products found</td></tr>';
+                return;
+            }
+
+            tbody.innerHTML = productsData.map(product => `
+                <tr>
+                    <td>${product.id}</td>
+                    <td>${product.name}</td>
+                    <td>${product.category}</td>
+                    <td>${product.price_formatted}</td>
+                    <td>${product.stock}</td>
+                    <td>
+                        <span class="badge badge-${product.is_active ? 'delivered' : 'cancelled'}">${product.is_active ? 'Active' : 'Inactive'}</span>
+                    </td>
+                    <td>
+                        <button class="btn btn-outline" onclick="editProduct(${product.id})" style="margin-right: 0.5rem;">
+                            <i class="fas fa-edit"></i>
+                        </button>
+                        <button class="btn btn-danger" onclick="deleteProduct(${product.id})">
+                            <i class="fas fa-trash"></i>
+                        </button>
+                    </td>
+                </tr>
+            `).join('');
+        }
+
+        function showAddProductModal() {
+            document.getElementById('productModalTitle').textContent = 'Add Product';
+            document.getElementById('productForm').reset();
+            document.getElementById('productId').value = '';
+            clearProductAlerts();
+            document.getElementById('productModal').classList.add('active');
+        }
+
+        function editProduct(productId) {
+        const product = productsData.find(p => p.id === productId);
+        if (!product) return;
+
+        document.getElementById('productModalTitle').textContent = 'Edit Product';
+        document.getElementById('productId').value = product.id;
+        document.getElementById('productName').value = product.name;
+        document.getElementById('productDescription').value = product.description || '';
+        document.getElementById('productPrice').value = product.price;
+        document.getElementById('productStock').value = product.stock;
+        document.getElementById('productCategory').value = product.category_id;
+        document.getElementById('productImage').value = product.image_path || '';
+        document.getElementById('productStatus').value = product.is_active ? '1' : '0';
+
+        // ✅ Show preview if product already has an image
+        const preview = document.getElementById('imagePreview');
+        const previewImg = document.getElementById('previewImg');
+        if (product.image_path) {
+            previewImg.src = `/static/images/${product.image_path}`;
+            preview.style.display = 'block';
+        } else {
+            preview.style.display = 'none';
+        }
+
+        clearProductAlerts();
+        document.getElementById('productModal').classList.add('active');
+    }
+
+    async function saveProduct() {
+        const productId = document.getElementById('productId').value;
+        const imagePath = document.getElementById('productImage').value;
+
+        const productData = {
+            name: document.getElementById('productName').value,
+            description: document.getElementById('productDescription').value,
+            price: document.getElementById('productPrice').value,
+            stock: document.getElementById('productStock').value,
+            category_id: document.getElementById('productCategory').value,
+            is_active: document.getElementById('productStatus').value === '1'
+        };
+
+        // ✅ Only include image_path if not empty
+        if (imagePath) {
+            productData.image_path = imagePath;
+        }
+
+        // Validate required fields
+        if (!productData.name || !productData.price || !productData.stock || !productData.category_id) {
+            showProductAlert('error', 'Please fill in all required fields');
+            return;
+        }
+
+        try {
+            const url = productId ? `/api/admin/products/${productId}` : '/api/admin/products';
+            const method = productId ? 'PUT' : 'POST';
+
+            const response = await fetch(url, {
+                method: method,
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify(productData)
+            });
+
+            const result = await response.json();
+
+            if (result.success) {
+                showProductAlert('success', `Product ${productId ? 'updated' : 'added'} successfully!`);
+                setTimeout(() => {
+                    closeProductModal();
+                    loadProducts();
+                    if (currentSection === 'overview') loadOverviewData();
+                }, 1500);
+            } else {
+                showProductAlert('error', result.message || 'Failed to save product');
+            }
+        } catch (error) {
+            console.error('Error saving product:', error);
+            showProductAlert('error', 'Error saving product. Please try again.');
+        }
+    }
+
+        async function deleteProduct(productId) {
+            if (!confirm('Are you sure you want to delete this product?')) return;
+
+            try {
+                const response = await fetch(`/api/admin/products/${productId}`, {
+                    method: 'DELETE'
+                });
+
+                const result = await response.json();
+
+                if (result.success) {
+                    showAlert('success', 'Product deleted successfully!');
+                    loadProducts();
+                    if (currentSection === 'overview') loadOverviewData();
+                } else {
+                    showAlert('error', 'Failed to delete product');
+                }
+            } catch (error) {
+                console.error('Error deleting product:', error);
+                showAlert('error', 'Error deleting product');
+            }
+        }
+
+        function closeProductModal() {
+            document.getElementById('productModal').classList.remove('active');
+        }
+
+        // Orders functionality
+        function archiveQuery(toggleId) {
+            // Order history endpoints only read the archive database when asked
+            return document.getElementById(toggleId).checked ? '?include_archive=1' : '';
+        }
+
+        async function loadOrders() {
+            try {
+                const response = await fetch('/api/admin/orders' + archiveQuery('ordersIncludeArchive'));
+                ordersData = await response.json();
+                displayOrders();
+            } catch (error) {
+                console.error('Error loading orders:', error);
+            }
+        }
+
+        function displayOrders() {
+            const tbody = document.querySelector('#ordersTable tbody');
+
+            if (ordersData.length === 0) {
+                tbody.innerHTML = '<tr><td colspan="6" style="text-align: center; color: var(--text-light);">No orders found</td></tr>';
+                return;
+            }
+
+            tbody.innerHTML = ordersData.map(order => `
+                <tr>
+                    <td>#${order.id}</td>
+                    <td>${order.customer}</td>
+                    <td>${order.total_formatted}</td>
+                    <td><span class="badge badge-${order.status}">${order.status}</span></td>
+                    <td>${new Date(order.date).toLocaleDateString()}</td>
+                    <td>
+                        <button class="btn btn-outline" onclick="updateOrderStatusModal(${order.id}, '${order.status}')" style="margin-right: 0.5rem;">
+                            <i class="fas fa-edit"></i>
+                        </button>
+                        <button class="btn btn-outline" onclick="viewOrderDetails(${order.id})">
+                            <i class="fas fa-eye"></i>
+                        </button>
+                    </td>
+                </tr>
+            `).join('');
+        }
+
+        function updateOrderStatusModal(orderId, currentStatus) {
+            document.getElementById('orderId').value = orderId;
+            document.getElementById('orderStatus').value = currentStatus;
+            clearOrderAlerts();
+            document.getElementById('orderModal').classList.add('active');
+        }
+
+        async function updateOrderStatus() {
+            const orderId = document.getElementById('orderId').value;
+            const status = document.getElementById('orderStatus').value;
+            const expectedDelivery = document.getElementById('expectedDelivery').value;
+
+            try {
+                const response = await fetch(`/api/admin/orders/${orderId}/status`, {
+                    method: 'PUT',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({
+                        status: status,
+                        expected_delivery: expectedDelivery
+                    })
+                });
+
+                const result = await response.json();
+
+                if (result.success) {
+                    showOrderAlert('success', 'Order status updated successfully!');
+                    setTimeout(() => {
+                        closeOrderModal();
+                        loadOrders();
+                    }, 1500);
+                } else {
+                    showOrderAlert('error', result.message || 'Failed to update order status');
+                }
+            } catch (error) {
+                console.error('Error updating order status:', error);
+                showOrderAlert('error', 'Error updating order status');
+            }
+        }
+
+        async function processNextOrder() {
+            try {
+                const response = await fetch('/api/admin/process_orders', {
+                    method: 'POST'
+                });
+
+                const result = await response.json();
+                showAlert('success', result.message);
+                
+                // Refresh orders after a delay
+                setTimeout(() => {
+                    if (currentSection === 'orders') loadOrders();
+                }, 1000);
+            } catch (error) {
+                console.error('Error processing order:', error);
+                showAlert('error', 'Error processing order');
+            }
+        }
+
+        function viewOrderDetails(orderId) {
+            const order = ordersData.find(o => o.id === orderId);
+            if (!order) return;
+
+            alert(`Order Details:
+
+Order ID: #${order.id}
+Customer: ${order.customer}
+Email: ${order.email}
+Total: ${order.total_formatted}
+Status: ${order.status}
+Address: ${order.address}
+Contact: ${order.contact}
+Date: ${new Date(order.date).toLocaleString()}`);
+        }
+
+        function closeOrderModal() {
+            document.getElementById('orderModal').classList.remove('active');
+        }
+
+        // Users functionality
+        async function loadUsers() {
+            try {
+                const response = await fetch('/api/admin/users');
+                usersData = await response.json();
+                displayUsers();
+            } catch (error) {
+                console.error('Error loading users:', error);
+            }
+        }
+
+        function displayUsers() {
+            const tbody = document.querySelector('#usersTable tbody');
+
+            if (usersData.length === 0) {
+                tbody.innerHTML = '<tr><td colspan="7" style="text-align: center; color: var(--text-light);">No users found</td></tr>';
+                return;
+            }
+
+            tbody.innerHTML = usersData.map(user => `
+                <tr>
+                    <td>${user.id}</td>
+                    <td>${user.username}</td>
+                    <td>${user.email}</td>
+                    <td>${user.order_count}</td>
+                    <td>${user.total_spent_formatted}</td>
+                    <td>${new Date(user.created_at).toLocaleDateString()}</td>
+                    <td>
+                        <button class="btn btn-outline" onclick="viewUserTransactions(${user.id}, '${user.username}')">
+                            <i class="fas fa-eye"></i>
+                            Transactions
+                        </button>
+                    </td>
+                </tr>
+            `).join('');
+        }
+
+        async function viewUserTransactions(userId, username) {
+            try {
+                const response = await fetch(`/api/admin/users/${userId}/transactions` + archiveQuery('usersIncludeArchive'));
+                const data = await response.json();
+
+                document.getElementById('userModalTitle').textContent = `${username} - Transaction History`;
+                document.getElementById('userModalBody').innerHTML = `
+                    <div style="margin-bottom: 2rem; padding: 1rem; background: var(--bg-light); border-radius: 8px;">
+                        <div style="display: flex; justify-content: space-between; margin-bottom: 0.5rem;">
+                            <strong>Total Orders:</strong> <span>${data.total_orders}</span>
+                        </div>
+                        <div style="display: flex; justify-content: space-between;">
+                            <strong>Total Spent:</strong> <span style="color: var(--primary-red); font-weight: bold;">${data.total_spent}</span>
+                        </div>
+                    </div>
+
+                    ${data.transactions.length > 0 ? `
+                        <div class="table-container">
+                            <table class="table">
+                                <thead>
+                                    <tr>
+                                        <th>Order ID</th>
+                                        <th>Date</th>
+                                        <th>Items</th>
+                                        <th>Total</th>
+                                        <th>Status</th>
+                                    </tr>
+                                </thead>
+                                <tbody>
+                                    ${data.transactions.map(transaction => `
+                                        <tr>
+                                            <td>#${transaction.order_id}</td>
+                                            <td>${new Date(transaction.date).toLocaleDateString()}</td>
+                                            <td>${transaction.item_count}</td>
+                                            <td>${transaction.total_formatted}</td>
+                                            <td><span class="badge badge-${transaction.status}">${transaction.status}</span></td>
+                                        </tr>
+                                    `).join('')}
+                                </tbody>
+                            </table>
+                        </div>
+                    ` : '<p style="text-align: center; color: var(--text-light); padding: 2rem;">No transactions found</p>'}
+                `;
+
+                document.getElementById('userModal').classList.add('active');
+            } catch (error) {
+                console.error('Error loading user transactions:', error);
+                showAlert('error', 'Error loading user transactions');
+            }
+        }
+
+        function closeUserModal() {
+            document.getElementById('userModal').classList.remove('active');
+        }
+
+        // Utility functions
+        function exportData() {
+            const data = {
+                products: productsData,
+                orders: ordersData,
+                users: usersData,
+                timestamp: new Date().toISOString()
+            };
+
+            const blob = new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' });
+            const url = URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `ecommerce_data_${new Date().toISOString().split('T')[0]}.json`;
+            document.body.appendChild(a);
+            a.click();
+            document.body.removeChild(a);
+            URL.revokeObjectURL(url);
+
+            showAlert('success', 'Data exported successfully!');
+        }
+
+        function showAlert(type, message) {
+            const alert = document.createElement('div');
+            alert.className = `alert alert-${type}`;
+            alert.innerHTML = `
+                <i class="fas fa-${type === 'success' ? 'check-circle' : 'exclamation-circle'}"></i>
+                ${message}
+            `;
+
+            document.body.insertBefore(alert, document.body.firstChild);
+
+            setTimeout(() => {
+                alert.remove();
+            }, 5000);
+        }
+
+        function showProductAlert(type, message) {
+            const alertContainer = document.getElementById('productAlerts');
+            const alertClass = type === 'success' ? 'alert-success' : 'alert-error';
+            const icon = type === 'success' ? 'fa-check-circle' : 'fa-exclamation-circle';
+
+            alertContainer.innerHTML = `
+                <div class="alert ${alertClass}">
+                    <i class="fas ${icon}"></i>
+                    ${message}
+                </div>
+            `;
+
+            setTimeout(() => {
+                if (type !== 'success') alertContainer.innerHTML = '';
+            }, 5000);
+        }
+
+        function clearProductAlerts() {
+            document.getElementById('productAlerts').innerHTML = '';
+        }
+
+        function showOrderAlert(type, message) {
+            const alertContainer = document.getElementById('orderAlerts');
+            const alertClass = type === 'success' ? 'alert-success' : 'alert-error';
+            const icon = type === 'success' ? 'fa-check-circle' : 'fa-exclamation-circle';
+
+            alertContainer.innerHTML = `
+                <div class="alert ${alertClass}">
+                    <i class="fas ${icon}"></i>
+                    ${message}
+                </div>
+            `;
+
+            setTimeout(() => {
+                if (type !== 'success') alertContainer.innerHTML = '';
+            }, 5000);
+        }
+
+        function clearOrderAlerts() {
+            document.getElementById('orderAlerts').innerHTML = '';
+        }
+
+        // Close modals on outside click
+        document.addEventListener('click', function(e) {
+            if (e.target.classList.contains('modal')) {
+                e.target.classList.remove('active');
+            }
+        });
@@ -0,0 +1,148 @@
+// Login form handling
+document.getElementById('loginForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const loginBtn = document.getElementById('loginBtn');
+    const spinner = loginBtn.querySelector('.fa-spinner');
+    const buttonText = loginBtn.querySelector('span');
+    const alertContainer = document.getElementById('alertContainer');
+
+    // Reset previous errors
+    clearErrors();
+    clearAlerts();
+
+    // Show loading state
+    loginBtn.disabled = true;
+    spinner.style.display = 'inline-block';
+    buttonText.textContent = 'Signing in...';
+
+    // Get form data
+    const formData = new FormData(this);
+    const data = {
+        username: formData.get('username'),
+        password: formData.get('password')
+    };
+
+    try {
+        const response = await fetch('/login', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(data)
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            showAlert('success', 'Login successful! Redirecting...');
+            setTimeout(() => {
+                window.location.href = result.redirect;
+            }, 1500);
+        } else {
+            showAlert('error', result.message);
+            resetButton();
+        }
+    } catch (error) {
+        showAlert('error', 'Connection error. Please try again.');
+        resetButton();
+    }
+
+    function resetButton() {
+        loginBtn.disabled = false;
+        spinner.style.display = 'none';
+        buttonText.textContent = 'Login';
+    }
+});
+
+// Input validation
+document.getElementById('username').addEventListener('input', function() {
+    const value = this.value.trim();
+    if (value.length < 3) {
+        showFieldError('username', 'Username must be at least 3 characters');
+    } else {
+        clearFieldError('username');
+    }
+});
+
+document.getElementById('password').addEventListener('input', function() {
+    const value = this.value;
+    if (value.length < 6) {
+        showFieldError('password', 'Password must be at least 6 characters');
+    } else {
+        clearFieldError('password');
+    }
+});
+
+// Auto-focus on first input
+document.getElementById('username').focus();
+
+// Enter key handling
+document.addEventListener('keydown', function(e) {
+    if (e.key === 'Enter' && !document.getElementById('loginBtn').disabled) {
+        document.getElementById('loginForm').dispatchEvent(new Event('submit'));
+    }
+});
+
+// Demo login buttons
+function loginAsAdmin() {
+    document.getElementById('username').value = 'admin';
+    document.getElementById('password').value = 'admin123';
+    document.getElementById('loginForm').dispatchEvent(new Event('submit'));
+}
+
+// Utility functions
+function showAlert(type, message) {
+    const alertContainer = document.getElementById('alertContainer');
+    const alertClass = type === 'success' ? 'alert-success' : 'alert-error';
+    const icon = type === 'success' ? 'fa-check-circle' : 'fa-exclamation-circle';
+
+    alertContainer.innerHTML = `
+        <div class="alert ${alertClass}">
+            <i class="fas ${icon}"></i>
+            ${message}
+        </div>
+    `;
+}
+
+function clearAlerts() {
+    document.getElementById('alertContainer').innerHTML = '';
+}
+
+function showFieldError(fieldName, message) {
+    const errorElement = document.getElementById(fieldName + 'Error');
+    const inputElement = document.getElementById(fieldName);
+
+    errorElement.textContent = message;
+    errorElement.style.display = 'block';
+    inputElement.style.borderColor = '#ef4444';
+}
+
+function clearFieldError(fieldName) {
+    const errorElement = document.getElementById(fieldName + 'Error');
+    const inputElement = document.getElementById(fieldName);
+
+    errorElement.style.display = 'none';
+    inputElement.style.borderColor = '#e5e7eb';
+}
+
+function clearErrors() {
+    const errorElements = document.querySelectorAll('.form-error');
+    const inputElements = document.querySelectorAll('.form-input');
+
+    errorElements.forEach(el => el.style.display = 'none');
+    inputElements.forEach(el => el.style.borderColor = '#e5e7eb');
+}
+
+// Page animations
+document.addEventListener('DOMContentLoaded', function() {
+    const formCard = document.querySelector('.form-card');
+    formCard.style.opacity = '0';
+    formCard.style.transform = 'translateY(20px)';
+
+    setTimeout(() => {
+        formCard.style.transition = 'all 0.6s ease';
+        formCard.style.opacity = '1';
+        formCard.style.transform = 'translateY(0)';
+    }, 100);
+});
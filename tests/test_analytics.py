@@ -0,0 +1,91 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fcntl
+import time
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import app as module
+from analytics import SalesAnalytics
+
+
+def place_order(db, day, price, quantity=1, status='delivered'):
+    order_id = db.execute_insert(
+        "INSERT INTO orders (user_id, total_amount, status, created_at) VALUES (2, ?, ?, ?)",
+        (price * quantity, status, day)
+    )
+    db.execute_insert("INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, 1, ?, ?)",
+                      (order_id, quantity, price))
+    return order_id
+
+
+@pytest.fixture
+def db(tmp_path):
+    module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db')})
+    return module.db
+
+
+def test_workers_share_one_snapshot(db, tmp_path):
+    directory = str(tmp_path / 'analytics')
+    place_order(db, '2025-01-01', 100, 2)
+    place_order(db, '2025-01-02', 50)
+    builder, reader = SalesAnalytics(db.db_path, directory), SalesAnalytics(db.db_path, directory)
+
+    assert builder.refresh() == 2
+    assert reader.average_order_value() == {'orders': 2, 'revenue': 250.0, 'average_order_value': 125.0}
+
+    # New orders are appended; the reader picks up the published size without refreshing
+    cancelled = place_order(db, '2025-01-02', 70)
+    place_order(db, '2025-01-03', 30)
+    db.execute_query("UPDATE orders SET status = 'cancelled' WHERE id = ?", (cancelled,))
+    assert builder.refresh() == 2
+    assert [period['revenue'] for period in reader.revenue_by('day')] == [200.0, 50.0, 30.0]
+
+
+def test_only_the_lock_holder_refreshes(db, tmp_path):
+    directory = tmp_path / 'analytics'
+    place_order(db, '2025-01-01', 100)
+    os.makedirs(directory)
+    with open(directory / '.lock', 'a') as other_worker:
+        fcntl.flock(other_worker, fcntl.LOCK_EX)
+        assert SalesAnalytics(db.db_path, str(directory)).refresh() == 0
+    assert SalesAnalytics(db.db_path, str(directory)).refresh() == 1
+
+
+def test_interrupted_refresh_is_discarded(db, tmp_path):
+    directory = str(tmp_path / 'analytics')
+    place_order(db, '2025-01-01', 100)
+    analytics = SalesAnalytics(db.db_path, directory)
+    analytics.refresh()
+    # Bytes appended by a refresh that died before publishing meta.json
+    with open(os.path.join(directory, 'order_id.1.bin'), 'ab') as f:
+        f.write(b'\0' * 80)
+
+    place_order(db, '2025-01-02', 50)
+    analytics.refresh()
+
+    assert analytics.average_order_value()['revenue'] == 150.0
+
+
+def test_endpoint_is_served_from_the_background_build(tmp_path):
+    app = module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db')})
+    module.ensure_worker_initialized()
+    place_order(module.db, '2025-01-01', 100)
+    admin = app.test_client()
+    with admin.session_transaction() as session:
+        session.update(user_id=1, role='admin', username='admin')
+
+    # 503 until the refresher thread has published the first snapshot
+    deadline = time.monotonic() + 10
+    response = admin.get('/api/admin/analytics')
+    while response.status_code == 503 and time.monotonic() < deadline:
+        time.sleep(0.05)
+        response = admin.get('/api/admin/analytics')
+
+    assert response.status_code == 200
+    assert response.get_json()['orders']['orders'] == 1
@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as module
+
+
+def test_archival_keeps_dashboard_order_counts(tmp_path):
+    app = module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db'), 'RATELIMIT_ENABLED': False})
+    db = module.db
+    customer_id = db.execute_insert(
+        "INSERT INTO users (username, email, password_hash, role) VALUES ('c', 'c@example.com', '', 'customer')", ()
+    )
+    for status, created_at in (('delivered', '2020-01-01'), ('delivered', '2020-01-02'), ('pending', '2020-01-03')):
+        order_id = db.execute_insert(
+            "INSERT INTO orders (user_id, total_amount, status, created_at) VALUES (?, 100, ?, ?)",
+            (customer_id, status, created_at)
+        )
+        db.execute_insert("INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, 1, 1, 100)",
+                          (order_id,))
+    admin = app.test_client()
+    with admin.session_transaction() as session:
+        session.update(user_id=1, role='admin', username='admin')
+    before = admin.get('/api/admin/summary').get_json()
+
+    progress = module.order_archiver.run('test')
+
+    assert (progress['orders'], progress['items']) == (2, 2)
+    after = admin.get('/api/admin/summary').get_json()
+    assert after['order_count'] == before['order_count'] == 3
+    assert after['orders_by_status'] == before['orders_by_status']
+    assert after['archived_order_count'] == 2
+    assert len(admin.get('/api/admin/orders').get_json()) == 1
+    assert len(admin.get('/api/admin/orders?include_archive=1').get_json()) == 3
@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fcntl
+
+import app as module
+
+
+def make_app(tmp_path):
+    app = module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db'), 'BACKUP_DIR': str(tmp_path / 'backups')})
+    module.ensure_worker_initialized()
+    return app
+
+
+def test_backup_reads_a_wal_snapshot_without_restarts(tmp_path):
+    make_app(tmp_path)
+
+    progress = module.backups.run('test')
+
+    assert (progress['journal_mode'], progress['restarts'], progress['integrity']) == ('wal', 0, 'ok')
+    assert os.path.exists(tmp_path / 'backups' / progress['file'])
+
+
+def test_backup_post_conflicts_with_another_worker(tmp_path):
+    app = make_app(tmp_path)
+    admin = app.test_client()
+    with admin.session_transaction() as session:
+        session.update(user_id=1, role='admin', username='admin')
+    os.makedirs(tmp_path / 'backups')
+
+    # Another worker holds the backup lock
+    with open(tmp_path / 'backups' / '.lock', 'a') as other:
+        fcntl.flock(other, fcntl.LOCK_EX)
+        response = admin.post('/api/admin/backups')
+
+    assert response.status_code == 409
+    assert not module.backups.lock.locked()
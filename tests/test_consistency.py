@@ -0,0 +1,119 @@
+import json
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as module
+import check_db
+
+
+def seed_corrupt_database(path):
+    """A fresh shop database with exactly one violation of every consistency check"""
+    module.create_app({'DATABASE_PATH': path, 'RATELIMIT_ENABLED': False})
+    conn = sqlite3.connect(path)
+    with conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, email, password_hash, role) VALUES ('c', 'c@example.com', '', 'customer')"
+        ).lastrowid
+        conn.executemany("INSERT INTO products (name, price, stock, category_id) VALUES (?, 10, 5, 0)",
+                         [('Kept',), ('Lost',)])
+        product_id = conn.execute("SELECT id FROM products WHERE name = 'Kept'").fetchone()[0]
+
+        def order(total, item_count, items):
+            order_id = conn.execute(
+                "INSERT INTO orders (user_id, total_amount, status, item_count) VALUES (?, ?, 'pending', ?)",
+                (user_id, total, item_count)
+            ).lastrowid
+            for quantity, price in items:
+                conn.execute("INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, ?, ?)",
+                             (order_id, product_id, quantity, price))
+            return order_id
+
+        order(20, 2, [(1, 10), (1, 10)])                           # consistent
+        order(99, 1, [(2, 10)])                                    # order_total
+        order(0, 0, [])                                            # empty_order
+        order(10, 3, [(1, 10)])                                    # order_item_count
+        conn.execute("INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (999999, ?, 1, 5)",
+                     (product_id,))                                # orphan_order_item
+        conn.execute("INSERT INTO cart_items (user_id, product_id, quantity) VALUES (?, 999999, 1)",
+                     (user_id,))                                   # cart_missing_product
+        conn.execute("UPDATE products SET stock = -3 WHERE id = ?", (product_id,))  # negative_stock
+        conn.execute("UPDATE products SET category_id = 999999 WHERE name = 'Lost'")  # product_missing_category
+        conn.execute("INSERT INTO categories (name, parent_id) VALUES ('Lost', 999999)")  # category_missing_parent
+    conn.close()
+    return user_id, product_id
+
+
+def run(tmp_path, repair=False, **options):
+    report_path = str(tmp_path / f"report-{'repair' if repair else 'check'}.json")
+    remaining = check_db.run_consistency_checks(workers=1, shard_size=2, repair=repair,
+                                                report_path=report_path, **options)
+    with open(report_path, encoding='utf-8') as f:
+        return remaining, json.load(f)['checks']
+
+
+def test_every_invariant_is_detected_and_repaired(tmp_path, monkeypatch):
+    path = str(tmp_path / 'shop.db')
+    monkeypatch.setattr(check_db, 'DB_PATH', path)
+    user_id, product_id = seed_corrupt_database(path)
+
+    remaining, checks = run(tmp_path)
+
+    assert set(checks) == set(check_db.CHECKS_BY_NAME)
+    assert {name: result['violations'] for name, result in checks.items()} == dict.fromkeys(checks, 1)
+    assert all(not result['errors'] for result in checks.values())
+    assert remaining == len(checks)
+    assert checks['order_total']['sample'][0]['items_total'] == 20
+    assert checks['negative_stock']['sample'][0]['product_id'] == product_id
+
+    conn = sqlite3.connect(path)
+    versions_before = dict(conn.execute("SELECT name, version FROM data_versions"))
+    conn.close()
+
+    remaining, checks = run(tmp_path, repair=True)
+
+    assert remaining == 0
+    assert {name: result['repaired'] for name, result in checks.items()} == dict.fromkeys(checks, 1)
+    remaining, checks = run(tmp_path)
+    assert remaining == 0
+    assert all(result['violations'] == 0 for result in checks.values())
+
+    conn = sqlite3.connect(path)
+    versions_after = dict(conn.execute("SELECT name, version FROM data_versions"))
+    statuses = [row[0] for row in conn.execute("SELECT status FROM orders ORDER BY id")]
+    conn.close()
+    assert statuses.count('cancelled') == 1
+    assert versions_after['products'] > versions_before.get('products', 0)
+    assert versions_after[f'cart:{user_id}'] > versions_before.get(f'cart:{user_id}', 0)
+
+
+def test_repair_only_touches_selected_checks(tmp_path, monkeypatch):
+    path = str(tmp_path / 'shop.db')
+    monkeypatch.setattr(check_db, 'DB_PATH', path)
+    seed_corrupt_database(path)
+
+    remaining, checks = run(tmp_path, repair=True, names=['negative_stock'])
+
+    assert remaining == 0 and list(checks) == ['negative_stock']
+    remaining, checks = run(tmp_path)
+    assert checks['negative_stock']['violations'] == 0
+    assert remaining == len(checks) - 1
+
+
+def test_cli_exits_nonzero_until_repaired(tmp_path, monkeypatch):
+    path = str(tmp_path / 'shop.db')
+    monkeypatch.setattr(check_db, 'DB_PATH', path)
+    seed_corrupt_database(path)
+
+    for argv, code in ((['consistency', '--workers', '1'], 1),
+                       (['consistency', '--workers', '1', '--repair'], None),
+                       (['consistency', '--workers', '1'], None)):
+        monkeypatch.setattr(sys, 'argv', ['check_db.py', *argv])
+        try:
+            check_db.main()
+            exit_code = None
+        except SystemExit as e:
+            exit_code = e.code
+        assert exit_code == code, argv
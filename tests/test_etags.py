@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as module
+
+
+def test_cart_etag_changes_when_a_product_price_changes(tmp_path):
+    app = module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db'), 'RATELIMIT_ENABLED': False})
+    db = module.db
+    product_id = db.execute_insert(
+        "INSERT INTO products (name, description, price, stock, category_id, is_active) VALUES (?, ?, ?, ?, ?, 1)",
+        ('Phone', '', 100, 10, 5)
+    )
+    customer = app.test_client()
+    with customer.session_transaction() as session:
+        session.update(user_id=2, role='customer', username='c')
+    customer.post('/api/cart', json={'product_id': product_id, 'quantity': 2})
+    etag = customer.get('/api/cart').headers['ETag'].strip('"')
+
+    admin = app.test_client()
+    with admin.session_transaction() as session:
+        session.update(user_id=1, role='admin', username='admin')
+    admin.put(f'/api/admin/products/{product_id}', json={
+        'name': 'Phone', 'description': '', 'price': 999, 'stock': 10, 'category_id': 5, 'is_active': True
+    })
+
+    response = customer.get('/api/cart', headers={'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 200
+    assert '999' in response.get_data(as_text=True)
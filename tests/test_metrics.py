@@ -0,0 +1,24 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as module
+
+
+def test_metrics_with_cached_browsing_history(tmp_path):
+    app = module.create_app({
+        'DATABASE_PATH': str(tmp_path / 'shop.db'),
+        'METRICS_DIR': str(tmp_path / 'metrics'),
+        'METRICS_TOKEN': None,
+        'METRICS_ENABLED': True
+    })
+    module.ensure_worker_initialized()  # the first request would otherwise drop the store
+    module.history_store.record_view(1, 101, 'Phone')
+    module.history_store.record_view(1, 102, 'Laptop')
+
+    response = app.test_client().get('/metrics')
+
+    assert response.status_code == 200
+    assert 'browsing_history_cached_items 2' in response.get_data(as_text=True)
+    module.metrics.write_snapshot()  # what shutdown_worker runs at exit
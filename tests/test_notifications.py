@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as module
+
+
+class RecordingEmailService:
+    def __init__(self):
+        self.sent = []
+
+    def send_order_status_email(self, customer_email, order_id, status, expected_delivery=None):
+        self.sent.append(('status', customer_email, order_id, status, expected_delivery))
+        return True
+
+    def send_order_digest_email(self, customer_email, updates):
+        self.sent.append(('digest', customer_email, updates))
+        return True
+
+
+def test_updates_within_the_window_merge_into_one_digest():
+    email = RecordingEmailService()
+    coalescer = module.NotificationCoalescer(email, window=60)
+
+    coalescer.notify('c@example.com', 1, 'processing', '2025-02-01')
+    coalescer.notify('c@example.com', 1, 'shipping')
+    coalescer.notify('c@example.com', 2, 'processing')
+    coalescer.notify('d@example.com', 3, 'delivered')
+    assert email.sent == []
+    assert coalescer.pending_count() == 3
+
+    coalescer.flush('c@example.com')
+    # Latest status per order; the earlier delivery date is kept
+    assert email.sent == [('digest', 'c@example.com', [(1, 'shipping', '2025-02-01'), (2, 'processing', None)])]
+
+    coalescer.flush('d@example.com')
+    assert email.sent[-1] == ('status', 'd@example.com', 3, 'delivered', None)
+    assert coalescer.pending_count() == 0
+    assert coalescer.timers == {}
+
+
+def test_zero_window_sends_at_once():
+    email = RecordingEmailService()
+    module.NotificationCoalescer(email, window=0).notify('c@example.com', 1, 'shipping')
+    assert email.sent == [('status', 'c@example.com', 1, 'shipping', None)]
+
+
+def test_pending_notifications_are_sent_on_worker_shutdown(tmp_path):
+    module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db'), 'METRICS_DIR': str(tmp_path / 'metrics')})
+    module.ensure_worker_initialized()
+    email = RecordingEmailService()
+    module.notification_coalescer.email_service = email
+    module.notification_coalescer.window = 3600
+    module.notification_coalescer.notify('c@example.com', 1, 'delivered')
+
+    module.shutdown_worker()
+
+    assert email.sent == [('status', 'c@example.com', 1, 'delivered', None)]
+    assert module.notification_coalescer.timers == {}
@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import app as module
+
+
+@pytest.fixture
+def db(tmp_path):
+    module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db')})
+    return module.db
+
+
+def test_events_reach_streams_in_other_workers(db):
+    # One broker per worker process, over the same database
+    publisher, streams = module.OrderEventBroker(db), module.OrderEventBroker(db)
+    admin = streams.subscribe('admin')
+    customer = streams.subscribe('user:7')
+    other_customer = streams.subscribe('user:8')
+
+    with db.transaction() as cursor:
+        event_id = publisher.publish_order('status', 1, 7, 'shipping', 'processing', cursor=cursor)
+    streams.poll()
+
+    assert [event_id for event_id, _ in admin.drain(0)[0]] == [event_id]
+    events, dropped = customer.drain(0)
+    assert (events[0][1]['status'], dropped) == ('shipping', 0)
+    assert other_customer.drain(0) == ([], 0)
+
+
+def test_rolled_back_change_publishes_nothing(db):
+    broker = module.OrderEventBroker(db)
+    admin = broker.subscribe('admin')
+
+    with pytest.raises(RuntimeError):
+        with db.transaction() as cursor:
+            broker.publish_order('status', 1, 7, 'shipping', cursor=cursor)
+            raise RuntimeError('update failed')
+    broker.poll()
+
+    assert admin.drain(0) == ([], 0)
+
+
+def test_reconnect_replays_from_any_worker(db):
+    publisher = module.OrderEventBroker(db)
+    first = publisher.publish_order('created', 1, 7, 'pending')
+    publisher.publish_order('created', 2, 8, 'pending')
+    third = publisher.publish_order('status', 1, 7, 'processing', 'pending')
+
+    resumed = module.OrderEventBroker(db).subscribe('user:7', last_event_id=first)
+    assert [event_id for event_id, _ in resumed.drain(0)[0]] == [third]
+
+    # Pruned past the replay window: the client is told to resync
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM order_events WHERE id <= ?", (third - 1,))
+    events, dropped = module.OrderEventBroker(db).subscribe('user:7', last_event_id=first).drain(0)
+    assert ([event_id for event_id, _ in events], dropped) == ([third], 1)
+
+
+def test_streams_beyond_the_per_worker_cap_get_503(tmp_path):
+    app = module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db')})
+    module.ensure_worker_initialized()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session.update(user_id=1, role='admin', username='admin')
+    held = [module.order_events.subscribe('admin') for _ in range(module.order_events.max_subscribers)]
+
+    response = client.get('/api/admin/orders/stream')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(app.config['SSE_BUSY_RETRY_SECONDS'])
+    assert response.get_data(as_text=True).startswith('retry: ')
+    for subscription in held:
+        module.order_events.unsubscribe(subscription)
@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as module
+
+
+def test_workers_share_one_order_queue(tmp_path):
+    module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db')})
+    db = module.db
+    for status in ('pending', 'delivered', 'pending'):
+        db.execute_insert("INSERT INTO orders (user_id, total_amount, status) VALUES (2, 100, ?)", (status,))
+
+    # Each worker process builds its own OrderQueue over the same database
+    first, second = module.OrderQueue(db), module.OrderQueue(db)
+    assert first.size() == second.size() == 2
+
+    assert first.dequeue()['id'] == 1
+    assert second.dequeue()['id'] == 3
+    assert first.dequeue() is None
+    assert second.is_empty()
+
+
+def test_category_tree_follows_edits_from_other_workers(tmp_path):
+    module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db')})
+    db = module.db
+    tree = module.category_tree.current()
+    assert tree.get_all_products_in_category(5) == []
+
+    # Another worker adds a product and bumps the version
+    product_id = db.execute_insert(
+        "INSERT INTO products (name, price, stock, category_id, is_active) VALUES ('Phone', 100, 1, 5, 1)", ()
+    )
+    db.bump_versions('products', 'categories')
+
+    assert product_id in module.category_tree.current().get_all_products_in_category(5)
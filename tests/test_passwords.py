@@ -0,0 +1,54 @@
+import hashlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as module
+import passwords
+from passwords import PasswordHasher
+
+
+def legacy_hash(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def test_verify_accepts_every_supported_format():
+    hasher = PasswordHasher(cost=1000, workers=0)
+    encoded = hasher.hash('s3cret')
+    scrypt = passwords.hash_password('s3cret', 'scrypt', 10)
+
+    assert encoded.startswith('pbkdf2_sha256$1000$')
+    for stored in (encoded, scrypt, legacy_hash('s3cret')):
+        assert hasher.verify('s3cret', stored)
+        assert not hasher.verify('wrong', stored)
+    assert not hasher.verify('s3cret', None)
+    assert not hasher.verify('s3cret', 'pbkdf2_sha256$broken')
+
+
+def test_needs_rehash_for_legacy_and_outdated_hashes():
+    hasher = PasswordHasher(cost=1000, workers=0)
+    assert hasher.needs_rehash(legacy_hash('s3cret'))
+    assert hasher.needs_rehash(passwords.hash_password('s3cret', 'pbkdf2_sha256', 500))
+    assert hasher.needs_rehash(passwords.hash_password('s3cret', 'scrypt', 10))
+    assert not hasher.needs_rehash(hasher.hash('s3cret'))
+
+
+def test_login_upgrades_a_legacy_hash(tmp_path, monkeypatch):
+    monkeypatch.setattr(module.password_hasher, 'cost', 1000)
+    monkeypatch.setattr(module.password_hasher, 'workers', 0)
+    app = module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db'), 'RATELIMIT_ENABLED': False})
+    db = module.db
+    user_id = db.execute_insert(
+        "INSERT INTO users (username, email, password_hash, role) VALUES ('old', 'old@example.com', ?, 'customer')",
+        (legacy_hash('s3cret'),)
+    )
+    stored = lambda: db.execute_query("SELECT password_hash FROM users WHERE id = ?", (user_id,))[0][0]
+    client = app.test_client()
+
+    assert not client.post('/login', json={'username': 'old', 'password': 'wrong'}).get_json()['success']
+    assert stored() == legacy_hash('s3cret')
+
+    assert client.post('/login', json={'username': 'old', 'password': 's3cret'}).get_json()['success']
+    assert stored().startswith('pbkdf2_sha256$1000$')
+    assert client.post('/login', json={'username': 'old@example.com', 'password': 's3cret'}).get_json()['success']
@@ -0,0 +1,97 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+
+import app as module
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_refills_at_its_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(module.time, 'monotonic', clock)
+    limiter = module.RateLimiter()
+
+    assert [limiter.consume('k', 2, 3) for _ in range(3)] == [0, 0, 0]
+    assert limiter.consume('k', 2, 3) == 0.5  # one token takes 1/rate seconds
+
+    clock.now += 0.5
+    assert limiter.consume('k', 2, 3) == 0
+    assert limiter.consume('k', 2, 3) == 0.5
+
+
+def test_full_and_least_recently_used_buckets_are_evicted(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(module.time, 'monotonic', clock)
+    limiter = module.RateLimiter(max_keys=2)
+
+    limiter.consume('a', 1, 2)
+    clock.now += 1  # 'a' is full again
+    limiter.consume('b', 1, 2)
+    assert list(limiter.buckets) == ['b']
+
+    limiter.consume('c', 1, 2)
+    limiter.consume('b', 1, 2)
+    limiter.consume('d', 1, 2)
+    assert list(limiter.buckets) == ['b', 'd']  # 'c' was the least recently used
+
+
+def limit(monkeypatch, **budgets):
+    monkeypatch.setitem(module.app.config, 'RATELIMIT_ENABLED', True)
+    monkeypatch.setitem(module.app.config, 'RATE_LIMITS', dict(module.app.config['RATE_LIMITS'], **budgets))
+
+
+def test_search_gets_429_with_retry_after(tmp_path, monkeypatch):
+    app = module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db')})
+    limit(monkeypatch, search=(0.01, 2, 8))
+    client = app.test_client()
+
+    assert [client.get('/api/products?search=phone').status_code for _ in range(2)] == [200, 200]
+    response = client.get('/api/products?search=phone')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+    # Plain listings are not searches, and other clients have their own bucket
+    assert client.get('/api/products').status_code == 200
+    other = client.get('/api/products?search=phone', environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert other.status_code == 200
+
+
+def test_requests_beyond_max_concurrent_get_503(tmp_path, monkeypatch):
+    app = module.create_app({'DATABASE_PATH': str(tmp_path / 'shop.db')})
+    limit(monkeypatch, slow=(100, 100, 1))
+    entered, release = threading.Event(), threading.Event()
+
+    @module.rate_limited('slow')
+    def slow_view():
+        entered.set()
+        release.wait(5)
+        return 'done'
+
+    def first_request():
+        with app.test_request_context('/slow', environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+            slow_view()
+
+    thread = threading.Thread(target=first_request)
+    thread.start()
+    try:
+        assert entered.wait(5)
+        with app.test_request_context('/slow', environ_base={'REMOTE_ADDR': '10.0.0.2'}):
+            response = slow_view()
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    finally:
+        release.set()
+        thread.join()
+
+    with app.test_request_context('/slow'):
+        assert slow_view() == 'done'